@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+# e2e.py
+# End-to-end throughput benchmarks: every argument_map method is run (in its own process, with --log-to-csv so
+# the fetch -> render -> export pipeline is exercised) against the local mock GitHub API at each scale.
+# Wall time, requests/s, items/s, peak RSS and CPU time are written to a JSON report that can be compared
+# against the report of another commit.
+#
+#   python -m benchmarks.e2e --scales 1000,10000,100000 --latency 5
+#   python -m benchmarks.e2e --compare benchmarks/results/e2e-<commit>.json
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# method -> target arguments. Methods that don't list anything (profiles, membership checks) ignore the scale.
+methods = {'user_profile': ['--username', 'user1'],
+           'user_repos': ['--username', 'user1'],
+           'user_gists': ['--username', 'user1'],
+           'user_orgs': ['--username', 'user1'],
+           'user_events': ['--username', 'user1'],
+           'user_subscriptions': ['--username', 'user1'],
+           'user_following': ['--username', 'user1'],
+           'user_followers': ['--username', 'user1'],
+           'user_follows': ['--username', 'user1', '--username_b', 'user2'],
+           'org_profile': ['--organisation', 'org1'],
+           'org_repos': ['--organisation', 'org1'],
+           'org_events': ['--organisation', 'org1'],
+           'org_member': ['--organisation', 'org1', '--username', 'user1'],
+           'repo_profile': ['--username', 'org1', '--repository', 'repo1'],
+           'repo_contributors': ['--username', 'org1', '--repository', 'repo1'],
+           'repo_stargazers': ['--username', 'org1', '--repository', 'repo1'],
+           'repo_forks': ['--username', 'org1', '--repository', 'repo1'],
+           'repo_issues': ['--username', 'org1', '--repository', 'repo1'],
+           'repo_releases': ['--username', 'org1', '--repository', 'repo1'],
+           'repo_path_contents': ['--username', 'org1', '--repository', 'repo1', '--path_name', 'src'],
+           'users_search': ['--query', 'user'],
+           'repos_search': ['--query', 'repo'],
+           'topics_search': ['--query', 'topic'],
+           'issues_search': ['--query', 'issue'],
+           'commits_search': ['--query', 'commit']}
+
+# Reported metrics where a higher value is worse (used by --compare)
+metrics = ['wall_time', 'cpu_time', 'peak_rss_mb']
+
+
+def resource_usage():
+    """
+    :return: (user + system CPU seconds, peak RSS in MB) of the current process
+    """
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss = usage.ru_maxrss / (1024 * 1024) if sys.platform == 'darwin' else usage.ru_maxrss / 1024
+        return usage.ru_utime + usage.ru_stime, peak_rss
+    except ImportError:
+        import psutil
+        process = psutil.Process()
+        cpu = process.cpu_times()
+        return cpu.user + cpu.system, process.memory_info().peak_wset / (1024 * 1024)
+
+
+def run_worker(method, endpoint, scale, result_file):
+    """
+    Runs inside the benchmark subprocess: import Octosuite with the method's command line, point it at the mock
+    API and time the method with its output going to /dev/null.
+    """
+    sys.argv = ['octosuite', '--colors', '--log-to-csv', '--method', method, '--limit', str(scale)] + methods[method]
+    sys.path.insert(0, root_directory)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        from octosuite import octosuite
+        octosuite.path_finder()
+        octosuite.configure_logging()
+        run = octosuite.Octosuite()
+        run.endpoint = endpoint
+        method_function = dict(run.argument_map)[method]
+
+        cpu_before, rss_before = resource_usage()
+        started = time.perf_counter()
+        method_function()
+        wall_time = time.perf_counter() - started
+        cpu_after, peak_rss = resource_usage()
+
+    with open(result_file, 'w') as file:
+        json.dump({'wall_time': wall_time,
+                   'cpu_time': cpu_after - cpu_before,
+                   'peak_rss_mb': round(peak_rss, 2),
+                   'exported_files': len(os.listdir('output'))}, file)
+
+
+def run_benchmark(method, scale, server, timeout):
+    server.reset_counters()
+    with tempfile.TemporaryDirectory() as work_directory:
+        result_file = os.path.join(work_directory, 'result.json')
+        command = [sys.executable, '-m', 'benchmarks.e2e', '--worker', method, '--endpoint', server.url,
+                   '--scale', str(scale), '--result-file', result_file]
+        completed = subprocess.run(command, cwd=work_directory, stdin=subprocess.DEVNULL, capture_output=True,
+                                   text=True, timeout=timeout, env={**os.environ, 'PYTHONPATH': root_directory})
+        if completed.returncode != 0 or not os.path.exists(result_file):
+            return {'name': f"{method}@{scale}", 'method': method, 'scale': scale, 'error': completed.stderr[-2000:]}
+        with open(result_file) as file:
+            result = json.load(file)
+    wall_time = result['wall_time']
+    return {'name': f"{method}@{scale}",
+            'method': method,
+            'scale': scale,
+            **result,
+            'requests': server.requests,
+            'response_bytes': server.bytes,
+            'requests_per_second': round(server.requests / wall_time, 2) if wall_time else None,
+            'items_per_second': round(result['exported_files'] / wall_time, 2) if wall_time else None}
+
+
+def main(argv=None):
+    from benchmarks.mock_github import MockGitHub
+    from benchmarks.report import save_report, load_report, compare, print_comparison
+
+    parser = argparse.ArgumentParser(description='Octosuite end-to-end throughput benchmarks')
+    parser.add_argument('--scales', default='1000,10000,100000', help='comma separated item counts (default: %(default)s)')
+    parser.add_argument('--methods', help='comma separated methods to run (default: all)')
+    parser.add_argument('--latency', type=float, default=0, help='injected server latency in milliseconds')
+    parser.add_argument('--jitter', type=float, default=0, help='random extra server latency in milliseconds')
+    parser.add_argument('--timeout', type=float, default=3600, help='per-run timeout in seconds (default: %(default)s)')
+    parser.add_argument('--output', help='report file (default: benchmarks/results/e2e-<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare the results against a previous report')
+    parser.add_argument('--threshold', type=float, default=10, help='regression threshold in percent (default: %(default)s)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--endpoint', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', dest='result_file', help=argparse.SUPPRESS)
+    arguments = parser.parse_args(argv)
+
+    if arguments.worker:
+        return run_worker(arguments.worker, arguments.endpoint, arguments.scale, arguments.result_file)
+
+    selected = arguments.methods.split(',') if arguments.methods else list(methods)
+    results = []
+    for scale in [int(scale) for scale in arguments.scales.split(',')]:
+        server = MockGitHub(scale=scale, latency=arguments.latency, jitter=arguments.jitter).start()
+        try:
+            for method in selected:
+                result = run_benchmark(method, scale, server, arguments.timeout)
+                results.append(result)
+                if 'error' in result:
+                    print(f"{result['name']:<32} FAILED\n{result['error']}")
+                else:
+                    print(f"{result['name']:<32} {result['wall_time']:>9.3f}s {result['requests']:>6} requests "
+                          f"{result['requests_per_second'] or 0:>9.1f} req/s {result['peak_rss_mb']:>8.1f} MB peak RSS")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    filename = save_report('e2e', results, arguments.output, metrics=metrics, latency=arguments.latency,
+                           jitter=arguments.jitter)
+    print(f"\nReport saved: {filename}")
+    if arguments.compare:
+        return print_comparison(compare(load_report(filename), load_report(arguments.compare), metrics,
+                                        arguments.threshold), arguments.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import io
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+
+# micro.py
+# Micro-benchmarks for the per-item hot paths that don't touch the network: JSON decoding, extracting an item's
+# schema row (and appending it to a columnar result store), building its rich Tree (entity construction),
+# rendering Trees/Tables to a null console and every csv_loggers.log_* writer.
+# Each benchmark runs over --items copies of a recorded fixture (benchmarks/fixtures) and reports the time per item.
+#
+#   python -m benchmarks.micro --save-baseline
+#   python -m benchmarks.micro --compare
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+fixtures_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+baseline_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'micro-baseline.json')
+
+# Reported metrics where a higher value is worse (used by --compare)
+metrics = ['per_item_us']
+
+
+class FixtureResponse:
+    # The profile writers take the whole response and call .json() on it
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+def load_fixture(name):
+    with open(os.path.join(fixtures_directory, f"{name}.json")) as file:
+        return json.load(file)
+
+
+def make_items(name, count):
+    """
+    Copies of a fixture with unique ids/logins/names, so writers produce one file per item like they would for real
+    """
+    fixture = load_fixture(name)
+    items = []
+    for index in range(count):
+        item = copy.deepcopy(fixture)
+        for key in ('id', 'number'):
+            if isinstance(item.get(key), int):
+                item[key] = index
+            elif isinstance(item.get(key), str):
+                item[key] = f"{item[key]}{index}"
+        for key in ('login', 'name', 'full_name', 'title'):
+            if isinstance(item.get(key), str):
+                item[key] = f"{item[key]}{index}"
+        items.append(item)
+    return items
+
+
+def timed(name, items, function, repeat):
+    """
+    Time function(item) over all items, keeping the fastest of <repeat> runs
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            function(item)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {'name': name, 'items': len(items), 'total_s': round(best, 6),
+            'per_item_us': round(best / len(items) * 1_000_000, 3)}
+
+
+def entity_trees():
+    """
+    entity -> function building the Tree Octosuite prints for one item of it, for the entities with a fixture
+    """
+    from octosuite import schemas
+
+    def schema_tree(schema):
+        return lambda item: schema.tree(schema.row(item))
+    return {name: schema_tree(schema) for name, schema in schemas.registry.items()
+            if os.path.exists(os.path.join(fixtures_directory, f"{name}.json"))}
+
+
+def csv_writers():
+    """
+    writer name -> (fixture, function writing one item)
+    """
+    from octosuite import csv_loggers
+    return {'log_org_profile': ('org_profile', lambda item: csv_loggers.log_org_profile(FixtureResponse(item))),
+            'log_user_profile': ('user_profile', lambda item: csv_loggers.log_user_profile(FixtureResponse(item))),
+            'log_repo_profile': ('repository', lambda item: csv_loggers.log_repo_profile(FixtureResponse(item))),
+            'log_repo_path_contents': ('content', lambda item: csv_loggers.log_repo_path_contents(item, 'repo1')),
+            'log_repo_stargazers': ('user', lambda item: csv_loggers.log_repo_stargazers(item, 'repo1')),
+            'log_repo_forks': ('repository', lambda item: csv_loggers.log_repo_forks(item, item['id'])),
+            'log_repo_issues': ('issue', lambda item: csv_loggers.log_repo_issues(item, 'repo1')),
+            'log_repo_releases': ('release', lambda item: csv_loggers.log_repo_releases(item, 'repo1')),
+            'log_repo_contributors': ('user', lambda item: csv_loggers.log_repo_contributors(item, 'repo1')),
+            'log_repo_events': ('event', lambda item: csv_loggers.log_repo_events(item, 'org1')),
+            'log_org_repos': ('repository', lambda item: csv_loggers.log_org_repos(item, 'org1')),
+            'log_user_repos': ('repository', lambda item: csv_loggers.log_user_repos(item, 'user1')),
+            'log_user_events': ('event', lambda item: csv_loggers.log_user_events(item)),
+            'log_user_gists': ('gist', lambda item: csv_loggers.log_user_gists(item)),
+            'log_user_followers': ('user', lambda item: csv_loggers.log_user_followers(item, 'user1')),
+            'log_user_following': ('user', lambda item: csv_loggers.log_user_following(item, 'user1')),
+            'log_user_subscriptions': ('repository', lambda item: csv_loggers.log_user_subscriptions(item, 'user1')),
+            'log_user_orgs': ('user_org', lambda item: csv_loggers.log_user_orgs(item, 'user1')),
+            'log_users_search': ('user', lambda item: csv_loggers.log_users_search(item, 'query')),
+            'log_repos_search': ('repository', lambda item: csv_loggers.log_repos_search(item, 'query')),
+            'log_topics_search': ('topic', lambda item: csv_loggers.log_topics_search(item, 'query')),
+            'log_issues_search': ('search_issue', lambda item: csv_loggers.log_issues_search(item, 'query')),
+            'log_commits_search': ('commit', lambda item: csv_loggers.log_commits_search(item, 'query'))}
+
+
+def run_benchmarks(count, repeat, selected=None):
+    sys.argv = ['octosuite', '--colors', '--log-to-csv']
+    sys.path.insert(0, root_directory)
+    from rich.console import Console
+    from rich.table import Table
+    from octosuite import schemas
+    from octosuite.columnar import ResultStore
+
+    null_console = Console(file=io.StringIO(), width=120, color_system=None)
+    results = []
+
+    def wanted(name):
+        return selected is None or any(name.startswith(prefix) for prefix in selected)
+
+    trees = entity_trees()
+    for entity, build_tree in trees.items():
+        items = make_items(entity, count)
+        if wanted(f"row:{entity}"):
+            results.append(timed(f"row:{entity}", items, schemas.registry[entity].row, repeat))
+        if wanted(f"store:{entity}"):
+            # Appending to a columnar result store, reported with the store's size in memory
+            store = ResultStore(schemas.registry[entity])
+            result = timed(f"store:{entity}", items, store.append, 1)
+            result['store_bytes'] = store.nbytes()
+            results.append(result)
+        if wanted(f"decode:{entity}"):
+            # A single page holding every item, like a list endpoint's response body
+            page = json.dumps(items).encode()
+            started = time.perf_counter()
+            for _ in range(repeat):
+                json.loads(page)
+            elapsed = (time.perf_counter() - started) / repeat
+            results.append({'name': f"decode:{entity}", 'items': count, 'total_s': round(elapsed, 6),
+                            'per_item_us': round(elapsed / count * 1_000_000, 3)})
+        if wanted(f"tree:{entity}"):
+            results.append(timed(f"tree:{entity}", items, build_tree, repeat))
+        if wanted(f"render_tree:{entity}"):
+            built = [build_tree(item) for item in items]
+            results.append(timed(f"render_tree:{entity}", built, null_console.print, repeat))
+            null_console.file.seek(0)
+            null_console.file.truncate()
+        if wanted(f"render_table:{entity}") and entity != 'event' and entity != 'commit':
+            def render_table(chunk):
+                table = Table(show_header=True)
+                for key in chunk[0]:
+                    table.add_column(key)
+                for item in chunk:
+                    table.add_row(*[str(value) for value in item.values()])
+                null_console.print(table)
+                null_console.file.seek(0)
+                null_console.file.truncate()
+            # Tables are rendered a page (100 rows) at a time, the result is still reported per item
+            chunks = [items[start:start + 100] for start in range(0, count, 100)]
+            result = timed(f"render_table:{entity}", chunks, render_table, repeat)
+            result['items'] = count
+            result['per_item_us'] = round(result['total_s'] / count * 1_000_000, 3)
+            results.append(result)
+
+    with tempfile.TemporaryDirectory() as work_directory, open(os.devnull, 'w') as devnull:
+        previous_directory = os.getcwd()
+        os.chdir(work_directory)
+        try:
+            os.makedirs('output')
+            for writer, (fixture, write) in csv_writers().items():
+                if wanted(f"csv:{writer}"):
+                    items = make_items(fixture, count)
+                    with contextlib.redirect_stdout(devnull):
+                        results.append(timed(f"csv:{writer}", items, write, 1))
+        finally:
+            os.chdir(previous_directory)
+    return results
+
+
+def main(argv=None):
+    from benchmarks.report import save_report, load_report, compare, print_comparison
+
+    parser = argparse.ArgumentParser(description='Octosuite parsing/rendering/CSV export micro-benchmarks')
+    parser.add_argument('--items', type=int, default=10000, help='items per benchmark (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the fastest is kept (default: %(default)s)')
+    parser.add_argument('--only', help='comma separated benchmark name prefixes (eg. decode,csv:log_user_repos)')
+    parser.add_argument('--output', help='report file (default: benchmarks/results/micro-<commit>.json)')
+    parser.add_argument('--save-baseline', action='store_true', dest='save_baseline',
+                        help=f'also save the results as the baseline ({os.path.relpath(baseline_file, root_directory)})')
+    parser.add_argument('--compare', nargs='?', const=baseline_file, metavar='BASELINE',
+                        help='compare the results against a baseline report (default: the saved baseline)')
+    parser.add_argument('--threshold', type=float, default=15, help='regression threshold in percent (default: %(default)s)')
+    arguments = parser.parse_args(argv)
+
+    results = run_benchmarks(arguments.items, arguments.repeat, arguments.only.split(',') if arguments.only else None)
+    for result in results:
+        print(f"{result['name']:<40} {result['per_item_us']:>12.3f} us/item {result['total_s']:>10.4f}s "
+              f"({result['items']} items)")
+
+    filename = save_report('micro', results, arguments.output, metrics=metrics, items=arguments.items)
+    print(f"\nReport saved: {filename}")
+    if arguments.save_baseline:
+        save_report('micro', results, baseline_file, metrics=metrics, items=arguments.items)
+        print(f"Baseline saved: {baseline_file}")
+    if arguments.compare:
+        return print_comparison(compare(load_report(filename), load_report(arguments.compare), metrics,
+                                        arguments.threshold), arguments.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,445 @@
+import re
+import json
+import time
+import base64
+import hashlib
+import functools
+import random
+import argparse
+import datetime
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# mock_github.py
+# A local stand-in for api.github.com used by the benchmarks. Users, organisations, repositories, stargazers,
+# forks (and everything else Octosuite lists) are generated on the fly from their index, so a collection of
+# 100k items costs no memory. Responses are paginated with Link headers like GitHub's, carry X-RateLimit headers
+# and can be slowed down with injected latency.
+#
+#   python -m benchmarks.mock_github --scale 10000 --latency 20 --port 8000
+timestamp = "2023-01-01T00:00:00Z"
+
+
+def url_fields(base, names):
+    # GitHub objects carry dozens of *_url fields, they're included so payload sizes are realistic
+    return {f"{name}_url": f"{base}/{name}" for name in names}
+
+
+def user(index, kind='User'):
+    login = f"user{index}" if kind == 'User' else f"org{index}"
+    base = f"https://api.github.com/users/{login}"
+    return {'login': login, 'id': index, 'node_id': f"MDQ6VXNlcj{index}", 'avatar_url': f"https://avatars.example/{index}",
+            'gravatar_id': '', 'url': base, 'html_url': f"https://github.com/{login}", 'type': kind, 'site_admin': False,
+            **url_fields(base, ['followers', 'following', 'gists', 'starred', 'subscriptions', 'organizations', 'repos',
+                                'events', 'received_events'])}
+
+
+def user_profile(login, index=1):
+    return {**user(index), 'login': login, 'name': login.title(), 'company': f"Company {index % 50}",
+            'blog': f"https://{login}.example", 'location': f"City {index % 200}", 'email': f"{login}@users.example", 'hireable': None,
+            'bio': f"Bio of {login}", 'twitter_username': None, 'public_repos': 30, 'public_gists': 3,
+            'followers': 100, 'following': 10, 'created_at': timestamp, 'updated_at': timestamp}
+
+
+def graphql_user(login, index=1):
+    # user_profile() as GraphQL's User, see octosuite/enrich.py
+    profile = user_profile(login, index)
+    return {'login': login, 'databaseId': profile['id'], 'id': profile['node_id'], 'name': profile['name'],
+            'company': profile['company'], 'location': profile['location'], 'email': profile['email'], 'bio': profile['bio'],
+            'websiteUrl': profile['blog'], 'twitterUsername': None, 'isHireable': False, 'isSiteAdmin': False,
+            'avatarUrl': profile['avatar_url'], 'url': f"https://github.com/{login}", 'createdAt': timestamp,
+            'updatedAt': timestamp, 'followers': {'totalCount': profile['followers']},
+            'following': {'totalCount': profile['following']}, 'repositories': {'totalCount': profile['public_repos']},
+            'gists': {'totalCount': profile['public_gists']}}
+
+
+def org_profile(login, index=1):
+    return {**user(index, 'Organization'), 'login': login, 'name': login.title(), 'description': f"{login} organisation",
+            'email': None, 'blog': f"https://{login}.example", 'location': 'Earth', 'followers': 100, 'following': 0,
+            'twitter_username': None, 'public_gists': 0, 'public_repos': 30, 'is_verified': False,
+            'has_organisation_projects': True, 'has_repository_projects': True, 'created_at': timestamp,
+            'updated_at': timestamp}
+
+
+def repository(index, owner="org1", fork=False):
+    name = f"repo{index}"
+    base = f"https://api.github.com/repos/{owner}/{name}"
+    return {'id': index, 'node_id': f"MDEwOlJlcG9zaXRvcnk{index}", 'name': name, 'full_name': f"{owner}/{name}",
+            'private': False, 'owner': user(index % 1000), 'html_url': f"https://github.com/{owner}/{name}",
+            'description': f"Repository number {index}", 'fork': fork, 'url': base,
+            **url_fields(base, ['forks', 'keys', 'collaborators', 'teams', 'hooks', 'issue_events', 'events',
+                                'assignees', 'branches', 'tags', 'blobs', 'git_tags', 'git_refs', 'trees', 'statuses',
+                                'languages', 'stargazers', 'contributors', 'subscribers', 'subscription', 'commits',
+                                'git_commits', 'comments', 'issue_comment', 'contents', 'compare', 'merges',
+                                'archive', 'downloads', 'issues', 'pulls', 'milestones', 'notifications', 'labels',
+                                'releases', 'deployments']),
+            'created_at': timestamp, 'updated_at': timestamp, 'pushed_at': timestamp,
+            'git_url': f"git://github.com/{owner}/{name}.git", 'ssh_url': f"git@github.com:{owner}/{name}.git",
+            'clone_url': f"https://github.com/{owner}/{name}.git", 'homepage': None, 'size': index % 5000,
+            'stargazers_count': index % 1000, 'watchers_count': index % 1000, 'language': ['Python', 'Go', 'C'][index % 3],
+            'has_issues': True, 'has_projects': True, 'has_downloads': True, 'has_wiki': True, 'has_pages': False,
+            'forks_count': index % 100, 'archived': False, 'disabled': False, 'open_issues_count': index % 10,
+            'license': None, 'allow_forking': True, 'is_template': False, 'topics': ['osint', 'github'],
+            'visibility': 'public', 'forks': index % 100, 'open_issues': index % 10, 'watchers': index % 1000,
+            'default_branch': 'main', 'score': 1.0}
+
+
+def issue(index):
+    return {'id': index, 'node_id': f"I_{index}", 'number': index, 'title': f"Issue {index}",
+            'body': f"Body of issue {index}", 'user': user(index % 1000), 'labels': [], 'state': 'open',
+            'locked': False, 'assignee': None, 'assignees': [], 'milestone': None, 'comments': index % 7,
+            'created_at': timestamp, 'updated_at': timestamp, 'closed_at': None, 'author_association': 'NONE',
+            'active_lock_reason': None, 'draft': False, 'score': 1.0,
+            'reactions': {'total_count': 0, '+1': 0, '-1': 0}}
+
+
+def release(index):
+    return {'id': index, 'node_id': f"RE_{index}", 'tag_name': f"v{index}", 'target_commitish': 'main',
+            'name': f"Release {index}", 'body': f"Notes for release {index}", 'draft': False, 'prerelease': False,
+            'created_at': timestamp, 'published_at': timestamp, 'assets': []}
+
+
+def gist(index, owner):
+    return {'id': f"gist{index}", 'node_id': f"G_{index}", 'description': f"Gist {index}", 'comments': 0,
+            'files': {f"file{index}.txt": {'filename': f"file{index}.txt", 'size': 10}},
+            'git_push_url': f"https://gist.github.com/gist{index}.git", 'public': True, 'truncated': False,
+            'updated_at': timestamp, 'owner': user_profile(owner)}
+
+
+def user_org(index):
+    return {'login': f"org{index}", 'id': index, 'node_id': f"O_{index}", 'url': f"https://api.github.com/orgs/org{index}",
+            'avatar_url': f"https://avatars.example/o{index}", 'description': f"Organisation {index}"}
+
+
+def event(index, actor):
+    return {'id': str(index), 'type': 'PushEvent', 'actor': {'login': actor, 'id': 1},
+            'repo': {'name': f"{actor}/repo{index % 30}"}, 'payload': {'size': 1, 'ref': 'refs/heads/main'},
+            'public': True, 'created_at': timestamp}
+
+
+def topic(index):
+    return {'name': f"topic{index}", 'display_name': f"Topic {index}", 'short_description': None,
+            'created_by': None, 'created_at': timestamp, 'updated_at': timestamp, 'featured': False,
+            'curated': False, 'score': 1.0}
+
+
+def commit(index):
+    sha = f"{index:040x}"
+    return {'sha': sha, 'html_url': f"https://github.com/org1/repo1/commit/{sha}",
+            'commit': {'author': {'name': f"Author {index % 500}", 'email': f"author{index % 500}@example.com",
+                                  'date': timestamp},
+                       'committer': {'name': f"Author {index % 500}", 'email': f"author{index % 500}@example.com",
+                                     'date': timestamp},
+                       'message': f"Commit message {index}", 'tree': {'sha': sha}},
+            'author': user(index % 500), 'committer': user(index % 500), 'repository': repository(1), 'score': 1.0}
+
+
+def content(index, path):
+    name = f"file{index}.py"
+    return {'name': name, 'path': f"{path}/{name}".lstrip('/'), 'sha': f"{index:040x}", 'size': index * 10,
+            'type': 'file', 'html_url': f"https://github.com/org1/repo1/blob/main/{path}/{name}"}
+
+
+# Recursive tree listings with more entries than this are truncated (GitHub's limit is 100,000 entries)
+tree_cap = 1000
+
+
+def blob_content(path):
+    # The same path has the same content in every repository (forks share their blobs)
+    return f"# {path}\n".encode()
+
+
+def blob_sha(content):
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def tree_sha(path):
+    # Trees are named after their path, so they can be looked up from their SHA
+    return ('tree:' + path).encode().hex()
+
+
+@functools.lru_cache(maxsize=8)
+def repository_tree(scale):
+    """
+    The files of every mock repository: a few well-known files and <scale> modules in nested directories
+
+    :return: (directory path -> its entries, blob SHA -> content)
+    """
+    files = ['README.md', 'docker-compose.yml', '.env', '.github/workflows/ci.yml']
+    files += [f"src/pkg{index % 10}/sub{index % 7}/file{index}.py" for index in range(1, scale + 1)]
+    directories = {'': {}}
+    blobs = {}
+    for path in files:
+        parts = path.split('/')
+        for depth in range(1, len(parts)):
+            parent, directory = '/'.join(parts[:depth - 1]), '/'.join(parts[:depth])
+            if directory not in directories:
+                directories[directory] = {}
+                directories[parent][parts[depth - 1]] = {'path': parts[depth - 1], 'mode': '040000', 'type': 'tree',
+                                                         'sha': tree_sha(directory)}
+        content = blob_content(path)
+        blobs[blob_sha(content)] = content
+        directories['/'.join(parts[:-1])][parts[-1]] = {'path': parts[-1], 'mode': '100644', 'type': 'blob',
+                                                        'sha': blob_sha(content), 'size': len(content)}
+    return {directory: list(entries.values()) for directory, entries in directories.items()}, blobs
+
+
+def tree_entries(directories, directory, recursive):
+    prefix = f"{directory}/" if directory else ''
+    for entry in directories[directory]:
+        path = prefix + entry['path']
+        yield {**entry, 'path': path}
+        if recursive and entry['type'] == 'tree':
+            yield from tree_entries(directories, path, True)
+
+
+# (pattern, builder of the index-th item) for paginated list endpoints
+list_routes = [(re.compile(r"^/users/([^/]+)/followers$"), lambda match, index: user(index)),
+               (re.compile(r"^/users/([^/]+)/following$"), lambda match, index: user(index)),
+               (re.compile(r"^/users/([^/]+)/repos$"), lambda match, index: repository(index, match.group(1))),
+               (re.compile(r"^/users/([^/]+)/subscriptions$"), lambda match, index: repository(index)),
+               (re.compile(r"^/users/([^/]+)/gists$"), lambda match, index: gist(index, match.group(1))),
+               (re.compile(r"^/users/([^/]+)/orgs$"), lambda match, index: user_org(index)),
+               (re.compile(r"^/users/([^/]+)/events/public$"), lambda match, index: event(index, match.group(1))),
+               (re.compile(r"^/orgs/([^/]+)/repos$"), lambda match, index: repository(index, match.group(1))),
+               (re.compile(r"^/orgs/([^/]+)/events$"), lambda match, index: event(index, match.group(1))),
+               (re.compile(r"^/repos/([^/]+)/([^/]+)/contributors$"), lambda match, index: user(index)),
+               (re.compile(r"^/repos/([^/]+)/([^/]+)/stargazers$"), lambda match, index: user(index)),
+               (re.compile(r"^/repos/([^/]+)/([^/]+)/forks$"), lambda match, index: repository(index, f"user{index}", True)),
+               (re.compile(r"^/repos/([^/]+)/([^/]+)/issues$"), lambda match, index: issue(index)),
+               (re.compile(r"^/repos/([^/]+)/([^/]+)/releases$"), lambda match, index: release(index)),
+               (re.compile(r"^/repos/([^/]+)/([^/]+)/commits$"), lambda match, index: commit(index))]
+
+# GitHub serves at most this many results of a search, whatever its total_count
+search_cap = 1000
+# Search result <index> was created <index * created_step % created_days> days after created_start
+created_start = datetime.date(2008, 1, 1)
+created_days = 6000
+created_step = 37
+
+
+def search_indices(scale, query):
+    """
+    Indices of the search results matching a query's created:<from>..<to> qualifier (every result without one)
+    """
+    match = re.search(r"created:(\d{4}-\d{2}-\d{2})\.\.(\d{4}-\d{2}-\d{2})", query)
+    if not match:
+        return range(1, scale + 1)
+    first, last = [(datetime.date.fromisoformat(day) - created_start).days for day in match.groups()]
+    return [index for index in range(1, scale + 1) if first <= index * created_step % created_days <= last]
+
+
+search_routes = {'/search/users': user,
+                 '/search/repositories': repository,
+                 '/search/issues': issue,
+                 '/search/commits': commit,
+                 '/search/topics': topic}
+
+
+class MockGitHub(ThreadingHTTPServer):
+    """
+    :param scale: number of items in every list/search collection
+    :param latency: injected latency per request (milliseconds)
+    :param jitter: random extra latency, up to this many milliseconds
+    :param rate_limit: X-RateLimit-Limit budget reported in the headers
+    :param live_events: events endpoints serve new events over time (with ETags and 304s) instead of a fixed list
+    :param poll_interval: X-Poll-Interval of live events
+    """
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), scale=1000, latency=0, jitter=0, rate_limit=5000, live_events=False,
+                 poll_interval=60):
+        super().__init__(address, MockGitHubHandler)
+        self.live_events = live_events
+        self.poll_interval = poll_interval
+        self.started = time.monotonic()
+        self.scale = scale
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.requests = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = self.bytes = 0
+            self.remaining = self.rate_limit
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+class MockGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        self.send_payload(status, json.dumps(body).encode() if body is not None else b'', headers)
+
+    def send_payload(self, status, payload, headers=None, content_type='application/json; charset=utf-8'):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.bytes += len(payload)
+            # Like GitHub, 304 Not Modified isn't charged against the rate limit
+            if status != 304:
+                server.remaining = max(0, server.remaining - 1)
+            remaining = server.remaining
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('X-RateLimit-Limit', str(server.rate_limit))
+        self.send_header('X-RateLimit-Remaining', str(remaining))
+        self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+        self.send_header('X-RateLimit-Resource', 'search' if self.path.startswith('/search/') else
+                         'graphql' if self.path.startswith('/graphql') else 'core')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def page(self, total, builder, query):
+        per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+        page = max(1, int(query.get('page', ['1'])[0]))
+        start = (page - 1) * per_page
+        items = [builder(index) for index in range(start + 1, min(start + per_page, total) + 1)]
+        headers = {}
+        last_page = max(1, -(-total // per_page))
+        if page < last_page:
+            parts = urlsplit(self.path)
+            links = [f'<{self.server.url}{parts.path}?{self.with_page(query, page + 1)}>; rel="next"',
+                     f'<{self.server.url}{parts.path}?{self.with_page(query, last_page)}>; rel="last"']
+            headers['Link'] = ', '.join(links)
+        return items, headers
+
+    def send_events(self, actor, query):
+        # Live events: actors whose login ends with 0 are busy (a new event per second), the others are dormant
+        server = self.server
+        newest = server.scale + (int(time.monotonic() - server.started) if actor.endswith('0') else 0)
+        etag = f'"{actor}-{newest}"'
+        headers = {'ETag': etag, 'X-Poll-Interval': str(server.poll_interval)}
+        if self.headers.get('If-None-Match') == etag:
+            return self.send_json(304, None, headers)
+        per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+        return self.send_json(200, [event(index, actor) for index in range(newest, max(0, newest - per_page), -1)],
+                              headers)
+
+    def send_tree(self, tree, recursive):
+        # A tree SHA, or a branch/tag/commit naming the root tree
+        directories = repository_tree(self.server.scale)[0]
+        try:
+            directory = bytes.fromhex(tree).decode()[len('tree:'):]
+        except ValueError:
+            directory = ''
+        if directory not in directories:
+            return self.send_json(404, {'message': 'Not Found', 'documentation_url': 'https://docs.github.com/rest'})
+        # Paths are relative to the tree listed
+        prefix = len(directory) + 1 if directory else 0
+        entries = [{**entry, 'path': entry['path'][prefix:]} for entry in tree_entries(directories, directory, recursive)]
+        return self.send_json(200, {'sha': tree_sha(directory), 'tree': entries[:tree_cap],
+                                    'truncated': len(entries) > tree_cap})
+
+    @staticmethod
+    def with_page(query, page):
+        return '&'.join(f"{key}={values[0]}" for key, values in {**query, 'page': [str(page)]}.items())
+
+    def do_POST(self):
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep((server.latency + random.uniform(0, server.jitter)) / 1000)
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if urlsplit(self.path).path.rstrip('/') != '/graphql':
+            return self.send_json(404, {'message': 'Not Found', 'documentation_url': 'https://docs.github.com/rest'})
+        if 'Authorization' not in self.headers:
+            return self.send_json(401, {'message': 'This endpoint requires you to be authenticated.'})
+        # Only the aliased user(login: $lN) queries of --enrich: uN is the user of lN, bots aren't Users
+        variables = body.get('variables') or {}
+        return self.send_json(200, {'data': {f"u{name[1:]}": None if login.endswith('[bot]') else graphql_user(login)
+                                             for name, login in variables.items()}})
+
+    def do_GET(self):
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep((server.latency + random.uniform(0, server.jitter)) / 1000)
+        parts = urlsplit(self.path)
+        path, query = parts.path.rstrip('/'), parse_qs(parts.query)
+
+        if path in search_routes:
+            indices = search_indices(server.scale, query.get('q', [''])[0])
+            items, headers = self.page(min(len(indices), search_cap),
+                                       lambda position: search_routes[path](indices[position - 1]), query)
+            return self.send_json(200, {'total_count': len(indices), 'incomplete_results': False, 'items': items},
+                                  headers)
+
+        match = re.match(r"^/(users|orgs)/([^/]+)/events(/public)?$", path)
+        if match and server.live_events:
+            return self.send_events(match.group(2), query)
+
+        # Every commit is made at <timestamp>, so there's nothing newer to list
+        if path.endswith('/commits') and query.get('since', [''])[0] > timestamp:
+            return self.send_json(200, [])
+
+        for pattern, builder in list_routes:
+            match = pattern.match(path)
+            if match:
+                items, headers = self.page(server.scale, lambda index: builder(match, index), query)
+                return self.send_json(200, items, headers)
+
+        match = re.match(r"^/repos/([^/]+)/([^/]+)/git/trees/([^/]+)$", path)
+        if match:
+            return self.send_tree(match.group(3), query.get('recursive', ['0'])[0] not in ('0', 'false'))
+        match = re.match(r"^/repos/([^/]+)/([^/]+)/branches/([^/]+)$", path)
+        if match:
+            # Every mock repository has the same tree, whatever its branch
+            commit = {'sha': f"{0:040x}", 'commit': {'tree': {'sha': tree_sha('')}}}
+            return self.send_json(200, {'name': match.group(3), 'commit': commit})
+        match = re.match(r"^/repos/([^/]+)/([^/]+)/git/blobs/([0-9a-f]{40})$", path)
+        if match:
+            blob = repository_tree(server.scale)[1].get(match.group(3))
+            if blob is not None and 'raw' in self.headers.get('Accept', ''):
+                return self.send_payload(200, blob, content_type='application/vnd.github.raw')
+            if blob is not None:
+                return self.send_json(200, {'sha': match.group(3), 'size': len(blob), 'encoding': 'base64',
+                                            'content': base64.b64encode(blob).decode('ascii')})
+        match = re.match(r"^/repos/([^/]+)/([^/]+)/contents(/.*)?$", path)
+        if match:
+            return self.send_json(200, [content(index, match.group(3) or '') for index in range(1, min(server.scale, 1000) + 1)])
+        match = re.match(r"^/repos/([^/]+)/([^/]+)$", path)
+        if match:
+            return self.send_json(200, {**repository(1, match.group(1)), 'name': match.group(2),
+                                        'full_name': f"{match.group(1)}/{match.group(2)}"})
+        if re.match(r"^/users/[^/]+/following/[^/]+$", path) or re.match(r"^/orgs/[^/]+/public_members/[^/]+$", path):
+            return self.send_json(204, None)
+        match = re.match(r"^/users/([^/]+)$", path)
+        if match:
+            return self.send_json(200, user_profile(match.group(1)))
+        match = re.match(r"^/orgs/([^/]+)$", path)
+        if match:
+            return self.send_json(200, org_profile(match.group(1)))
+        self.send_json(404, {'message': 'Not Found', 'documentation_url': 'https://docs.github.com/rest'})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-in for the GitHub REST API (used by the benchmarks)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--scale', type=int, default=1000, help='items per collection (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0, help='injected latency in milliseconds')
+    parser.add_argument('--jitter', type=float, default=0, help='random extra latency in milliseconds')
+    parser.add_argument('--rate-limit', type=int, default=5000, dest='rate_limit')
+    arguments = parser.parse_args()
+    mock = MockGitHub((arguments.host, arguments.port), scale=arguments.scale, latency=arguments.latency,
+                      jitter=arguments.jitter, rate_limit=arguments.rate_limit)
+    print(f"Serving a mock GitHub API on {mock.url} (scale={arguments.scale})")
+    mock.serve_forever()
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import platform
+import subprocess
+from datetime import datetime
+
+# report.py
+# Machine-readable benchmark reports: every report carries the commit it was taken on,
+# so reports from two commits can be compared and regressions flagged.
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_report(kind, results, filename=None, **details):
+    """
+    Save benchmark results as JSON
+
+    :param kind: benchmark suite ('e2e' or 'micro')
+    :param results: list of result dicts, each identified by its 'name'
+    :param filename: defaults to benchmarks/results/<kind>-<commit>.json
+    :return: the report's filename
+    """
+    commit = current_commit()
+    if filename is None:
+        filename = os.path.join(os.path.dirname(__file__), 'results', f"{kind}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    report = {'kind': kind,
+              'commit': commit,
+              'date': datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(),
+              'platform': platform.platform(),
+              **details,
+              'results': results}
+    with open(filename, 'w') as file:
+        json.dump(report, file, indent=2)
+    return filename
+
+
+def load_report(filename):
+    with open(filename) as file:
+        return json.load(file)
+
+
+def compare(current, baseline, metrics, threshold):
+    """
+    Compare two reports
+
+    :param current: report dict
+    :param baseline: report dict
+    :param metrics: metrics to compare (higher is worse)
+    :param threshold: percentage increase that counts as a regression
+    :return: a list of (name, metric, baseline value, current value, change %, is regression) tuples
+    """
+    baseline_results = {result['name']: result for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        previous = baseline_results.get(result['name'])
+        if previous is None:
+            continue
+        for metric in metrics:
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            rows.append((result['name'], metric, old, new, round(change, 1), change > threshold))
+    return rows
+
+
+def print_comparison(rows, threshold):
+    """
+    Print a comparison and return the process exit code (1 when anything regressed)
+    """
+    regressions = [row for row in rows if row[5]]
+    for name, metric, old, new, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<45} {metric:<22} {old:>14.6g} -> {new:<14.6g} {change:>+8.1f}% {flag}")
+    print(f"\n{len(regressions)} regression(s) above {threshold}%")
+    return 1 if regressions else 0
+
+
+def main_compare(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Compare two benchmark reports')
+    parser.add_argument('current')
+    parser.add_argument('baseline')
+    parser.add_argument('--threshold', type=float, default=10, help='regression threshold in percent (default: %(default)s)')
+    arguments = parser.parse_args(argv)
+    current, baseline = load_report(arguments.current), load_report(arguments.baseline)
+    metrics = current.get('metrics', [])
+    return print_comparison(compare(current, baseline, metrics, arguments.threshold), arguments.threshold)
+
+
+if __name__ == '__main__':
+    sys.exit(main_compare())
@@ -0,0 +1,127 @@
+import os
+import time
+import json
+import base64
+import hashlib
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# cassettes.py
+# This file records HTTP exchanges to disk (--record DIR) and serves them back (--replay DIR),
+# so runs can be reproduced and benchmarked without talking to the live GitHub API.
+# Every url gets its own <sha1>.json file holding the responses seen for it, in order.
+
+# Request headers that are never written to disk
+private_headers = {'authorization', 'cookie'}
+
+cassette_lock = threading.Lock()
+
+
+def cassette_path(directory, url):
+    return os.path.join(directory, f"{hashlib.sha1(url.encode()).hexdigest()}.json")
+
+
+def encode_body(content):
+    try:
+        return {'text': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(content).decode('ascii')}
+
+
+def decode_body(body):
+    if 'base64' in body:
+        return base64.b64decode(body['base64'])
+    return body['text'].encode('utf-8')
+
+
+def record(directory, url, request_headers, response):
+    """
+    Append an exchange to the url's cassette
+
+    :param directory: cassette directory
+    :param url: requested url
+    :param request_headers: headers sent with the request (Authorization/Cookie are dropped)
+    :param response: requests.Response
+    """
+    exchange = {'request': {'method': 'GET',
+                            'url': url,
+                            'headers': {key: value for key, value in request_headers.items()
+                                        if key.lower() not in private_headers}},
+                'response': {'status': response.status_code,
+                             'headers': dict(response.headers),
+                             'body': encode_body(response.content)}}
+    path = cassette_path(directory, url)
+    with cassette_lock:
+        os.makedirs(directory, exist_ok=True)
+        cassette = {'url': url, 'exchanges': []}
+        if os.path.exists(path):
+            with open(path) as file:
+                cassette = json.load(file)
+        cassette['exchanges'].append(exchange)
+        with open(path, 'w') as file:
+            json.dump(cassette, file, indent=1)
+
+
+class Replayer:
+    """
+    Serves recorded responses back. A url recorded several times is replayed in the same order
+    (the last response repeats once they run out), which keeps pagination and polling reproducible.
+
+    :param directory: cassette directory
+    :param latency: simulated latency in milliseconds
+    :param rate_limit: if set, responses carry simulated X-RateLimit-* headers counting down from this budget
+    """
+    def __init__(self, directory, latency=0, rate_limit=None):
+        self.directory = directory
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + 3600
+        self.cursors = {}
+        self.cassettes = {}
+        self.lock = threading.Lock()
+
+    def load(self, url):
+        cassette = self.cassettes.get(url)
+        if cassette is None:
+            path = cassette_path(self.directory, url)
+            if not os.path.exists(path):
+                return None
+            with open(path) as file:
+                cassette = self.cassettes[url] = json.load(file)['exchanges']
+        return cassette
+
+    def get(self, url, headers=None, **kwargs):
+        with self.lock:
+            exchanges = self.load(url)
+            if not exchanges:
+                raise LookupError(f"No recorded response for {url} in {self.directory}")
+            cursor = self.cursors.get(url, 0)
+            self.cursors[url] = cursor + 1
+            exchange = exchanges[min(cursor, len(exchanges) - 1)]['response']
+
+            response_headers = CaseInsensitiveDict(exchange['headers'])
+            status = exchange['status']
+            if headers and headers.get('If-None-Match') and headers['If-None-Match'] == response_headers.get('ETag'):
+                status = 304
+            if self.rate_limit is not None:
+                # Conditional requests answered with 304 are free, like on GitHub
+                if status != 304:
+                    self.remaining = max(0, self.remaining - 1)
+                response_headers['X-RateLimit-Limit'] = str(self.rate_limit)
+                response_headers['X-RateLimit-Remaining'] = str(self.remaining)
+                response_headers['X-RateLimit-Reset'] = str(self.reset_at)
+
+        if self.latency:
+            time.sleep(self.latency / 1000)
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = status
+        response.headers = response_headers
+        response._content = b'' if status == 304 else decode_body(exchange['body'])
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response_headers)
+        response.reason = 'Not Modified' if status == 304 else ''
+        return response
@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# catalog.py
+# This file keeps a small SQLite manifest of every artifact Octosuite writes to the output and .logs folders.
+# csv_loggers and logging record each file as it's written, so csv:view and logs:view can render from the
+# manifest instead of listing (and stat'ing) every file on disk.
+catalog_file = ".catalog.db"
+catalog_lock = threading.Lock()
+catalog_connection = None
+
+# Columns that csv:view and logs:view can be sorted by
+sort_columns = ['name', 'command', 'target', 'rows', 'format', 'size', 'created_at']
+
+
+def connect():
+    """
+    Open (or create) the catalog database.
+    The connection is shared between threads, so every statement runs under catalog_lock.
+    """
+    global catalog_connection
+    if catalog_connection is None:
+        catalog_connection = sqlite3.connect(catalog_file, check_same_thread=False)
+        catalog_connection.execute("PRAGMA journal_mode=WAL")
+        catalog_connection.execute("PRAGMA synchronous=NORMAL")
+        catalog_connection.execute("""CREATE TABLE IF NOT EXISTS artifacts (path TEXT PRIMARY KEY,
+                                                                            directory TEXT,
+                                                                            name TEXT,
+                                                                            command TEXT,
+                                                                            target TEXT,
+                                                                            rows INTEGER,
+                                                                            format TEXT,
+                                                                            size INTEGER,
+                                                                            created_at REAL)""")
+        catalog_connection.execute("CREATE INDEX IF NOT EXISTS artifacts_directory ON artifacts (directory)")
+        catalog_connection.execute("CREATE TABLE IF NOT EXISTS directories (directory TEXT PRIMARY KEY, mtime_ns INTEGER)")
+    return catalog_connection
+
+
+def directory_mtime(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# Remember the directory's mtime after we've changed it ourselves,
+# a mismatch later on means something else touched the directory and the manifest is stale.
+def mark_fresh(connection, directory, mtime_ns=None):
+    connection.execute("INSERT OR REPLACE INTO directories VALUES (?, ?)",
+                       (directory, directory_mtime(directory) if mtime_ns is None else mtime_ns))
+
+
+def recorded_mtime(connection, directory):
+    recorded = connection.execute("SELECT mtime_ns FROM directories WHERE directory = ?", (directory,)).fetchone()
+    return None if recorded is None else recorded[0]
+
+
+# After a change of our own: the manifest stays fresh only if it was fresh before the change,
+# otherwise what else changed in the directory is picked up by the next rebuild.
+def keep_fresh(connection, directory, mtime_before):
+    if mtime_before is not None and recorded_mtime(connection, directory) == mtime_before:
+        mark_fresh(connection, directory)
+
+
+def record_artifact(path, command=None, target=None, rows=None, file_format=None, directory_mtime_before=None):
+    """
+    Record (or update) a file written by Octosuite
+
+    :param path: path of the written file (eg. output/octocat.csv)
+    :param command: the method that produced the file (eg. user_profile)
+    :param target: the user/organisation/repository/query the file is about
+    :param rows: number of data rows in the file
+    :param file_format: file format, defaults to the file's extension
+    :param directory_mtime_before: directory_mtime() of the file's directory before it was written (without it,
+    the directory is rebuilt on its next listing)
+    """
+    path = os.path.normpath(path)
+    directory, name = os.path.split(path)
+    stat = os.stat(path)
+    if file_format is None:
+        file_format = os.path.splitext(name)[1].lstrip('.') or None
+    with catalog_lock:
+        connection = connect()
+        created_at = connection.execute("SELECT created_at FROM artifacts WHERE path = ?", (path,)).fetchone()
+        connection.execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (path, directory, name, command, None if target is None else str(target),
+                            rows, file_format, stat.st_size, created_at[0] if created_at else stat.st_mtime))
+        keep_fresh(connection, directory, directory_mtime_before)
+        connection.commit()
+
+
+# Every target (user, organisation, repository, query) that files were written for
+def list_targets():
+    with catalog_lock:
+        connection = connect()
+        return [target for target, in connection.execute("SELECT DISTINCT target FROM artifacts "
+                                                          "WHERE target IS NOT NULL")]
+
+
+# Refresh the size of a file that keeps growing after it was recorded (eg. the current session's log)
+def update_size(path):
+    path = os.path.normpath(path)
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return
+    with catalog_lock:
+        connection = connect()
+        connection.execute("UPDATE artifacts SET size = ? WHERE path = ?", (size, path))
+        connection.commit()
+
+
+def forget_artifact(path, directory_mtime_before=None):
+    """
+    :param directory_mtime_before: directory_mtime() of the file's directory before it was deleted
+    """
+    directory = os.path.dirname(os.path.normpath(path))
+    with catalog_lock:
+        connection = connect()
+        connection.execute("DELETE FROM artifacts WHERE path = ?", (os.path.normpath(path),))
+        keep_fresh(connection, directory, directory_mtime_before)
+        connection.commit()
+
+
+def forget_directory(directory):
+    with catalog_lock:
+        connection = connect()
+        connection.execute("DELETE FROM artifacts WHERE directory = ?", (os.path.normpath(directory),))
+        connection.execute("DELETE FROM directories WHERE directory = ?", (os.path.normpath(directory),))
+        connection.commit()
+
+
+def is_stale(connection, directory):
+    recorded = recorded_mtime(connection, directory)
+    return recorded is None or recorded != directory_mtime(directory)
+
+
+def rebuild(connection, directory):
+    """
+    Re-sync the manifest with what's actually on disk (one scandir pass).
+    Files we already know about keep their command/target/rows, new ones are added with what the filesystem can tell us,
+    and files that no longer exist are dropped.
+    """
+    # Taken before the scan: anything changing during it makes the directory stale again
+    mtime_ns = directory_mtime(directory)
+    known = {row[0]: row[1] for row in connection.execute("SELECT name, size FROM artifacts WHERE directory = ?",
+                                                          (directory,))}
+    seen = set()
+    if os.path.isdir(directory):
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                seen.add(entry.name)
+                stat = entry.stat()
+                path = os.path.join(directory, entry.name)
+                if entry.name in known:
+                    if known[entry.name] != stat.st_size:
+                        connection.execute("UPDATE artifacts SET size = ? WHERE path = ?", (stat.st_size, path))
+                else:
+                    connection.execute("INSERT INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                       (path, directory, entry.name, None, None, None,
+                                        os.path.splitext(entry.name)[1].lstrip('.') or None, stat.st_size, stat.st_mtime))
+    for name in set(known) - seen:
+        connection.execute("DELETE FROM artifacts WHERE path = ?", (os.path.join(directory, name),))
+    mark_fresh(connection, directory, mtime_ns)
+    connection.commit()
+
+
+def list_artifacts(directory, sort_by='created_at', descending=True, keyword=None):
+    """
+    Return the recorded artifacts of a directory, rebuilding the manifest first if it is stale
+
+    :param directory: directory to list (output or .logs)
+    :param sort_by: one of sort_columns
+    :param descending: sort order
+    :param keyword: only return artifacts whose name, command or target contains this keyword
+    :return: a list of (name, command, target, rows, format, size, created_at) tuples
+    """
+    if sort_by not in sort_columns:
+        raise ValueError(f"Cannot sort by '{sort_by}', choose from: {', '.join(sort_columns)}")
+    directory = os.path.normpath(directory)
+    query = "SELECT name, command, target, rows, format, size, created_at FROM artifacts WHERE directory = ?"
+    parameters = [directory]
+    if keyword:
+        query += " AND (name LIKE ? OR command LIKE ? OR target LIKE ?)"
+        parameters += [f"%{keyword}%"] * 3
+    query += f" ORDER BY {sort_by} {'DESC' if descending else 'ASC'}"
+    with catalog_lock:
+        connection = connect()
+        if is_stale(connection, directory):
+            rebuild(connection, directory)
+        return connection.execute(query, parameters).fetchall()
+
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else ""
@@ -0,0 +1,195 @@
+import sys
+from array import array
+from collections import Counter
+
+# columnar.py
+# A column-oriented store for large result sets (hundreds of thousands of followers, stargazers, search hits...).
+# Only an entity's schema fields are kept (not the full GitHub JSON with its dozens of *_url templates), each in its
+# own column: integers, floats and booleans in typed arrays, strings dictionary-encoded (every distinct value is
+# interned once and rows hold a 4 byte code), anything else (lists, dicts) in a plain list.
+# Rows come back as tuples in schema order, so they can be rendered and exported without rebuilding dicts.
+
+
+def kind_of(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int' if -2 ** 63 <= value < 2 ** 63 else 'object'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, str):
+        return 'str'
+    return 'object'
+
+
+class Column:
+    def __init__(self):
+        # Decided by the first value that isn't None, columns that receive mixed values fall back to 'object'
+        self.kind = None
+        self.data = None
+        # 1 where the row's value is None
+        self.nulls = bytearray()
+        # 'str' columns: code -> string and string -> code
+        self.strings = None
+        self.codes = None
+
+    def __len__(self):
+        return len(self.nulls)
+
+    def start(self, kind):
+        self.kind = kind
+        if kind == 'int':
+            self.data = array('q', bytes(8 * len(self.nulls)))
+        elif kind == 'float':
+            self.data = array('d', bytes(8 * len(self.nulls)))
+        elif kind == 'bool':
+            self.data = array('b', bytes(len(self.nulls)))
+        elif kind == 'str':
+            self.data = array('I', bytes(4 * len(self.nulls)))
+            self.strings = []
+            self.codes = {}
+        else:
+            self.data = [None] * len(self.nulls)
+
+    def to_objects(self):
+        values = list(self)
+        self.kind = 'object'
+        self.data = values
+        self.strings = self.codes = None
+
+    def append(self, value):
+        if value is None:
+            self.nulls.append(1)
+            if self.kind is not None:
+                self.data.append(None if self.kind == 'object' else 0)
+            return
+        kind = kind_of(value)
+        if self.kind is None:
+            self.start(kind)
+        elif kind != self.kind and self.kind != 'object':
+            self.to_objects()
+        self.nulls.append(0)
+        if self.kind == 'str':
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.strings)
+                self.strings.append(sys.intern(value))
+            self.data.append(code)
+        elif self.kind == 'bool':
+            self.data.append(1 if value else 0)
+        else:
+            self.data.append(value)
+
+    def value(self, index, code):
+        if self.nulls[index]:
+            return None
+        if self.kind == 'str':
+            return self.strings[code]
+        if self.kind == 'bool':
+            return bool(code)
+        return code
+
+    def __getitem__(self, index):
+        if self.nulls[index] or self.kind is None:
+            return None
+        return self.value(index, self.data[index])
+
+    def __iter__(self):
+        if self.kind is None:
+            return iter([None] * len(self.nulls))
+        return (self.value(index, code) for index, code in enumerate(self.data))
+
+    def nbytes(self):
+        if self.kind in ('int', 'float', 'bool', 'str'):
+            size = self.data.itemsize * len(self.data)
+            if self.kind == 'str':
+                size += sum(sys.getsizeof(string) for string in self.strings)
+            return size + len(self.nulls)
+        return sys.getsizeof(self.data or []) + len(self.nulls)
+
+
+class ResultStore:
+    def __init__(self, schema):
+        """
+        :param schema: the entity schema (schemas.py) whose rows are stored
+        """
+        self.schema = schema
+        self.keys = schema.keys
+        self.columns = [Column() for _ in self.keys]
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def append(self, item):
+        self.append_row(self.schema.row(item))
+
+    def append_row(self, row):
+        for column, value in zip(self.columns, row):
+            column.append(value)
+
+    def extend(self, items):
+        for item in items:
+            self.append_row(self.schema.row(item))
+
+    def __iter__(self):
+        return zip(*self.columns)
+
+    def __getitem__(self, index):
+        """
+        :return: the row (tuple) at <index>, or a new store holding a slice's rows
+        """
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        return tuple(column[index] for column in self.columns)
+
+    def column(self, key):
+        return self.columns[self.keys.index(key)]
+
+    def take(self, indices):
+        """
+        :return: a new store holding the rows at <indices>, in that order
+        """
+        store = ResultStore(self.schema)
+        for source, target in zip(self.columns, store.columns):
+            for index in indices:
+                target.append(source[index])
+        return store
+
+    def sort(self, key, reverse=False):
+        """
+        :return: a new store sorted by the <key> column, rows where it is None last (objects/lists by their text)
+        """
+        values = [value if not isinstance(value, (list, dict)) else str(value) for value in self.column(key)]
+        present = sorted((index for index, value in enumerate(values) if value is not None),
+                         key=values.__getitem__, reverse=reverse)
+        return self.take(present + [index for index, value in enumerate(values) if value is None])
+
+    def group_by(self, key):
+        """
+        :return: dict of the <key> column's values -> a store of the rows holding that value
+        """
+        groups = {}
+        for index, value in enumerate(self.column(key)):
+            groups.setdefault(value if not isinstance(value, (list, dict)) else str(value), []).append(index)
+        return {value: self.take(indices) for value, indices in groups.items()}
+
+    def count_by(self, key):
+        """
+        :return: Counter of the <key> column's values (counted on the codes for string columns)
+        """
+        column = self.column(key)
+        if column.kind == 'str':
+            counts = Counter(code for code, null in zip(column.data, column.nulls) if not null)
+            result = Counter({column.strings[code]: count for code, count in counts.items()})
+            nulls = column.nulls.count(1)
+            if nulls:
+                result[None] = nulls
+            return result
+        return Counter(value if not isinstance(value, (list, dict)) else str(value) for value in column)
+
+    def records(self):
+        for row in self:
+            yield dict(zip(self.keys, row))
+
+    def nbytes(self):
+        return sum(column.nbytes() for column in self.columns)
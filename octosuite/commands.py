@@ -0,0 +1,178 @@
+# commands.py
+# Command dispatch and tab completion for the interactive session. Commands are looked up in a dict (one lookup per
+# input instead of a scan of every command), and completion candidates (commands, and the logins/organisations/
+# repositories seen during the session or recorded as targets in the catalog) live in a compressed prefix trie, so
+# completing stays instant with tens of thousands of names.
+
+# Schema keys whose values are worth completing (see remember_targets)
+target_keys = {'login', 'full_name', 'actor', 'username', 'repository'}
+
+
+class TrieNode:
+    __slots__ = ('children', 'terminal')
+
+    def __init__(self):
+        # first character of an edge -> (edge label, child node)
+        self.children = {}
+        self.terminal = False
+
+
+class PrefixTrie:
+    """
+    Radix (compressed) trie: chains of single-child nodes are merged into one edge labelled with the whole string
+    """
+    def __init__(self, words=()):
+        self.root = TrieNode()
+        self.size = 0
+        for word in words:
+            self.insert(word)
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, word):
+        node = self.root
+        rest = word
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                child = TrieNode()
+                child.terminal = True
+                node.children[rest[0]] = (rest, child)
+                self.size += 1
+                return
+            label, child = edge
+            common = 1
+            while common < len(label) and common < len(rest) and label[common] == rest[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge where the word leaves it
+                middle = TrieNode()
+                middle.children[label[common]] = (label[common:], child)
+                node.children[rest[0]] = (label[:common], middle)
+                child = middle
+            node = child
+            rest = rest[common:]
+        if not node.terminal:
+            node.terminal = True
+            self.size += 1
+
+    def __contains__(self, word):
+        node = self.root
+        rest = word
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None or not rest.startswith(edge[0]):
+                return False
+            rest = rest[len(edge[0]):]
+            node = edge[1]
+        return node.terminal
+
+    def complete(self, prefix, limit=None):
+        """
+        :param prefix: the text being completed
+        :param limit: stop after collecting this many words
+        :return: sorted words starting with <prefix>
+        """
+        node = self.root
+        path = ""
+        rest = prefix
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                return []
+            label, child = edge
+            if label.startswith(rest):
+                # The prefix ends on this edge
+                path += label
+                node = child
+                break
+            if not rest.startswith(label):
+                return []
+            path += label
+            rest = rest[len(label):]
+            node = child
+
+        # Depth first, smallest edge first, so words come out sorted and a limit keeps the first ones
+        words = []
+        stack = [(path, node)]
+        while stack and (limit is None or len(words) < limit):
+            word, node = stack.pop()
+            if node.terminal:
+                words.append(word)
+            for label, child in sorted(node.children.values(), key=lambda edge: edge[0], reverse=True):
+                stack.append((word + label, child))
+        return words
+
+
+class CommandRegistry(dict):
+    """
+    command name -> method, with the names also kept in a prefix trie for completion
+    """
+    def __init__(self, commands):
+        super().__init__(commands)
+        self.names = PrefixTrie(self)
+
+    def register(self, name, method):
+        self[name] = method
+        self.names.insert(name)
+
+    def complete(self, prefix):
+        return self.names.complete(prefix)
+
+
+# Logins, organisations and repositories seen during the session
+seen_targets = PrefixTrie()
+
+
+def remember_target(value):
+    if not isinstance(value, str) or not value:
+        return
+    seen_targets.insert(value)
+    # owner/repository: the owner and the repository are prompted for separately
+    if '/' in value:
+        for part in value.split('/', 1):
+            if part:
+                seen_targets.insert(part)
+
+
+def remember_targets(schema, row):
+    """
+    Remember an item's completable values (logins, repository names...)
+
+    :param schema: the item's schema (schemas.py)
+    :param row: the item's schema row
+    """
+    for key, value in zip(schema.keys, row):
+        if key in target_keys:
+            remember_target(value)
+
+
+class Completer:
+    def __init__(self, registry, values, prefixes=(), limit=1000):
+        """
+        readline completer: commands at the command prompt, remembered targets at any other prompt
+
+        :param registry: CommandRegistry of the session's commands
+        :param values: PrefixTrie of argument values
+        :param prefixes: prefixes that can come before a command (eg. 'profile:')
+        :param limit: maximum number of candidates offered
+        """
+        self.registry = registry
+        self.values = values
+        self.prefixes = prefixes
+        self.limit = limit
+        # 'command' while the command prompt is shown, 'value' while a command prompts for its arguments
+        self.context = 'command'
+        self.matches = []
+
+    def __call__(self, text, state):
+        # readline asks for the candidates one by one (state 0, 1, 2...) until it gets None
+        if state == 0:
+            if self.context == 'command':
+                prefix = next((prefix for prefix in self.prefixes if text.startswith(prefix)), "")
+                self.matches = [prefix + name for name in self.registry.names.complete(text[len(prefix):],
+                                                                                       limit=self.limit)]
+            else:
+                self.matches = self.values.complete(text, limit=self.limit)
+        return self.matches[state] if state < len(self.matches) else None
@@ -1,6 +1,8 @@
 import os
+import rich
 import psutil
 import platform
+import subprocess
 import argparse
 from rich.tree import Tree
 from rich.text import Text
@@ -9,6 +11,9 @@ from datetime import datetime
 from rich import print as xprint
 from rich.markdown import Markdown
 from rich.prompt import Prompt, Confirm
+from octosuite.catalog import sort_columns
+from octosuite.log_roller import headless_prompt
+from octosuite.log_handlers import target_context
 
 
 def usage():
@@ -35,6 +40,16 @@ def usage():
         -----------------------------
         octosuite --method org_repos --organisation <organisation_name>
 
+
+        Get Organisation Commit Identities (re-runs only scan new commits)
+        ------------------------------------------------------------------
+        octosuite --method org_identities --organisation <organisation_name> --limit 1000 --since 2023-01-01T00:00:00Z
+
+
+        Find Files In Every Repo Of An Organisation Or User (--limit: repos searched)
+        -----------------------------------------------------------------------------
+        octosuite --method org_find_files --organisation <organisation_name> --limit 1000 --match ".env,docker-compose.yml,id_rsa" --match-regex "^[.]github/workflows/"
+
         
         Get Repo Profile Info
         ---------------------
@@ -44,6 +59,14 @@ def usage():
         Get Repo Forks
         --------------
         octosuite --method repo_forks --username <username> --repository <repo_name>
+
+        List every file of a repo (or only the ones matching globs), with directory sizes
+        ---------------------------------------------------------------------------------
+        octosuite --method repo_tree --username <username> --repository <repo_name> --ref <branch> --match "*.yml,.env" --directory-sizes
+
+        Download the files under a path of a repo (blobs already downloaded for any repo are reused)
+        --------------------------------------------------------------------------------------------
+        octosuite --method repo_fetch_path --username <username> --repository <repo_name> --path_name <path/name> --match "*.yml"
         
     
     
@@ -76,12 +99,181 @@ def usage():
 
 
 
+    Offline record/replay
+    =====================
+
+        Record a run
+        ------------
+        octosuite --method <method> --record <directory>
+
+
+        Replay it without network access
+        --------------------------------
+        octosuite --method <method> --replay <directory> --replay-latency 50 --replay-rate-limit 60
+
+
+
+    Streaming
+    =========
+
+        Show (or export) results as they arrive, without reading whole pages first
+        --------------------------------------------------------------------------
+        octosuite --method org_repos --organisation <organisation> --limit 1000 --stream --output ndjson
+
+
+
+    Enrichment
+    ==========
+
+        Full profiles of listed users (name, company, location, email...), 100 per GraphQL query with a token
+        -----------------------------------------------------------------------------------------------------
+        OCTOSUITE_TOKENS=<token> octosuite --method repo_stargazers --username <username> --repository <repo_name> --limit 5000 --enrich
+
+
+
+    Profiling
+    =========
+
+        Profile a method (saved to the profiles folder)
+        -----------------------------------------------
+        octosuite --method <method> --profile --profile-collapsed
+
+
+
+    Request statistics
+    ==================
+
+        Print a summary at the end of the run
+        -------------------------------------
+        octosuite --method <method> --stats --stats-export <metrics.prom>
+
+
+
+    Headless output
+    ===============
+
+        Stream results as JSON lines (or tab separated values) to another program
+        -------------------------------------------------------------------------
+        octosuite --method user_followers --username <username> --limit 1000 --output ndjson | jq .login
+        octosuite --method org_repos --organisation <organisation_name> --output tsv | cut -f1,4
+
+
+
+    Exhaustive searches
+    ===================
+
+        Every repository matching a query, not just the first 1,000
+        -----------------------------------------------------------
+        octosuite --method repos_search --query <query> --exhaustive --limit 100000 --output ndjson
+
+        Split on stars instead of creation dates
+        ----------------------------------------
+        octosuite --method repos_search --query <query> --exhaustive --partition-by stars --limit 100000 --export <repos.csv>
+
+
+
+    Pipelines
+    =========
+
+        Chain commands (each stage streams its results into the next one)
+        -----------------------------------------------------------------
+        octosuite --pipeline "org:repos <organisation_name> | repo:contributors | user:profile" --limit 50
+        octosuite --pipeline <pipeline.yaml> --pipeline-workers 8
+
+
+
+    Batches
+    =======
+
+        Run a method for every target in a file, over 4 processes
+        ---------------------------------------------------------
+        octosuite --method user_profile --targets <usernames.txt> --workers 4 --output ndjson
+
+        Authenticate with tokens (shared out between the processes)
+        -----------------------------------------------------------
+        OCTOSUITE_TOKENS=<token_1>,<token_2> octosuite --method org_repos --targets <organisations.txt> --workers 2
+
+
+
+    Job queues
+    ==========
+
+        Queue a job per target in a shared file
+        ---------------------------------------
+        octosuite --method org_repos --targets <organisations.txt> --queue <jobs.db>
+
+        Work through the queued jobs (run this on as many hosts as you like)
+        --------------------------------------------------------------------
+        octosuite --work <jobs.db> --output ndjson
+
+
+
+    Watching
+    ========
+
+        Stream new events of users as they happen
+        -----------------------------------------
+        octosuite --method watch_user --username <username_1>,<username_2> --output ndjson
+
+        Watch every organisation in a file
+        ----------------------------------
+        octosuite --method watch_org --targets <organisations.txt> --log-to-csv
+
+        Watch a list of users, organisations and repositories (busy targets are polled more often)
+        ------------------------------------------------------------------------------------------
+        octosuite --method watchlist --targets <watchlist.txt> --watch-interval 30 --watch-max-interval 1800
+
+
+
+    Snapshots
+    =========
+
+        Snapshot profiles, showing the ones that changed since the last snapshot
+        ------------------------------------------------------------------------
+        octosuite --method user_profile --targets <usernames.txt> --snapshot
+
+        Show what changed in a user's profile
+        -------------------------------------
+        octosuite --method diff_user --username <username> --limit 20
+
+        Show what changed in a repository
+        ---------------------------------
+        octosuite --method diff_repo --username <username> --repository <repo_name>
+
+
+
+    Daemon
+    ======
+
+        Answer methods over a local HTTP/JSON API
+        -----------------------------------------
+        octosuite --serve 8080
+        curl "http://127.0.0.1:8080/run?method=org_repos&target=<organisation_name>&limit=50"
+
+
+
+    Large result sets
+    =================
+
+        Order, count and export results in one file
+        -------------------------------------------
+        octosuite --method org_repos --organisation <organisation_name> --limit 5000 --order-by stargazers_count --descending
+        octosuite --method user_followers --username <username> --limit 100000 --group-by type --export followers.jsonl
+
+
+
     Log Management
     ==============
 
+        Structured (JSON lines) session logs
+        ------------------------------------
+        octosuite --method <method> --log-format json --log-max-bytes 1048576 --log-max-age 6
+
+
         View logs
         ---------
         octosuite --method view_logs
+        octosuite --method view_logs --sort-by name
 
 
         Read log
@@ -106,6 +298,7 @@ def usage():
         View CSV
         ---------
         octosuite --method view_csv
+        octosuite --method view_csv --sort-by size --filter <keyword>
 
 
         Read CSV
@@ -128,45 +321,144 @@ def create_parser():
     parser = argparse.ArgumentParser(description='OCTOSUITE: Advanced GitHub osint framework  — by Richard Mwewa | https://about.me/rly0nheart', usage=usage())
     parser.add_argument('-m', '--method', help='method', choices=['user_email', 'user_profile', 'user_repos', 'user_gists', 'user_orgs', 'user_events',
                                                                   'user_subscriptions', 'user_following', 'user_followers', 'user_follows',
-                                                                  'org_profile', 'org_repos', 'org_events', 'org_member',
-                                                                  'repo_profile', 'repo_contributors', 'repo_stargazers', 'repo_forks',
+                                                                  'org_profile', 'org_repos', 'org_events', 'org_member', 'org_identities', 'org_find_files', 'watch_user', 'watch_org', 'watchlist', 'diff_user', 'diff_org', 'diff_repo',
+                                                                  'repo_profile', 'repo_tree', 'repo_fetch_path', 'repo_contributors', 'repo_stargazers', 'repo_forks',
                                                                   'repo_issues', 'repo_releases', 'repo_path_contents', 'users_search', 'issues_search',
                                                                   'commits_search', 'topics_search', 'repos_search', 'view_logs', 'read_log', 'delete_log', 
-                                                                  'clear_logs', 'view_csv', 'read_csv', 'delete_csv', 'clear_csv', 'about', 'author'])
+                                                                  'clear_logs', 'view_csv', 'read_csv', 'delete_csv', 'clear_csv', 'stats', 'about', 'author'])
     parser.add_argument('-u', '--username', help='username')
     parser.add_argument('-uB', '--username_b', help='username_B (used with user_follows)')
     parser.add_argument('-o', '--organisation', '--organization', help='organisation name')
     parser.add_argument('-r', '--repository', help='repository name')
-    parser.add_argument('-p', '--path_name', help='path name (used with repo_path_contents)')
+    parser.add_argument('-p', '--path_name', help='path name (used with repo_path_contents and repo_fetch_path)')
+    parser.add_argument('--ref', help='branch, tag or commit to list (used with repo_tree and repo_fetch_path) '
+                                      '(default: the default branch)')
+    parser.add_argument('--match', help='only list the paths matching these comma separated globs, eg. "*.yml,.env" '
+                                        '(a glob without / matches file names at any depth) '
+                                        '(used with repo_tree, repo_fetch_path and org_find_files)')
+    parser.add_argument('--match-regex', help='only list the paths matching this regular expression, can be repeated '
+                                              '(used with repo_tree, repo_fetch_path and org_find_files)',
+                        action='append', dest='match_regex')
+    parser.add_argument('--directory-sizes', help='also show the number of files and bytes under every directory '
+                                                  '(used with repo_tree)', action='store_true', dest='directory_sizes')
     parser.add_argument('-q', '--query', help='query (used with search methods)')
     parser.add_argument('-l', '--limit', help='output limit (used with methods that return results in bulk) (default: %(default)s)', default=10)
     parser.add_argument('-c', '--colors', '--colours', help='specify to run octosuite cli with colo[u]rs enabled', action='store_true')
     parser.add_argument('--csv_file', help='csv file (used with csv management methods)')
     parser.add_argument('--log_file', help='log file (used with logs management methods)')
+    parser.add_argument('--output', help='headless mode: write results to stdout as JSON lines (ndjson) or tab separated '
+                                         'values (tsv) instead of rendering them, without prompting (requires --method, --pipeline or --work)',
+                        choices=['ndjson', 'tsv'])
     parser.add_argument('--log-to-csv', help='log output to a csv file', action='store_true', dest='log_csv')
+    parser.add_argument('--enrich', help='fetch the full profile of every user listed (used with repo_contributors, '
+                                         'repo_stargazers, user_followers, user_following and users_search), in '
+                                         'batched GraphQL queries with a token', action='store_true')
+    parser.add_argument('--snapshot', help='save a hashed snapshot of every profile fetched, and tell what changed since '
+                                           'the last one (see diff_user, diff_org and diff_repo)', action='store_true')
+    parser.add_argument('--log-format', help='session log format (default: %(default)s)', choices=['text', 'json'],
+                        default='text', dest='log_format')
+    parser.add_argument('--log-max-bytes', help='rotate the session log once it reaches this many bytes '
+                                                '(0 to disable) (default: %(default)s)',
+                        type=int, default=10 * 1024 * 1024, dest='log_max_bytes')
+    parser.add_argument('--log-max-age', help='rotate the session log once it is this many hours old '
+                                              '(0 to disable) (default: %(default)s)',
+                        type=float, default=24, dest='log_max_age')
+    parser.add_argument('--log-backups', help='number of rotated (gzipped) session logs to keep (default: %(default)s)',
+                        type=int, default=5, dest='log_backups')
+    parser.add_argument('--stats', help='print request statistics at the end of the run', action='store_true')
+    parser.add_argument('--stats-export', help='also export request statistics (prometheus text format) to this file',
+                        dest='stats_export')
+    parser.add_argument('--profile', help='profile the method and save the stats to the profiles folder', action='store_true')
+    parser.add_argument('--profile-collapsed', help='also sample stacks into a flame graph compatible .collapsed file '
+                                                    '(used with --profile and profile:<command>)',
+                        action='store_true', dest='profile_collapsed')
+    parser.add_argument('--profile-interval', help='stack sampling interval in milliseconds (default: %(default)s)',
+                        type=float, default=5, dest='profile_interval')
+    transport_group = parser.add_mutually_exclusive_group()
+    transport_group.add_argument('--record', help='record every request/response to this directory', metavar='DIR')
+    transport_group.add_argument('--replay', help='serve every request from responses recorded to this directory',
+                                 metavar='DIR')
+    parser.add_argument('--replay-latency', help='simulated latency (milliseconds) of replayed responses (default: %(default)s)',
+                        type=float, default=0, dest='replay_latency')
+    parser.add_argument('--replay-rate-limit', help='add simulated X-RateLimit headers to replayed responses, '
+                                                    'counting down from this budget',
+                        type=int, dest='replay_rate_limit')
+    parser.add_argument('--stream', help='decode the items of list responses one at a time as they arrive, instead of '
+                                         'reading whole pages first (lower memory and time to first result; '
+                                         'faster with pip install octosuite[fast])', action='store_true')
+    parser.add_argument('--pipeline', help="chain commands so one command's results feed the next, "
+                                           "eg. 'org:repos <organisation> | repo:contributors | user:profile', "
+                                           "or a YAML pipeline file")
+    parser.add_argument('--pipeline-workers', help='worker threads per pipeline stage (default: %(default)s)',
+                        type=int, default=4, dest='pipeline_workers')
+    parser.add_argument('--pipeline-queue', help='maximum number of targets queued per pipeline stage '
+                                                 '(default: %(default)s)',
+                        type=int, default=100, dest='pipeline_queue')
+    parser.add_argument('--targets', help='run the --method for every target in this file (one login, organisation, '
+                                          'owner/repository or search query per line)')
+    parser.add_argument('--workers', help='spread the --targets over this many processes (default: %(default)s)',
+                        type=int, default=1)
+    parser.add_argument('--queue', help='queue a job per --targets target for the --method in this (shared) SQLite '
+                                        'file, instead of running them', metavar='FILE')
+    parser.add_argument('--work', help='run the jobs queued in this (shared) SQLite file, alongside any other workers',
+                        metavar='FILE')
+    parser.add_argument('--lease-timeout', help='seconds a worker holds a job before it goes back to the queue '
+                                                '(default: %(default)s)', type=int, default=300, dest='lease_timeout')
+    parser.add_argument('--max-attempts', help='attempts before a job is marked failed (default: %(default)s)',
+                        type=int, default=3, dest='max_attempts')
+    parser.add_argument('--serve', help='keep running and answer methods over a local HTTP/JSON API on this port',
+                        type=int, metavar='PORT')
+    parser.add_argument('--serve-host', help='address --serve listens on (default: %(default)s)', default='127.0.0.1',
+                        dest='serve_host')
+    parser.add_argument('--exhaustive', help='get every result of a search (past the 1,000 results GitHub serves per '
+                                             'query) by splitting it into date/number ranges', action='store_true')
+    parser.add_argument('--partition-by', help='qualifier --exhaustive splits searches on, eg. created, stars, followers '
+                                               '(default: created, author-date for commits)', dest='partition_by')
+    parser.add_argument('--since', help='only scan commits made at/after this time, eg. 2023-01-01T00:00:00Z '
+                                        '(used with org_identities)')
+    parser.add_argument('--until', help='only scan commits made at/before this time, eg. 2023-12-31T23:59:59Z '
+                                        '(used with org_identities)')
+    parser.add_argument('--watch-interval', help='seconds between polls of a watched user/organisation (the shortest '
+                                                 'for a watchlist), at least what GitHub asks for '
+                                                 '(default: %(default)s)', type=int, default=60,
+                        dest='watch_interval')
+    parser.add_argument('--watch-max-interval', help='seconds a quiet target of a watchlist backs off to '
+                                                     '(default: %(default)s)', type=int, default=3600,
+                        dest='watch_max_interval')
+    parser.add_argument('--watch-for', help='stop watching after this many seconds (default: until Ctrl+C)', type=int,
+                        dest='watch_for')
+    parser.add_argument('--export', help='also write all the results to a single .csv or .jsonl file '
+                                         '(used with methods that return results in bulk)', metavar='FILE')
+    parser.add_argument('--order-by', help='show (and export) the results ordered by this field, eg. stargazers_count '
+                                           '(used with methods that return results in bulk)', dest='order_by')
+    parser.add_argument('--descending', help='order the results in descending order (used with --order-by)',
+                        action='store_true')
+    parser.add_argument('--group-by', help='count the results by this field instead of showing them, eg. language '
+                                           '(used with methods that return results in bulk)', dest='group_by')
+    parser.add_argument('--sort-by', help='sort csv/log listings by (used with view_csv and view_logs) (default: %(default)s)',
+                        choices=sort_columns,
+                        default='created_at', dest='sort_by')
+    parser.add_argument('--filter', help='only list csv/log files whose name, command or target contains this keyword '
+                                         '(used with view_csv and view_logs)')
     return parser
 
 
-# Setup readline
-def setup_readline():
+# Setup readline with a completer (see commands.Completer)
+def setup_readline(completer):
     if os.name == "nt":
         try:
             from pyreadline3 import Readline
         except ImportError:
             subprocess.run(['pip3', 'install', 'pyreadline3'], shell=False)
+            from pyreadline3 import Readline
         readline = Readline()
     else:
         import readline
-        
-        def completer(text, state):
-            options = [i for i in commands if i.startswith(text)]
-            if state < len(options):
-                return options[state]
-            else:
-                return None
-                
-        readline.parse_and_bind("tab: complete")
-        readline.set_completer(completer)
+
+    # Commands (user:profile), repositories (owner/name) and logins (with dashes) complete as a whole
+    readline.set_completer_delims(" \t\n")
+    readline.parse_and_bind("tab: complete")
+    readline.set_completer(completer)
 
 
 parser = create_parser()
@@ -188,7 +480,63 @@ first_banner = f"""
             
 """
 
-if args.colors:
+# Headless runs never wait on stdin: a missing argument is an error instead of a question
+class HeadlessPrompt(Prompt):
+    @classmethod
+    def ask(cls, prompt="", **kwargs):
+        raise ValueError(headless_prompt.format(prompt))
+
+
+class HeadlessConfirm(Confirm):
+    @classmethod
+    def ask(cls, prompt="", **kwargs):
+        raise ValueError(headless_prompt.format(prompt))
+
+
+# Interactive sessions: the user/organisation/repository/query a command is given at its prompts is the target its
+# log records carry (like --username/--organisation/--repository/--query in --method runs). Commands tell which
+# prompt asks for which part of the target (target='user', 'organisation', 'owner', 'repository' or 'query').
+class SessionPrompt(Prompt):
+    answers = {}
+
+    @classmethod
+    def start_command(cls):
+        cls.answers = {}
+        target_context.set(None)
+
+    @classmethod
+    def ask(cls, prompt="", target=None, **kwargs):
+        answer = super().ask(prompt, **kwargs)
+        if target is None:
+            return answer
+        cls.answers[target] = answer
+        answers = cls.answers
+        if 'repository' in answers and 'owner' in answers:
+            target_context.set(f"{answers['owner']}/{answers['repository']}")
+        else:
+            target_context.set(answers.get('query') or answers.get('user') or answers.get('organisation')
+                               or answers.get('repository'))
+        return answer
+
+
+Prompt = SessionPrompt
+
+if args.targets and not args.method:
+    parser.error("--targets requires --method")
+if args.queue and not args.targets:
+    parser.error("--queue requires --method and --targets")
+
+if args.output and not args.method and not args.pipeline and not args.work:
+    parser.error("--output requires --method, --pipeline or --work")
+
+if args.output or args.serve:
+    # stdout only carries records, so messages go to stderr, uncoloured, and the banner/colo[u]r question is skipped
+    # (a daemon has no one to ask either)
+    rich.reconfigure(stderr=True, no_color=True, highlight=False)
+    Prompt = HeadlessPrompt
+    Confirm = HeadlessConfirm
+    header_title = red = white = green = red_bold = white_bold = green_bold = reset = yellow = ""
+elif args.colors:
     header_title = "bold white"
     red = "[red]"
     white = "[white]"
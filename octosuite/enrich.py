@@ -0,0 +1,134 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from octosuite import transport
+from octosuite.log_roller import enrich_failed
+
+# enrich.py
+# List endpoints (contributors, stargazers, followers, following, user search) return user stubs: login, id, avatar.
+# With --enrich, the full profile of every user listed is fetched and merged into its stub. With a token, profiles are
+# fetched with GraphQL, up to 100 users (aliased user(login:) fields) per query, so 5,000 stargazers take 50 queries
+# instead of 5,000 requests. Without one (GraphQL requires authentication), or for the logins GraphQL doesn't know
+# (bots), they are fetched from /users/<login> concurrently. Every profile is kept for the rest of the run, a user
+# listed again (by another page, repository or target) isn't fetched twice.
+
+# GraphQL's user fields, returned under the names the REST API gives them (see rest_profile)
+profile_fragment = """
+fragment profile on User {
+  login databaseId id name company location email bio websiteUrl twitterUsername isHireable isSiteAdmin avatarUrl url
+  createdAt updatedAt followers { totalCount } following { totalCount }
+  repositories(privacy: PUBLIC) { totalCount } gists(privacy: PUBLIC) { totalCount }
+}"""
+
+
+def graphql_url(endpoint):
+    # GitHub Enterprise serves the REST API under /api/v3 and GraphQL under /api/graphql
+    if endpoint.endswith('/api/v3'):
+        return f"{endpoint[:-len('/api/v3')]}/api/graphql"
+    return f"{endpoint}/graphql"
+
+
+def batch_query(count):
+    """
+    :return: a query for <count> users, whose logins are the variables l0, l1...
+    """
+    variables = ", ".join(f"$l{index}: String!" for index in range(count))
+    fields = " ".join(f"u{index}: user(login: $l{index}) {{ ...profile }}" for index in range(count))
+    return f"query({variables}) {{ {fields} }}{profile_fragment}"
+
+
+def rest_profile(node):
+    """
+    :param node: a GraphQL User (see profile_fragment)
+    :return: the user as /users/<login> returns it
+    """
+    return {'login': node['login'], 'id': node['databaseId'], 'node_id': node['id'], 'name': node['name'],
+            'company': node['company'], 'location': node['location'], 'email': node['email'] or None,
+            'bio': node['bio'], 'blog': node['websiteUrl'] or '', 'twitter_username': node['twitterUsername'],
+            'hireable': node['isHireable'], 'site_admin': node['isSiteAdmin'], 'avatar_url': node['avatarUrl'],
+            'html_url': node['url'], 'type': 'User', 'created_at': node['createdAt'], 'updated_at': node['updatedAt'],
+            'followers': node['followers']['totalCount'], 'following': node['following']['totalCount'],
+            'public_repos': node['repositories']['totalCount'], 'public_gists': node['gists']['totalCount']}
+
+
+class Enricher:
+    def __init__(self, endpoint, graphql=False, workers=8, batch_size=100):
+        """
+        :param endpoint: API endpoint
+        :param graphql: fetch profiles with GraphQL queries (requires a token)
+        :param workers: requests sent concurrently
+        :param batch_size: users per GraphQL query
+        """
+        self.endpoint = endpoint
+        self.graphql = graphql
+        self.workers = workers
+        self.batch_size = batch_size if graphql else 1
+        # login (lowercase) -> profile, None if it has none (eg. a deleted account)
+        self.profiles = {}
+        self.lock = threading.Lock()
+
+    def fetch_rest(self, logins):
+        found = {}
+        for login in logins:
+            response = transport.get(f"{self.endpoint}/users/{login}")
+            if response.status_code == 200:
+                found[login] = response.json()
+            elif response.status_code != 404:
+                logging.warning(enrich_failed.format(login, f"{response.status_code} {response.text[:200]}"))
+        return found
+
+    def fetch_graphql(self, logins):
+        response = transport.post(graphql_url(self.endpoint),
+                                  json={'query': batch_query(len(logins)),
+                                        'variables': {f"l{index}": login for index, login in enumerate(logins)}})
+        data = response.json().get('data') if response.status_code == 200 else None
+        if data is None:
+            logging.warning(enrich_failed.format(", ".join(logins), f"{response.status_code} {response.text[:200]}"))
+            return self.fetch_rest(logins)
+        found = {login: rest_profile(data[f"u{index}"]) for index, login in enumerate(logins) if data.get(f"u{index}")}
+        # Bots and the like aren't Users to GraphQL
+        found.update(self.fetch_rest([login for login in logins if login not in found]))
+        return found
+
+    def enrich(self, users):
+        """
+        :param users: user stubs
+        :return: the stubs merged with their profiles (a stub as it is if its user has no profile)
+        """
+        with self.lock:
+            missing = list(dict.fromkeys(user['login'] for user in users if user['login'].lower() not in self.profiles))
+        if missing:
+            found = self.fetch_graphql(missing) if self.graphql else self.fetch_rest(missing)
+            with self.lock:
+                for login in missing:
+                    self.profiles[login.lower()] = found.get(login)
+        with self.lock:
+            return [{**user, **(self.profiles.get(user['login'].lower()) or {})} for user in users]
+
+    def enriched(self, users):
+        """
+        Yield the full profiles of <users>, in their order, fetching a few batches ahead concurrently
+
+        :param users: iterator of user stubs (read as the batches go)
+        """
+        users = iter(users)
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < self.workers * 2:
+                    batch = [user for _, user in zip(range(self.batch_size), users)]
+                    if not batch:
+                        exhausted = True
+                        break
+                    pending.append(executor.submit(self.enrich, batch))
+                if not pending:
+                    return
+                yield from pending.popleft().result()
+        finally:
+            # Batches not started yet aren't needed anymore (shutdown's cancel_futures needs Python 3.9)
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
@@ -91,6 +91,8 @@ def org_command():
     org_cmd_table.add_row("repos", "Return a target organisation' repositories")
     org_cmd_table.add_row("events", "Return a target organisation' events")
     org_cmd_table.add_row("member", "Check if a specified user is a public member of the target organisation")
+    org_cmd_table.add_row("identities", "Return the author/committer identities in a target organisation' commits")
+    org_cmd_table.add_row("find_files", "Return the paths matching globs/regexes in every repository of a target organisation (or user)")
 
     syntax = f"{green}org:<command>{reset}"
     xprint(f"{usage_text.format(syntax, 'organisation investigation(s)')}")
@@ -108,6 +110,8 @@ def repo_command():
     repo_cmd_table.add_row("stargazers", "Return a repository's stargazers")
     repo_cmd_table.add_row("contributors", "Return a repository's contributors")
     repo_cmd_table.add_row("path_contents", "List contents in a path of a repository")
+    repo_cmd_table.add_row("fetch_path", "Download the files under a path of a repository (each distinct file once)")
+    repo_cmd_table.add_row("tree", "List every file of a repository in one request (with glob filters and directory sizes)")
 
     syntax = f"{green}repo:<command>{reset}"
     xprint(f"{usage_text.format(syntax, 'repository investigation(s)')}")
@@ -151,6 +155,15 @@ def help_command():
     core_cmd_table.add_row("help", "Help menu")
     core_cmd_table.add_row("exit", "Close session")
     core_cmd_table.add_row("clear", "Clear screen")
+    core_cmd_table.add_row("stats", "Show request statistics for this session")
+    core_cmd_table.add_row("profile:<command>", "Run a command under the profiler")
+    core_cmd_table.add_row("watch:user", "Stream new events of users as they happen")
+    core_cmd_table.add_row("watch:org", "Stream new events of organisations as they happen")
+    core_cmd_table.add_row("watchlist", "Stream new activity of a file of users, organisations and repositories")
+    core_cmd_table.add_row("diff:user", "Show what changed in a user's profile between snapshots (--snapshot)")
+    core_cmd_table.add_row("diff:org", "Show what changed in an organisation's profile between snapshots (--snapshot)")
+    core_cmd_table.add_row("diff:repo", "Show what changed in a repository between snapshots (--snapshot)")
+    core_cmd_table.add_row("pipeline", "Chain commands so one command's results feed the next (or type them with '|')")
     core_cmd_table.add_row("about", "Program's info")
     core_cmd_table.add_row("author", "Developer's info")
 
@@ -0,0 +1,220 @@
+import sys
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from octosuite import transport
+from octosuite.log_roller import repository_scanned, stage_failed
+
+# identities.py
+# org:identities streams the commit history of every (non-fork) repository of an organisation through the commits
+# API, a few repositories at a time, and keeps every author/committer identity (name, email, login) it finds with
+# its commit counts and first/last seen dates. Commits are aggregated as they arrive (nothing holds a repository's
+# history in memory), and each scanned repository is saved to a SQLite checkpoint file along with the identities
+# found in it, so the next run of the same organisation only asks for the commits made since.
+identities_file = ".identities.db"
+
+
+def connect(filename=identities_file):
+    connection = sqlite3.connect(filename, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("""CREATE TABLE IF NOT EXISTS identities (organisation TEXT,
+                                                                 name TEXT,
+                                                                 email TEXT,
+                                                                 login TEXT,
+                                                                 commits INTEGER,
+                                                                 authored INTEGER,
+                                                                 committed INTEGER,
+                                                                 first_seen TEXT,
+                                                                 last_seen TEXT,
+                                                                 PRIMARY KEY (organisation, name, email, login))""")
+    # Repositories an identity was seen in
+    connection.execute("""CREATE TABLE IF NOT EXISTS identity_repositories (organisation TEXT,
+                                                                            name TEXT,
+                                                                            email TEXT,
+                                                                            login TEXT,
+                                                                            repository TEXT,
+                                                                            PRIMARY KEY (organisation, name, email,
+                                                                                         login, repository))""")
+    # Newest commit date scanned per repository
+    connection.execute("""CREATE TABLE IF NOT EXISTS checkpoints (organisation TEXT,
+                                                                  repository TEXT,
+                                                                  scanned_until TEXT,
+                                                                  PRIMARY KEY (organisation, repository))""")
+    return connection
+
+
+class IdentityStats:
+    __slots__ = ('commits', 'authored', 'committed', 'first_seen', 'last_seen')
+
+    def __init__(self):
+        self.commits = self.authored = self.committed = 0
+        self.first_seen = self.last_seen = None
+
+    def add(self, signatures):
+        """
+        Count a commit the identity signed
+
+        :param signatures: (role, date) of each signature ('author' and/or 'committer')
+        """
+        self.commits += 1
+        for role, date in signatures:
+            if role == 'author':
+                self.authored += 1
+            else:
+                self.committed += 1
+            if date:
+                if self.first_seen is None or date < self.first_seen:
+                    self.first_seen = date
+                if self.last_seen is None or date > self.last_seen:
+                    self.last_seen = date
+
+
+def commit_identities(commit):
+    """
+    :return: the (role, (name, email, login), date) of a commit's author and committer
+    """
+    for role in ('author', 'committer'):
+        signature = commit['commit'].get(role) or {}
+        account = commit.get(role) or {}
+        # '' rather than None, so identities without a linked account still collide in the primary key
+        yield role, (signature.get('name') or '', signature.get('email') or '', account.get('login') or ''), \
+            signature.get('date')
+
+
+def next_second(date):
+    # 'since' includes the commits made at that time, which were counted already
+    moment = datetime.strptime(date, "%Y-%m-%dT%H:%M:%SZ") + timedelta(seconds=1)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class IdentityScan:
+    def __init__(self, endpoint, organisation, since=None, until=None, workers=8, filename=identities_file):
+        """
+        :param endpoint: API endpoint
+        :param organisation: organisation whose repositories are scanned
+        :param since: only scan commits made at/after this ISO 8601 time
+        :param until: only scan commits made at/before this ISO 8601 time (a bounded scan: its identities are kept in
+        memory, the checkpoint file is neither used nor updated)
+        :param workers: repositories scanned concurrently
+        :param filename: SQLite checkpoint file
+        """
+        self.endpoint = endpoint
+        self.organisation = organisation
+        self.since = since
+        self.until = until
+        self.workers = workers
+        # Without checkpoints, saving a bounded scan's counts would add the same commits again on every run
+        self.connection = connect(':memory:' if until else filename)
+        self.lock = threading.Lock()
+        self.repositories = 0
+        self.commits = 0
+
+    def checkpoint(self, repository):
+        with self.lock:
+            row = self.connection.execute("SELECT scanned_until FROM checkpoints WHERE organisation = ? "
+                                          "AND repository = ?", (self.organisation, repository)).fetchone()
+        return row[0] if row else None
+
+    def scan(self, repository):
+        """
+        Scan a repository's commits and save the identities found (one transaction with its checkpoint), once the
+        whole listing has been read
+        """
+        since = self.since
+        if not self.until:
+            scanned_until = self.checkpoint(repository)
+            if scanned_until and (since is None or next_second(scanned_until) > since):
+                since = next_second(scanned_until)
+        url = f"{self.endpoint}/repos/{repository}/commits?per_page=100"
+        if since:
+            url += f"&since={since}"
+        if self.until:
+            url += f"&until={self.until}"
+        response = transport.get_list(url)
+        if response.status_code == 409:
+            # Empty repository
+            return
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.status_code} {response.text[:200]}")
+
+        found = {}
+        newest = None
+        count = 0
+        # A page failing midway raises: saving the checkpoint would skip the older commits that weren't read
+        for commit in transport.paginate(response, sys.maxsize, strict=True):
+            count += 1
+            # An identity that authored and committed a commit counts it once
+            signatures = {}
+            for role, identity, date in commit_identities(commit):
+                signatures.setdefault(identity, []).append((role, date))
+            for identity, signed in signatures.items():
+                stats = found.get(identity)
+                if stats is None:
+                    stats = found[identity] = IdentityStats()
+                stats.add(signed)
+            date = commit['commit']['committer'].get('date') if commit['commit'].get('committer') else None
+            if date and (newest is None or date > newest):
+                newest = date
+        self.save(repository, found, newest)
+        with self.lock:
+            self.repositories += 1
+            self.commits += count
+        logging.info(repository_scanned.format(repository, count, len(found)))
+
+    def save(self, repository, found, newest):
+        with self.lock, self.connection:
+            for (name, email, login), stats in found.items():
+                key = (self.organisation, name, email, login)
+                self.connection.execute("""INSERT INTO identities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                           ON CONFLICT (organisation, name, email, login) DO UPDATE SET
+                                           commits = commits + excluded.commits,
+                                           authored = authored + excluded.authored,
+                                           committed = committed + excluded.committed,
+                                           first_seen = MIN(COALESCE(first_seen, excluded.first_seen),
+                                                            COALESCE(excluded.first_seen, first_seen)),
+                                           last_seen = MAX(COALESCE(last_seen, excluded.last_seen),
+                                                           COALESCE(excluded.last_seen, last_seen))""",
+                                        (*key, stats.commits, stats.authored, stats.committed, stats.first_seen,
+                                         stats.last_seen))
+                self.connection.execute("INSERT OR IGNORE INTO identity_repositories VALUES (?, ?, ?, ?, ?)",
+                                        (*key, repository))
+            if not self.until and newest:
+                self.connection.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                                        (self.organisation, repository, newest))
+
+    def run(self):
+        """
+        Scan every non-fork repository of the organisation, a few at a time
+
+        :return: the response listing the organisation's repositories (eg. a 404 if there is no such organisation)
+        """
+        response = transport.get(f"{self.endpoint}/orgs/{self.organisation}/repos?type=sources&per_page=100")
+        if response.status_code != 200:
+            return response
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.scan, repository['full_name']): repository['full_name']
+                       for repository in transport.paginate(response, sys.maxsize) if not repository['fork']}
+            for future, repository in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(stage_failed.format(f"org:identities {repository}", e))
+        return response
+
+    def identities(self, limit=None):
+        """
+        :return: the organisation's identities, most commits first, as dicts
+        """
+        with self.lock:
+            cursor = self.connection.execute(
+                """SELECT identities.name, identities.email, identities.login, commits, authored, committed,
+                          COUNT(identity_repositories.repository), first_seen, last_seen
+                   FROM identities LEFT JOIN identity_repositories USING (organisation, name, email, login)
+                   WHERE identities.organisation = ?
+                   GROUP BY identities.name, identities.email, identities.login
+                   ORDER BY commits DESC LIMIT ?""", (self.organisation, -1 if limit is None else int(limit)))
+            columns = ['name', 'email', 'login', 'commits', 'authored', 'committed', 'repositories', 'first_seen',
+                       'last_seen']
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,189 @@
+import os
+import time
+import sqlite3
+import platform
+import threading
+
+# jobqueue.py
+# A durable job queue in a SQLite file, so several Octosuite processes (on one host or on several hosts sharing the
+# file) can work through one large target list together. A worker leases a job for a while (the visibility
+# timeout), runs it, and acks it. If the worker crashes, the lease expires and the job goes back to the queue for
+# another worker, until it has been attempted max_attempts times.
+# The file needs a filesystem with working locks (SQLite's rollback journal is used, WAL doesn't work across hosts).
+
+# Job states
+queued, leased, done, failed = 'queued', 'leased', 'done', 'failed'
+
+
+def worker_name():
+    return f"{platform.node()}:{os.getpid()}"
+
+
+class JobQueue:
+    def __init__(self, filename, lease_timeout=300, max_attempts=3):
+        """
+        :param filename: SQLite file shared by the workers
+        :param lease_timeout: seconds a leased job stays invisible to other workers
+        :param max_attempts: attempts before a job is marked failed
+        """
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.worker = worker_name()
+        self.lock = threading.Lock()
+        # Autocommit, transactions are opened explicitly (BEGIN IMMEDIATE takes the write lock up front)
+        self.connection = sqlite3.connect(filename, timeout=60, isolation_level=None, check_same_thread=False)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY,
+                                                                    method TEXT,
+                                                                    target TEXT,
+                                                                    state TEXT,
+                                                                    attempts INTEGER,
+                                                                    leased_until REAL,
+                                                                    worker TEXT,
+                                                                    error TEXT,
+                                                                    updated_at REAL,
+                                                                    UNIQUE (method, target))""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, leased_until)")
+
+    def enqueue(self, method, targets):
+        """
+        Add a job per target (targets already queued for the method are skipped)
+
+        :return: number of jobs added
+        """
+        now = time.time()
+        with self.lock:
+            before = self.connection.total_changes
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany("INSERT OR IGNORE INTO jobs VALUES (NULL, ?, ?, ?, 0, NULL, NULL, NULL, ?)",
+                                        [(method, target, queued, now) for target in targets])
+            self.connection.execute("COMMIT")
+            return self.connection.total_changes - before
+
+    def lease(self):
+        """
+        Lease the next queued job, or a job whose lease expired
+
+        :return: (job id, method, target), or None if no job can be leased right now
+        """
+        now = time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases that used up their attempts are given up on
+                self.connection.execute("UPDATE jobs SET state = ?, error = 'lease expired', updated_at = ? "
+                                        "WHERE state = ? AND leased_until < ? AND attempts >= ?",
+                                        (failed, now, leased, now, self.max_attempts))
+                job = self.connection.execute("SELECT id, method, target FROM jobs "
+                                              "WHERE state = ? OR (state = ? AND leased_until < ?) "
+                                              "ORDER BY id LIMIT 1", (queued, leased, now)).fetchone()
+                if job is not None:
+                    self.connection.execute("UPDATE jobs SET state = ?, attempts = attempts + 1, leased_until = ?, "
+                                            "worker = ?, updated_at = ? WHERE id = ?",
+                                            (leased, now + self.lease_timeout, self.worker, now, job[0]))
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+        return job
+
+    def extend(self, job_id):
+        """
+        Push a leased job's timeout back (while it is still being worked on)
+
+        :return: False if the lease was lost (it expired and another worker took the job)
+        """
+        with self.lock:
+            cursor = self.connection.execute("UPDATE jobs SET leased_until = ? WHERE id = ? AND state = ? AND worker = ?",
+                                             (time.time() + self.lease_timeout, job_id, leased, self.worker))
+            return cursor.rowcount == 1
+
+    def ack(self, job_id):
+        """
+        Mark a leased job done
+        """
+        with self.lock:
+            self.connection.execute("UPDATE jobs SET state = ?, leased_until = NULL, updated_at = ? "
+                                    "WHERE id = ? AND state = ? AND worker = ?",
+                                    (done, time.time(), job_id, leased, self.worker))
+
+    def fail(self, job_id, error):
+        """
+        Give a leased job back to the queue, or mark it failed once it used up its attempts
+        """
+        with self.lock:
+            self.connection.execute("UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                                    "leased_until = NULL, error = ?, updated_at = ? "
+                                    "WHERE id = ? AND state = ? AND worker = ?",
+                                    (self.max_attempts, failed, queued, str(error), time.time(), job_id, leased,
+                                     self.worker))
+
+    def counts(self):
+        """
+        :return: dict of state -> number of jobs
+        """
+        with self.lock:
+            return dict(self.connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def next_expiry(self):
+        """
+        :return: seconds until the next lease held by another worker expires, or None if there are no leases
+        """
+        with self.lock:
+            leased_until = self.connection.execute("SELECT MIN(leased_until) FROM jobs WHERE state = ?",
+                                                   (leased,)).fetchone()[0]
+        return None if leased_until is None else max(0.0, leased_until - time.time())
+
+
+class Heartbeat:
+    def __init__(self, job_queue, job_id):
+        """
+        Keeps extending a job's lease while it runs (every third of the lease timeout)
+        """
+        self.job_queue = job_queue
+        self.job_id = job_id
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.beat, daemon=True)
+
+    def beat(self):
+        while not self.stopped.wait(self.job_queue.lease_timeout / 3):
+            if not self.job_queue.extend(self.job_id):
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+
+def work(job_queue, run_job, poll_interval=5):
+    """
+    Lease, run and ack jobs until none are queued or leased
+
+    :param job_queue: JobQueue
+    :param run_job: function(method, target) running one job, raising on failure
+    :param poll_interval: maximum seconds between leases while only other workers' leases are left
+    :return: (jobs done, jobs failed) by this worker
+    """
+    completed = errors = 0
+    while True:
+        job = job_queue.lease()
+        if job is None:
+            # Other workers' leases may still expire (a crashed worker), wait for them before giving up
+            wait = job_queue.next_expiry()
+            if wait is None:
+                return completed, errors
+            time.sleep(min(wait + 0.1, poll_interval))
+            continue
+        job_id, method, target = job
+        try:
+            with Heartbeat(job_queue, job_id):
+                run_job(method, target)
+        except Exception as e:
+            job_queue.fail(job_id, e)
+            errors += 1
+        else:
+            job_queue.ack(job_id)
+            completed += 1
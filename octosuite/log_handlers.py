@@ -0,0 +1,156 @@
+import os
+import gzip
+import json
+import time
+import queue
+import shutil
+import atexit
+import logging
+import copy
+import contextvars
+import logging.handlers
+
+# log_handlers.py
+# This file holds the handlers/formatters used for session logging.
+# Log records are put on a queue by the calling thread and written to disk by a background listener,
+# so network code never waits on log file I/O.
+command_context = contextvars.ContextVar('command', default=None)
+target_context = contextvars.ContextVar('target', default=None)
+
+# Fields that can be attached to a record with logging's extra={...}, and are written out by JsonLinesFormatter
+structured_fields = ['command', 'target', 'url', 'status', 'latency', 'bytes']
+
+text_format = "[%(asctime)s] [%(levelname)s] %(message)s"
+date_format = "%Y-%m-%d %H:%M:%S%p"
+
+queue_listener = None
+exception_formatter = logging.Formatter()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps every record with the command/target currently being run (unless they were passed explicitly).
+    This runs in the thread that made the log call, before the record is handed over to the queue.
+    """
+    def filter(self, record):
+        if getattr(record, 'command', None) is None:
+            record.command = command_context.get()
+        if getattr(record, 'target', None) is None:
+            record.target = target_context.get()
+        return True
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps a record's exception: the stock prepare() folds the traceback into the message and drops
+    exc_info, so the listener's formatter (eg. JsonLinesFormatter's 'exception' field) never sees it.
+    The traceback is formatted here, while exc_info is still around, and handed over as exc_text.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or exception_formatter.formatException(record.exc_info)
+            # Tracebacks can't be pickled (--workers send records between processes)
+            record.exc_info = None
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats a record as a single JSON object per line
+    """
+    def format(self, record):
+        entry = {'time': self.formatTime(record, date_format),
+                 'level': record.levelname,
+                 'message': record.getMessage()}
+        for field in structured_fields:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Formatted before it was queued (see RecordQueueHandler)
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that also rolls over once the current file is older than max_age seconds,
+    and gzips the rotated files (session.log.1.gz, session.log.2.gz, ...).
+    """
+    def __init__(self, filename, max_bytes=0, max_age=0, backup_count=0, on_rotate=None):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.max_age = max_age
+        self.opened_at = time.time()
+        self.on_rotate = on_rotate
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self.compress
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() - self.opened_at >= self.max_age:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.opened_at = time.time()
+
+    def compress(self, source, destination):
+        with open(source, 'rb') as source_file, gzip.open(destination, 'wb') as destination_file:
+            shutil.copyfileobj(source_file, destination_file)
+        os.remove(source)
+        if self.on_rotate:
+            self.on_rotate(destination)
+
+
+def start_queue_logging(filename, log_format='text', max_bytes=0, max_age=0, backup_count=0, on_rotate=None,
+                        level=logging.DEBUG):
+    """
+    Route the root logger through a QueueHandler, with a QueueListener writing to a rotating file in the background
+
+    :param filename: log file for this session
+    :param log_format: 'text' for the classic one-line format, 'json' for JSON lines
+    :param max_bytes: rotate once the file reaches this size (0 disables size-based rotation)
+    :param max_age: rotate once the file is this many seconds old (0 disables time-based rotation)
+    :param backup_count: number of compressed rotated files to keep
+    :param on_rotate: called with the path of every compressed file
+    :param level: root logger level
+    """
+    global queue_listener
+
+    file_handler = CompressingRotatingFileHandler(filename, max_bytes=max_bytes, max_age=max_age,
+                                                  backup_count=backup_count, on_rotate=on_rotate)
+    if log_format == 'json':
+        file_handler.setFormatter(JsonLinesFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter(text_format, datefmt=date_format))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = RecordQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(level)
+
+    queue_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    queue_listener.start()
+    atexit.register(stop_queue_logging)
+    return file_handler
+
+
+# Flush whatever is left on the queue and close the log file
+def stop_queue_logging():
+    global queue_listener
+
+    if queue_listener is not None:
+        queue_listener.stop()
+        for handler in queue_listener.handlers:
+            handler.close()
+        queue_listener = None
@@ -18,4 +18,46 @@ org_not_found = "organisation not found: @{}"
 repo_or_user_not_found = "Repository or User not found: {}, @{}"
 prompt_log_csv = "Would you like to log this output to a .csv file?"
 logged_to_csv = "Output logged: {}"
-limit_output = "Limit '{}' output to how many? (1-100)"
+limit_output = "Limit '{}' output to how many?"
+request_made = "{} {} -> {} ({}ms, {} bytes)"
+page_failed = "Stopped listing at {}: {} {}"
+stats_exported = "Telemetry exported: {}"
+profile_saved = "Profile saved: {}"
+recording_to = "Recording requests to: {}"
+replaying_from = "Replaying requests from: {}"
+headless_prompt = "{} is required with --output (headless mode never prompts)"
+results_collected = "Collected {} {} result(s) ({} bytes in memory)"
+unknown_field = "Unknown field: {} (expected one of: {})"
+stage_failed = "Pipeline stage failed: {} ({})"
+stage_finished = "Pipeline stage finished: {} ({} result(s) from {} target(s))"
+unknown_stage = "Unknown pipeline stage: {} (expected one of: {})"
+stage_needs_input = "Pipeline stage {} has neither a target nor a stage to read from"
+prompt_pipeline = "Pipeline (eg. org:repos <organisation> | repo:contributors | user:profile) or YAML file"
+worker_failed = "Worker {} failed: {}"
+worker_finished = "Worker {} finished ({} target(s))"
+workers_unavailable = "--workers needs processes that can be forked ({} can't): running the targets in this process"
+rate_limit_wait = "Rate limit ({}) nearly used up, waiting {}s for it to reset"
+jobs_queued = "Queued {} job(s) in: {}"
+jobs_worked = "Jobs done: {}, failed: {} (queue: {})"
+job_target_missing = "Target not found: {}"
+job_requests_failed = "{} request(s) failed ({})"
+serving = "Serving on http://{}:{} (Ctrl+C to stop)"
+request_served = "Served {} {} ({} result(s))"
+client_gone = "Client went away during {} {}"
+slice_split = "Search slice {} has {} results, splitting it"
+slice_truncated = "Search {} {} has {} results and can't be split further, only the first {} are served"
+unknown_partition = "Can't split a search on {}: {} searches can be split on {}"
+repository_scanned = "Scanned {}: {} new commit(s), {} identities"
+identities_scanned = "Scanned {} repositories ({} new commit(s)) of {}"
+watching = "Watching {} target(s) for new events (Ctrl+C to stop)"
+watch_failed = "Couldn't poll {} {}: {}"
+snapshot_changed = "{} {} changed: {}"
+no_snapshot = "No snapshot of {} (fetch its profile with --snapshot first)"
+no_changes = "{} hasn't changed since its first snapshot"
+tree_truncated = "The tree of {} ({}) is too large to list in one request, listing it subtree by subtree"
+empty_repository = "{} is empty"
+blob_mismatch = "{} of {} doesn't match its SHA {}"
+fetch_failed = "Couldn't fetch {} of {}: {}"
+enrich_failed = "Couldn't fetch the profile of {}: {}"
+files_found = "Found {} file(s) in {} repositories of {} ({} tree listing(s) reused)"
+path_mirrored = "Mirrored {} file(s) of {} into {} ({} downloaded, the others were stored already)"
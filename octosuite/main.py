@@ -3,50 +3,100 @@ from octosuite.octosuite import *  # I drifted away from the 'pythonic way' here
 
 
 def octosuite():
-    setup_readline()
     try:
         run = Octosuite()
+        configure_output()
         path_finder()
         configure_logging()
+        configure_transport()
+        check_result_fields()
+        if args.serve:
+            serve(args.serve_host, args.serve, run.endpoint, run.argument_map)
+            return
         check_updates()
-        if args.method:
+        if args.queue:
+            enqueue_jobs()
+        elif args.work:
+            command_context.set('work')
+            work_jobs(run)
+            finish_results()
+            output.flush()
+            if args.stats or args.stats_export:
+                show_stats()
+        elif args.pipeline:
+            command_context.set('pipeline')
+            run.pipeline()
+            finish_results()
+            output.flush()
+            if args.stats or args.stats_export:
+                show_stats()
+        elif args.method:
             """
-            Iterate over the argument_map and check if the passed command line argument matches any argument in it [argument_map],
-            if there's a match, we return its method. If no match is found, we do nothing (which will return the usage).
+            Look the passed command line argument up in the argument_map, and run its method.
+            If there's no match, we do nothing (argparse already restricts --method to the known methods).
             """
-            for argument, method in run.argument_map:
-                if args.method == argument:
+            command_context.set(args.method)
+            target_context.set(args.username or args.organisation or args.query)
+            method = run.argument_map.get(args.method)
+            if method is not None:
+                if args.targets and not args.method.startswith('watch'):
+                    run_batch(run, method)
+                elif args.profile:
+                    run_profiled(args.method, method)
+                else:
                     method()
+                if not output.headless():
                     print("\n")
-                else:
-                    pass
+            finish_results()
+            output.flush()
+            if args.stats or args.stats_export:
+                show_stats()
         else:
             """
             Main loop keeps octosuite running, this will break if Octosuite detects a KeyboardInterrupt (Ctrl+C)
             or if the 'exit' command is entered.
             """
+            completer = configure_completion(run)
             xprint(banner()[0], banner()[1])
             while True:
+                completer.context = 'command'
                 command_input = Prompt.ask(f"{white}┌──({red}{getpass.getuser()}{white}@{red}octosuite{white})\n├──[~{green}{os.getcwd()}{white}]\n└╼{reset}")
+                # Commands prompting for their arguments get logins/repositories completed instead
+                completer.context = 'value'
                 """
-                Iterate over the command_map and check if the user input matches any command in it [command_map],
-                if there's a match, we return its method. If no match is found, we ignore it.
+                Look the user input up in the command_map, and run its method.
+                If no match is found, we ignore it.
                 """
                 if command_input[:2] == 'cd':
                     os.chdir(command_input[3:])
                 elif command_input[:2] == 'ls':
                     os.system(f'dir {command_input[3:]}' if os.name == 'nt' else f'ls {command_input[3:]}')
+                elif '|' in command_input:
+                    # Commands chained with '|' run as a pipeline
+                    command_context.set('pipeline')
+                    Prompt.start_command()
+                    run.pipeline(command_input)
+                    print("\n")
                 else:
-                    for command, method in run.command_map:
-                        if command_input == command:
-                            method()
-                            print("\n")
+                    # profile:<command> runs the command under the profiler
+                    profiled = command_input.startswith('profile:')
+                    if profiled:
+                        command_input = command_input[len('profile:'):]
+                    method = run.command_map.get(command_input)
+                    if method is not None:
+                        command_context.set(command_input)
+                        Prompt.start_command()
+                        if profiled:
+                            run_profiled(command_input, method)
                         else:
-                            pass
+                            method()
+                        print("\n")
         
     except KeyboardInterrupt:
         logging.warning(ctrl_c)
         xprint(f"\n{WARNING} {ctrl_c}")
+        if args.stats or args.stats_export:
+            show_stats()
 
     except Exception as e:
         logging.error(error.format(e))
@@ -0,0 +1,105 @@
+import os
+import shutil
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from octosuite import transport
+from octosuite.log_roller import blob_mismatch, fetch_failed
+
+# mirror.py
+# repo:fetch_path downloads the files under a path of a repository (or all of them) into a content-addressed store:
+# every blob is kept once, under its git SHA (downloads/.blobs/ab/cdef...), whichever repositories and forks it was
+# found in, and the repository's layout is written as links into the store (downloads/<owner>/<repository>/<path>).
+# Blobs already in the store aren't downloaded again, so mirroring the files of 500 forks of a project costs little
+# more than mirroring one. Blobs are streamed to disk, and checked against their SHA before they're stored.
+# Repositories are laid out under downloads/<owner>/, the dot keeps the store out of their way (logins can't start
+# with one, an account named 'blobs' can exist)
+blob_store = os.path.join("downloads", ".blobs")
+
+
+def blob_path(sha, store=blob_store):
+    return os.path.join(store, sha[:2], sha[2:])
+
+
+def download_blob(endpoint, repository, entry, store=blob_store):
+    """
+    Save a blob to the store, unless it's there already
+
+    :param entry: the blob's tree entry (see trees.py)
+    :return: True if it was downloaded
+    """
+    path = blob_path(entry['sha'], store)
+    if os.path.exists(path):
+        return False
+    response = transport.get(f"{endpoint}/repos/{repository}/git/blobs/{entry['sha']}", stream=True,
+                             headers={'Accept': 'application/vnd.github.raw+json'})
+    if response.status_code != 200:
+        raise RuntimeError(f"{repository} {entry['path']}: {response.status_code} {response.text[:200]}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Git's blob SHA: of a header and the content
+    digest = hashlib.sha1(b"blob %d\0" % entry['size'])
+    # Other threads/processes may be storing the same blob, the last rename wins (they're the same bytes)
+    partial = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    with open(partial, 'wb') as file:
+        for chunk in transport.counted_chunks(response):
+            digest.update(chunk)
+            file.write(chunk)
+    if digest.hexdigest() != entry['sha']:
+        os.remove(partial)
+        raise RuntimeError(blob_mismatch.format(entry['path'], repository, entry['sha']))
+    os.replace(partial, path)
+    return True
+
+
+def link_file(target, destination):
+    """
+    Point <destination> at a file of the store: a relative symlink, a hard link where symlinks can't be made
+    (eg. Windows without the privilege), or a copy if neither can
+    """
+    if os.path.lexists(destination):
+        os.remove(destination)
+    try:
+        os.symlink(os.path.relpath(target, os.path.dirname(destination)), destination)
+    except OSError:
+        try:
+            os.link(target, destination)
+        except OSError:
+            shutil.copyfile(target, destination)
+
+
+def layout_path(destination, path):
+    """
+    :return: where a repository path goes under <destination>, or None if it would end up outside of it
+    """
+    layout = os.path.normpath(os.path.join(destination, *path.split('/')))
+    return layout if layout.startswith(os.path.normpath(destination) + os.sep) else None
+
+
+def mirror_files(endpoint, repository, entries, destination, workers=8, store=blob_store):
+    """
+    Store the blobs of <entries> and link them into <destination>, downloading each distinct blob once
+
+    :param entries: blob entries of the repository's tree (see trees.py)
+    :return: yields (entry, downloaded) per file, as its blob is stored
+    """
+    # Paths with the same content share a download
+    paths = {}
+    for entry in entries:
+        paths.setdefault(entry['sha'], []).append(entry)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download_blob, endpoint, repository, same[0], store): same
+                   for same in paths.values()}
+        for future in as_completed(futures):
+            try:
+                downloaded = future.result()
+            except Exception as e:
+                logging.error(fetch_failed.format(futures[future][0]['path'], repository, e))
+                continue
+            for position, entry in enumerate(futures[future]):
+                layout = layout_path(destination, entry['path'])
+                if layout is None:
+                    continue
+                os.makedirs(os.path.dirname(layout), exist_ok=True)
+                link_file(blob_path(entry['sha'], store), layout)
+                yield entry, downloaded and position == 0
@@ -2,15 +2,17 @@
 
 import re
 import os
+import glob
 import sys
 import shutil
 import logging
 import getpass
-import requests
 import platform
 import subprocess
 from datetime import datetime
+from contextlib import nullcontext
 from requests.auth import HTTPBasicAuth
+from octosuite import transport, telemetry, output, schemas
 from octosuite.banner import version_tag, banner
 from octosuite.config import Tree, Text, Table, Prompt, Confirm, Markdown, xprint, create_parser, setup_readline, args, red, white, green, yellow, header_title, reset
 from octosuite.message_prefixes import ERROR, WARNING, PROMPT, POSITIVE, NEGATIVE, INFO
@@ -18,12 +20,42 @@ from octosuite.helper import help_command, source_command, search_command, user_
     logs_command, csv_command, org_command, source, org, repo, user, search, logs, csv
 from octosuite.log_roller import ctrl_c, error, session_opened, session_closed, viewing_logs, viewing_csv, \
     deleted, reading, file_downloading, file_downloaded, info_not_found, \
-    user_not_found, org_not_found, repo_or_user_not_found, limit_output, prompt_log_csv
+    user_not_found, org_not_found, repo_or_user_not_found, limit_output, prompt_log_csv, stats_exported, \
+    profile_saved, recording_to, replaying_from, results_collected, unknown_field, prompt_pipeline, \
+    jobs_queued, jobs_worked, identities_scanned, snapshot_changed, no_snapshot, no_changes, empty_repository, \
+    path_mirrored, files_found, workers_unavailable, job_target_missing, job_requests_failed
 from octosuite.csv_loggers import log_org_profile, log_user_profile, log_repo_profile, log_repo_path_contents, \
     log_repo_contributors, log_repo_stargazers, log_repo_forks, log_repo_issues, log_repo_releases, log_org_repos, \
     log_org_profile, log_user_repos, log_user_gists, log_user_orgs, log_user_events, log_user_subscriptions, \
     log_user_following, log_user_followers, log_repos_search, log_users_search, log_topics_search, log_issues_search, \
-    log_commits_search
+    log_commits_search, log_org_identities, log_repo_tree, log_org_files, write_store
+from octosuite.profiler import profile_command
+from octosuite.pipelines import parse_chain, load_pipeline, run_pipeline
+from octosuite.sharding import run_sharded, apply_target, start_context
+from octosuite.jobqueue import JobQueue, work
+from octosuite.server import serve
+from octosuite.partitioning import exhaustive_search, search_paths
+from octosuite.identities import IdentityScan
+from octosuite.snapshots import SnapshotStore
+from octosuite.trees import tree_url, walk_tree, add_size, PathMatcher, TreeCache, find_files
+from octosuite.mirror import mirror_files
+from octosuite.enrich import Enricher
+from octosuite.watch import Watcher, AdaptiveWatcher, WatchTarget, WatchState, read_watchlist
+from octosuite.columnar import ResultStore
+from octosuite.commands import CommandRegistry, Completer, seen_targets, remember_target, remember_targets
+from octosuite.log_handlers import start_queue_logging, command_context, target_context
+from octosuite.catalog import record_artifact, update_size, forget_artifact, forget_directory, list_artifacts, \
+    list_targets, format_timestamp, sort_columns, directory_mtime
+
+# Results kept for --export/--order-by/--group-by: schema name -> columnar ResultStore
+collected_results = {}
+# function(schema, row) rows go to instead, in --workers processes (see sharding.py)
+result_sink = None
+# --snapshot's SnapshotStore, opened on first use
+snapshot_store = None
+user_enricher = None
+# Targets (users, organisations, repositories, paths) commands didn't find, see not_found()
+targets_not_found = 0
 
 
 # path_finder()
@@ -39,14 +71,184 @@ def path_finder():
         os.makedirs(directory, exist_ok=True)
 
 
+# Point the transport at a record/replay directory when asked to
+def configure_transport():
+    tokens = api_tokens()
+    if tokens:
+        transport.use_tokens(tokens)
+    transport.stream_lists = args.stream
+    if args.record:
+        transport.start_recording(args.record)
+        logging.info(recording_to.format(args.record))
+    elif args.replay:
+        transport.start_replaying(args.replay, latency=args.replay_latency, rate_limit=args.replay_rate_limit)
+        logging.info(replaying_from.format(args.replay))
+
+
+# GitHub tokens to authenticate with (comma separated in OCTOSUITE_TOKENS)
+def api_tokens():
+    return [token.strip() for token in os.environ.get('OCTOSUITE_TOKENS', '').split(',') if token.strip()]
+
+
+def read_targets():
+    with open(args.targets) as targets_file:
+        return [line.strip() for line in targets_file if line.strip() and not line.startswith('#')]
+
+
+def snapshots():
+    global snapshot_store
+    if snapshot_store is None:
+        snapshot_store = SnapshotStore()
+    return snapshot_store
+
+
+# With --enrich, the full profiles of listed users (see enrich.py), the users as they are listed otherwise
+def enriched(endpoint, users):
+    global user_enricher
+    if not args.enrich:
+        return users
+    if user_enricher is None:
+        # GraphQL is only served to authenticated requests, and can't be recorded or replayed
+        graphql = bool(transport.tokens) and transport.replayer is None and not transport.recording_directory
+        user_enricher = Enricher(endpoint, graphql=graphql)
+    return user_enricher.enriched(users)
+
+
+# Yield a listing's items, and tell <message> if there were none (a streamed first page is never read twice)
+def report_empty(items, message):
+    empty = True
+    for item in items:
+        empty = False
+        yield item
+    if empty:
+        xprint(f"{NEGATIVE} {message}")
+
+
+# Tell that a command's target doesn't exist (counted, so a --work job that didn't find its target fails)
+def not_found(message):
+    global targets_not_found
+    targets_not_found += 1
+    xprint(f"{NEGATIVE} {message}")
+
+
+# Responses that mean a job didn't get its results, and may on a retry: bad credentials, forbidden (rate limited),
+# too many requests and server errors
+def failed_requests(statuses_before):
+    """
+    :param statuses_before: telemetry.statuses copied before the job ran
+    :return: dict of status -> failing responses received since
+    """
+    return {status: count - statuses_before.get(status, 0) for status, count in dict(telemetry.statuses).items()
+            if (status in (401, 403, 429) or status >= 500) and count > statuses_before.get(status, 0)}
+
+
+# A listed user, with its profile's fields if it was enriched
+def show_user(user):
+    show_item(schemas.listed_user(user), user)
+
+
+# With --snapshot, save a fetched profile and tell what changed since its last snapshot (see snapshots.py)
+def take_snapshot(entity, target, item):
+    if not args.snapshot:
+        return
+    changes = snapshots().record(entity, target, item)
+    if changes:
+        message = snapshot_changed.format(entity, target, ", ".join(field for field, _, _ in changes))
+        logging.info(message)
+        if not output.headless():
+            xprint(f"{INFO} {message}")
+
+
+# Show a new event (or issue activity) of a watched target
+def emit_watched(target, item):
+    show_item(target.schema, item)
+    # Streamed: don't leave events sitting in the output buffer
+    output.flush()
+    if args.log_csv and target.schema is schemas.event:
+        log_user_events(item)
+
+
+# Run the --method for every target in the --targets file, spread over --workers processes
+def run_batch(run, method):
+    targets = read_targets()
+    if args.workers > 1 and start_context() is None:
+        logging.warning(workers_unavailable.format(platform.system()))
+    elif args.workers > 1:
+        run_sharded(targets, args.workers, run.endpoint, api_tokens(),
+                    lambda name, row: present(schemas.registry[name], row))
+        return
+    for target in targets:
+        target_context.set(target)
+        apply_target(args.method, target)
+        method()
+
+
+# Queue a job per target of the --targets file for the --method (see jobqueue.py)
+def enqueue_jobs():
+    job_queue = JobQueue(args.queue, lease_timeout=args.lease_timeout, max_attempts=args.max_attempts)
+    added = job_queue.enqueue(args.method, read_targets())
+    logging.info(jobs_queued.format(added, args.queue))
+    xprint(f"{INFO} {jobs_queued.format(added, args.queue)}")
+
+
+# Work through the jobs of a shared queue file (--work), alongside any other workers on this or other hosts
+def work_jobs(run):
+    job_queue = JobQueue(args.work, lease_timeout=args.lease_timeout, max_attempts=args.max_attempts)
+
+    def run_job(method_name, target):
+        args.method = method_name
+        command_context.set(method_name)
+        target_context.set(target)
+        apply_target(method_name, target)
+        # Commands print their errors rather than raise them: the job fails (and is retried once its attempt is
+        # given back) if its target wasn't found or any of its requests failed
+        missing_before = targets_not_found
+        statuses_before = dict(telemetry.statuses)
+        run.argument_map[method_name]()
+        if targets_not_found > missing_before:
+            raise RuntimeError(job_target_missing.format(target))
+        failures = failed_requests(statuses_before)
+        if failures:
+            raise RuntimeError(job_requests_failed.format(
+                sum(failures.values()), ", ".join(f"{status}: {count}" for status, count in sorted(failures.items()))))
+
+    completed, errors = work(job_queue, run_job)
+    logging.info(jobs_worked.format(completed, errors, job_queue.counts()))
+    xprint(f"{INFO} {jobs_worked.format(completed, errors, job_queue.counts())}")
+
+
 # Configure logging to log user activities
 def configure_logging():
+    global session_log_file
+
     now = datetime.now()
     now_formatted = now.strftime("%Y-%m-%d %H-%M-%S%p")
-    logging.basicConfig(filename=f".logs/{now_formatted}.log", format="[%(asctime)s] [%(levelname)s] %(message)s",
-                        datefmt="%Y-%m-%d %H:%M:%S%p", level=logging.DEBUG)
+    session_log_file = os.path.join(".logs", f"{now_formatted}.log")
+    # Log records are queued and written by a background thread, rotated by size/age and gzipped
+    start_queue_logging(session_log_file, log_format=args.log_format, max_bytes=args.log_max_bytes,
+                        max_age=args.log_max_age * 3600, backup_count=args.log_backups,
+                        on_rotate=record_rotated_logs)
     # Log the start of a session
     logging.info(session_opened.format(platform.node(), getpass.getuser()))
+    record_artifact(session_log_file, command='session', target=f"{getpass.getuser()}@{platform.node()}",
+                    file_format='log')
+
+
+# Record the session's rotated logs in the catalog,
+# older backups get renamed (.1.gz -> .2.gz) on every rollover so they are all re-recorded.
+def record_rotated_logs(rotated_log):
+    for backup in glob.glob(f"{glob.escape(session_log_file)}.*.gz"):
+        record_artifact(backup, command='session', target=f"{getpass.getuser()}@{platform.node()}",
+                        file_format='log.gz')
+
+
+# Tab completion for the interactive session: commands, and the targets seen in this session or catalogued before
+def configure_completion(run):
+    for target in list_targets():
+        remember_target(target)
+    completer = Completer(run.command_map, seen_targets, prefixes=('profile:',))
+    setup_readline(completer)
+    return completer
 
 
 # Check if the remote tag_name from the latest release matches the one in the program
@@ -55,7 +257,7 @@ def configure_logging():
 def check_updates():
     global markdown_release_notes
     
-    response = requests.get("https://api.github.com/repos/bellingcat/octosuite/releases/latest").json()
+    response = transport.get("https://api.github.com/repos/bellingcat/octosuite/releases/latest").json()
     if response['tag_name'] == version_tag:
         pass
     else:
@@ -75,7 +277,9 @@ def delete_csv():
         csv_file = args.csv_file
     else:
         csv_file = Prompt.ask(f"{green}.csv {white}(filename){reset}")
+    mtime_before = directory_mtime("output")
     os.remove(os.path.join("output", csv_file))
+    forget_artifact(os.path.join("output", csv_file), directory_mtime_before=mtime_before)
     logging.info(deleted.format(csv_file))
     xprint(f"{POSITIVE} {deleted.format(csv_file)}")
 
@@ -85,21 +289,43 @@ def clear_csv():
     clear_csv_prompt = Confirm.ask(f"{PROMPT} This will clear all {len(os.listdir('output'))} csv files, continue?")
     if clear_csv_prompt:
         shutil.rmtree('output', ignore_errors=True)
+        forget_directory('output')
         xprint(f"{INFO} csv files cleared successfully!")
     else:
         pass
 
 
+# Ask how a csv:view/logs:view listing should be sorted and filtered
+def listing_options():
+    if args.method:
+        return args.sort_by, args.filter
+    sort_by = Prompt.ask(f"{green}Sort by{reset}", choices=sort_columns, default=args.sort_by)
+    keyword = Prompt.ask(f"{green}Filter{white} (name, command or target){reset}", default=args.filter or "")
+    return sort_by, keyword
+
+
+# Render artifacts recorded in the catalog as a table
+def artifacts_table(directory, title):
+    sort_by, keyword = listing_options()
+    artifacts_table = Table(show_header=True, header_style=header_title)
+    artifacts_table.add_column(title, style="dim")
+    artifacts_table.add_column("Command")
+    artifacts_table.add_column("Target")
+    artifacts_table.add_column("Rows")
+    artifacts_table.add_column("Format")
+    artifacts_table.add_column("Size (bytes)")
+    artifacts_table.add_column("Created at")
+    for name, command, target, rows, file_format, size, created_at in list_artifacts(directory, sort_by=sort_by,
+                                                                                     keyword=keyword):
+        artifacts_table.add_row(name, command or "", target or "", "" if rows is None else str(rows),
+                                file_format or "", str(size), format_timestamp(created_at))
+    return artifacts_table
+
+
 # View csv files
 def view_csv():
     logging.info(viewing_csv)
-    csv_files = os.listdir("output")
-    csv_table = Table(show_header=True, header_style=header_title)
-    csv_table.add_column("CSV", style="dim")
-    csv_table.add_column("Size (bytes)")
-    for csv_file in csv_files:
-        csv_table.add_row(str(csv_file), str(os.path.getsize("output/" + csv_file)))
-    xprint(csv_table)
+    xprint(artifacts_table("output", "CSV"))
 
 
 # Read csv
@@ -117,13 +343,9 @@ def read_csv():
 # View logs
 def view_logs():
     logging.info(viewing_logs)
-    logs = os.listdir(".logs")
-    logs_table = Table(show_header=True, header_style=header_title)
-    logs_table.add_column("Log", style="dim")
-    logs_table.add_column("Size (bytes)")
-    for log in logs:
-        logs_table.add_row(str(log), str(os.path.getsize(".logs/" + log)))
-    xprint(logs_table)
+    # The current session's log keeps growing after it was recorded
+    update_size(session_log_file)
+    xprint(artifacts_table(".logs", "Log"))
 
 
 # Read log
@@ -143,7 +365,9 @@ def delete_log():
         log_file = args.log_file
     else:
         log_file = Prompt.ask(f"{green}.log date{white} (eg. 2022-04-27 10:09:36AM){reset}")
+    mtime_before = directory_mtime(".logs")
     os.remove(os.path.join(".logs", log_file))
+    forget_artifact(os.path.join(".logs", log_file), directory_mtime_before=mtime_before)
     logging.info(deleted.format(log_file))
     xprint(f"{POSITIVE} {deleted.format(log_file)}")
 
@@ -153,6 +377,7 @@ def clear_logs():
     clear_logs_prompt = Confirm.ask(f"{PROMPT} This will clear all {len(os.listdir('output'))} log files and close the current session, continue?")
     if clear_logs_prompt:
         shutil.rmtree('.logs', ignore_errors=True)
+        forget_directory('.logs')
         xprint(f"{INFO} .log files cleared successfully!")
         exit()
     else:
@@ -164,12 +389,169 @@ def exit_session():
     exit_prompt = Confirm.ask(f"{PROMPT} This will close the current session, continue?")
     if exit_prompt:
         logging.info(session_closed.format(datetime.now()))
+        update_size(session_log_file)
+        if args.stats or args.stats_export:
+            show_stats()
         xprint(f"{INFO} {session_closed.format(datetime.now())}")
         exit()
     else:
         pass
 
 
+# Show the session's request telemetry
+def show_stats():
+    stats = telemetry.summary()
+    xprint(f"{INFO} {stats['requests']} request(s), {stats['bytes']} bytes in {round(stats['elapsed'], 2)}s "
+           f"(cache: {stats['cache']['hits']} hit(s), {stats['cache']['misses']} miss(es))")
+
+    endpoints_table = Table(show_header=True, header_style=header_title)
+    endpoints_table.add_column("Endpoint", style="dim")
+    endpoints_table.add_column("Requests")
+    endpoints_table.add_column("Bytes")
+    endpoints_table.add_column("p50 (ms)")
+    endpoints_table.add_column("p95 (ms)")
+    endpoints_table.add_column("p99 (ms)")
+    endpoints_table.add_column("Status codes")
+    for endpoint in stats['endpoints']:
+        endpoints_table.add_row(endpoint['endpoint'], str(endpoint['count']), str(endpoint['bytes']),
+                                str(endpoint['p50']), str(endpoint['p95']), str(endpoint['p99']),
+                                ", ".join(f"{status}: {count}" for status, count in endpoint['statuses'].items()))
+    xprint(endpoints_table)
+
+    rate_limit_table = Table(show_header=True, header_style=header_title)
+    rate_limit_table.add_column("Rate limit", style="dim")
+    rate_limit_table.add_column("Remaining")
+    rate_limit_table.add_column("Limit")
+    rate_limit_table.add_column("Resets at")
+    for resource, budget in stats['rate_limit'].items():
+        rate_limit_table.add_row(resource, str(budget['remaining']), str(budget['limit']),
+                                 str(datetime.fromtimestamp(budget['reset'])))
+    xprint(rate_limit_table)
+
+    if args.stats_export:
+        telemetry.export_prometheus(args.stats_export)
+        xprint(f"{POSITIVE} {stats_exported.format(args.stats_export)}")
+
+
+# Run a command under the profiler and print where its time went
+def run_profiled(name, method):
+    profile = profile_command(name, method, collapsed=args.profile_collapsed, interval=args.profile_interval / 1000)
+    phases_table = Table(show_header=True, header_style=header_title)
+    phases_table.add_column("Phase", style="dim")
+    phases_table.add_column("Time (s)")
+    phases_table.add_column("Share")
+    for phase, seconds in profile['phases']:
+        phases_table.add_row(phase, str(round(seconds, 4)),
+                             f"{round(seconds / profile['elapsed'] * 100, 1) if profile['elapsed'] else 0}%")
+    xprint(f"\n{INFO} {name} took {round(profile['elapsed'], 4)}s")
+    xprint(phases_table)
+    for file in profile['files']:
+        logging.info(profile_saved.format(file))
+        xprint(f"{POSITIVE} {profile_saved.format(file)}")
+
+
+# Show an item as a Tree of its schema's fields, or keep it for --export/--order-by/--group-by
+def show_item(schema, item):
+    present(schema, schema.row(item))
+
+
+# --match globs and --match-regex patterns, None without any
+def path_matcher(globs=None):
+    globs = args.match if globs is None else globs
+    regexes = args.match_regex or []
+    if not globs and not regexes:
+        return None
+    return PathMatcher([glob.strip() for glob in (globs or '').split(',') if glob.strip()], regexes)
+
+
+# --order-by/--group-by fields: checked against every schema before anything is fetched (a method's schema isn't
+# known until its first result), then against the schema of each result as soon as the first one is collected
+def check_result_fields(schema=None):
+    if schema is None:
+        keys = sorted({key for known in schemas.registry.values() for key in known.keys})
+    else:
+        keys = schema.keys
+    for field in (args.order_by, args.group_by):
+        if field and field not in keys:
+            raise ValueError(unknown_field.format(field, ", ".join(keys)))
+
+
+# Remember, collect (--export/--order-by/--group-by) or show a schema row
+def present(schema, row):
+    if result_sink is not None:
+        result_sink(schema, row)
+        return
+    if not args.method:
+        # Logins/repositories seen in the interactive session can be tab-completed at later prompts
+        remember_targets(schema, row)
+    if (args.method or args.pipeline) and (args.export or args.order_by or args.group_by):
+        store = collected_results.get(schema.name)
+        if store is None:
+            check_result_fields(schema)
+            store = collected_results[schema.name] = ResultStore(schema)
+        store.append_row(row)
+        # Ordered/grouped results are shown once all of them have been collected
+        if args.order_by or args.group_by:
+            return
+    show_row(schema, row)
+
+
+# Show a schema row as a Tree (followed by its text, eg. an issue's body),
+# or as a single ndjson/tsv record in headless mode
+def show_row(schema, row):
+    if output.headless():
+        output.write_record(schema.record(row))
+    else:
+        xprint(schema.tree(row))
+        if schema.text:
+            xprint(row[-1])
+
+
+# Order, count and export the results collected during a --method run
+def finish_results():
+    for name, store in collected_results.items():
+        logging.info(results_collected.format(len(store), name, store.nbytes()))
+        if args.order_by:
+            store = store.sort(args.order_by, reverse=args.descending)
+            for row in store:
+                show_row(store.schema, row)
+        if args.group_by:
+            counts = store.count_by(args.group_by).most_common()
+            if output.headless():
+                for value, count in counts:
+                    output.write_record({args.group_by: value, 'count': count})
+            else:
+                counts_table = Table(show_header=True, header_style=header_title)
+                counts_table.add_column(args.group_by, style="dim")
+                counts_table.add_column("Count")
+                for value, count in counts:
+                    counts_table.add_row(str(value), str(count))
+                xprint(counts_table)
+        if args.export:
+            export_file = args.export
+            if len(collected_results) > 1:
+                root, extension = os.path.splitext(args.export)
+                export_file = f"{root}_{name}{extension}"
+            write_store(export_file, store, command=args.method or 'pipeline',
+                        target=args.username or args.organisation or args.query or args.pipeline)
+    collected_results.clear()
+
+
+# Log an item to a csv file? Always with --log-to-csv, otherwise ask (headless runs never ask)
+def csv_wanted():
+    if args.log_csv:
+        return True
+    if output.headless() or result_sink is not None:
+        return False
+    return Confirm.ask(f"\n{PROMPT} {prompt_log_csv}")
+
+
+# Send results to stdout instead of rendering them (--output)
+def configure_output():
+    if args.output:
+        output.start(args.output)
+
+
 # Clear screen
 def clear_screen():
     # Using 'cls' on Windows machines to clear the screen,
@@ -192,15 +574,15 @@ GitHub REST API documentation: https://docs.github.com/rest
 
 
 def get_email_from_contributor(username, repo, contributor):
-    response = requests.get(f"https://github.com/{username}/{repo}/commits?author={contributor}",
-                            auth=HTTPBasicAuth(username, '')).text
+    response = transport.get(f"https://github.com/{username}/{repo}/commits?author={contributor}",
+                             auth=HTTPBasicAuth(username, '')).text
     latest_commit = re.search(rf'href="/{username}/{repo}/commit/(.*?)"', response)
     if latest_commit:
         latest_commit = latest_commit.group(1)
     else:
         latest_commit = 'dummy'
-    commit_details = requests.get(f"https://github.com/{username}/{repo}/commit/{latest_commit}.patch",
-                                  auth=HTTPBasicAuth(username, '')).text
+    commit_details = transport.get(f"https://github.com/{username}/{repo}/commit/{latest_commit}.patch",
+                                   auth=HTTPBasicAuth(username, '')).text
     email = re.search(r'<(.*)>', commit_details)
     if email:
         email = email.group(1)
@@ -212,299 +594,124 @@ class Octosuite:
         # API endpoint
         self.endpoint = 'https://api.github.com'
 
-        # A list of tuples mapping commands to their methods
-        self.command_map = [('ls', list_dir_and_files),
-                            ("exit", exit_session),
-                            ("clear", clear_screen),
-                            ("about", about),
-                            ("author", self.author),
-                            ("help", help_command),
-                            ("help:source", source_command),
-                            ("help:search", search_command),
-                            ("help:user", user_command),
-                            ("help:repo", repo_command),
-                            ("help:logs", logs_command),
-                            ("help:csv", csv_command),
-                            ("help:org", org_command),
-                            ("source", source),
-                            ("source:tarball", self.download_tarball),
-                            ("source:zipball", self.download_zipball),
-                            ("org", org),
-                            ("org:events", self.org_events),
-                            ("org:profile", self.org_profile),
-                            ("org:repos", self.org_repos),
-                            ("org:member", self.org_member),
-                            ("repo", repo),
-                            ("repo:path_contents", self.path_contents),
-                            ("repo:profile", self.repo_profile),
-                            ("repo:contributors", self.repo_contributors),
-                            ("repo:stargazers", self.repo_stargazers),
-                            ("repo:forks", self.repo_forks),
-                            ("repo:issues", self.repo_issues),
-                            ("repo:releases", self.repo_releases),
-                            ("user", user),
-                            ("user:email", self.get_user_email),
-                            ("user:repos", self.user_repos),
-                            ("user:gists", self.user_gists),
-                            ("user:orgs", self.user_orgs),
-                            ("user:profile", self.user_profile),
-                            ("user:events", self.user_events),
-                            ("user:followers", self.user_followers),
-                            ("user:follows", self.user_follows),
-                            ("user:following", self.user_following),
-                            ("user:subscriptions", self.user_subscriptions),
-                            ("search", search),
-                            ("search:users", self.users_search),
-                            ("search:repos", self.repos_search),
-                            ("search:topics", self.topics_search),
-                            ("search:issues", self.issues_search),
-                            ("search:commits", self.commits_search),
-                            ("logs", logs),
-                            ("logs:view", view_logs),
-                            ("logs:read", read_log),
-                            ("logs:delete", delete_log),
-                            ("logs:clear", clear_logs),
-                            ("csv", csv),
-                            ("csv:view", view_csv),
-                            ("csv:read", read_csv),
-                            ("csv:delete", delete_csv),
-                            ("csv:clear", clear_csv)]
-
-        # Arguments map will be used to run Octosuite with argparse
-        self.argument_map = [("user_profile", self.user_profile),
-                             ("user_email", self.get_user_email),
-                             ("user_repos", self.user_repos),
-                             ("user_gists", self.user_gists),
-                             ("user_orgs", self.user_orgs),
-                             ("user_events", self.user_events),
-                             ("user_subscriptions", self.user_subscriptions),
-                             ("user_following", self.user_following),
-                             ("user_followers", self.user_followers),
-                             ("user_follows", self.user_follows),
-                             ("users_search", self.users_search),
-                             ("issues_search", self.issues_search),
-                             ("commits_search", self.commits_search),
-                             ("topics_search", self.topics_search),
-                             ("repos_search", self.repos_search),
-                             ("org_profile", self.org_profile),
-                             ("org_repos", self.org_repos),
-                             ("org_events", self.org_events),
-                             ("org_member", self.org_member),
-                             ("repo_profile", self.repo_profile),
-                             ("repo_contributors", self.repo_contributors),
-                             ("repo_stargazers", self.repo_stargazers),
-                             ("repo_forks", self.repo_forks),
-                             ("repo_issues", self.repo_issues),
-                             ("repo_releases", self.repo_releases),
-                             ("repo_path_contents", self.path_contents),
-                             ("view_logs", view_logs),
-                             ("read_log", read_log),
-                             ("delete_log", delete_log),
-                             ("clear_logs", clear_logs),
-                             ("view_csv", view_csv),
-                             ("read_csv", read_csv),
-                             ("delete_csv", delete_csv),
-                             ("clear_csv", clear_csv),
-                             ("about", about),
-                             ("author", self.author)]
-
-        # Path attribute
-        self.path_attrs = ['size', 'type', 'path', 'sha', 'html_url']
-        # Path attribute dictionary
-        self.path_attr_dict = {'size': 'Size (bytes)',
-                               'type': 'Type',
-                               'path': 'Path',
-                               'sha': 'SHA',
-                               'html_url': 'URL'}
-
-        # organisation attributes
-        self.org_attrs = ['avatar_url', 'login', 'id', 'node_id', 'email', 'description', 'blog', 'location',
-                          'followers',
-                          'following', 'twitter_username', 'public_gists', 'public_repos', 'type', 'is_verified',
-                          'has_organisation_projects', 'has_repository_projects', 'created_at', 'updated_at']
-        # organisation attribute dictionary
-        self.org_attr_dict = {'avatar_url': 'Profile Photo',
-                              'login': 'Username',
-                              'id': 'ID',
-                              'node_id': 'Node ID',
-                              'email': 'Email',
-                              'description': 'About',
-                              'location': 'Location',
-                              'blog': 'Blog',
-                              'followers': 'Followers',
-                              'following': 'Following',
-                              'twitter_username': 'Twitter handle',
-                              'public_gists': 'Gists',
-                              'public_repos': 'Repositories',
-                              'type': 'Account type',
-                              'is_verified': 'Is verified?',
-                              'has_organisation_projects': 'Has organisation projects?',
-                              'has_repository_projects': 'Has repository projects?',
-                              'created_at': 'Created at',
-                              'updated_at': 'Updated at'}
-
-        # Repository attributes
-        self.repo_attrs = ['id', 'description', 'forks', 'stargazers_count', 'watchers', 'license', 'default_branch',
-                           'visibility',
-                           'language', 'open_issues', 'topics', 'homepage', 'clone_url', 'ssh_url', 'fork',
-                           'allow_forking',
-                           'private', 'archived', 'has_downloads', 'has_issues', 'has_pages', 'has_projects',
-                           'has_wiki',
-                           'pushed_at', 'created_at', 'updated_at']
-        # Repository attribute dictionary
-        self.repo_attr_dict = {'id': 'ID',
-                               'description': 'About',
-                               'forks': 'Forks',
-                               'stargazers_count': 'Stars',
-                               'watchers': 'Watchers',
-                               'license': 'License',
-                               'default_branch': 'Branch',
-                               'visibility': 'Visibility',
-                               'language': 'Language(s)',
-                               'open_issues': 'Open issues',
-                               'topics': 'Topics',
-                               'homepage': 'Homepage',
-                               'clone_url': 'Clone URL',
-                               'ssh_url': 'SSH URL',
-                               'fork': 'Is fork?',
-                               'allow_forking': 'Is forkable?',
-                               'private': 'Is private?',
-                               'archived': 'Is archived?',
-                               'is_template': 'Is template?',
-                               'has_wiki': 'Has wiki?',
-                               'has_pages': 'Has pages?',
-                               'has_projects': 'Has projects?',
-                               'has_issues': 'Has issues?',
-                               'has_downloads': 'Has downloads?',
-                               'pushed_at': 'Pushed at',
-                               'created_at': 'Created at',
-                               'updated_at': 'Updated at'}
-
-        # Repo releases attributes
-        self.repo_releases_attrs = ['id', 'node_id', 'tag_name', 'target_commitish', 'assets', 'draft', 'prerelease',
-                                    'created_at',
-                                    'published_at']
-        # Repo releases attribute dictionary
-        self.repo_releases_attr_dict = {'id': 'ID',
-                                        'node_id': 'Node ID',
-                                        'tag_name': 'Tag',
-                                        'target_commitish': 'Branch',
-                                        'assets': 'Assets',
-                                        'draft': 'Is draft?',
-                                        'prerelease': 'Is prerelease?',
-                                        'created_at': 'Created at',
-                                        'published_at': 'Published at'}
-
-        # Profile attributes
-        self.profile_attrs = ['avatar_url', 'login', 'id', 'node_id', 'bio', 'blog', 'location', 'followers',
-                              'following',
-                              'twitter_username', 'public_gists', 'public_repos', 'company', 'hireable', 'site_admin',
-                              'created_at',
-                              'updated_at']
-        # Profile attribute dictionary
-        self.profile_attr_dict = {'avatar_url': 'Profile Photo',
-                                  'login': 'Username',
-                                  'id': 'ID',
-                                  'node_id': 'Node ID',
-                                  'bio': 'Bio',
-                                  'blog': 'Blog',
-                                  'location': 'Location',
-                                  'followers': 'Followers',
-                                  'following': 'Following',
-                                  'twitter_username': 'Twitter Handle',
-                                  'public_gists': 'Gists (public)',
-                                  'public_repos': 'Repositories (public)',
-                                  'company': 'organisation',
-                                  'hireable': 'Is hireable?',
-                                  'site_admin': 'Is site admin?',
-                                  'created_at': 'Joined at',
-                                  'updated_at': 'Updated at'}
-
-        # User attributes
-        self.user_attrs = ['avatar_url', 'id', 'node_id', 'gravatar_id', 'site_admin', 'type', 'html_url']
-        # User attribute dictionary
-        self.user_attr_dict = {'avatar_url': 'Profile Photo',
-                               'id': 'ID',
-                               'node_id': 'Node ID',
-                               'gravatar_id': 'Gravatar ID',
-                               'site_admin': 'Is site admin?',
-                               'type': 'Account type',
-                               'html_url': 'URL'}
-
-        # Topic attributes
-        self.topic_attrs = ['score', 'curated', 'featured', 'display_name', 'created_by', 'created_at', 'updated_at']
-        # Topic attribute dictionary
-        self.topic_attr_dict = {'score': 'Score',
-                                'curated': 'Curated',
-                                'featured': 'Featured',
-                                'display_name': 'Display name',
-                                'created_by': 'Created by',
-                                'created_at': 'Created at',
-                                'updated_at': 'Updated at'}
-
-        # Gists attribute
-        self.gists_attrs = ['node_id', 'description', 'comments', 'files', 'git_push_url', 'public', 'truncated',
-                            'updated_at']
-        # Gists attribute dictionary
-        self.gists_attr_dict = {'node_id': 'Node ID',
-                                'description': 'About',
-                                'comments': 'Comments',
-                                'files': 'Files',
-                                'git_push_url': 'Git Push URL',
-                                'public': 'Is public?',
-                                'truncated': 'Is truncated?',
-                                'updated_at': 'Updated at'}
-
-        # Issue attributes
-        self.issue_attrs = ['id', 'node_id', 'score', 'state', 'number', 'comments', 'milestone', 'assignee',
-                            'assignees', 'labels',
-                            'locked', 'draft', 'closed_at']
-        # Issue attribute dict
-        self.issue_attr_dict = {'id': 'ID',
-                                'node_id': 'Node ID',
-                                'score': 'Score',
-                                'state': 'State',
-                                'closed_at': 'Closed at',
-                                'number': 'Number',
-                                'comments': 'Comments',
-                                'milestone': 'Milestone',
-                                'assignee': 'Assignee',
-                                'assignees': 'Assignees',
-                                'labels': 'Labels',
-                                'draft': 'Is draft?',
-                                'locked': 'Is locked?',
-                                'created_at': 'Created at'}
-
-        # Repo issues attributes
-        self.repo_issues_attrs = ['id', 'node_id', 'state', 'reactions', 'number', 'comments', 'milestone', 'assignee',
-                                  'active_lock_reason', 'author_association', 'assignees', 'labels', 'locked',
-                                  'closed_at',
-                                  'created_at', 'updated_at']
-        # Issue attribute dict
-        self.repo_issues_attr_dict = {'id': 'ID',
-                                      'node_id': 'Node ID',
-                                      'number': 'Number',
-                                      'state': 'State',
-                                      'reactions': 'Reactions',
-                                      'comments': 'Comments',
-                                      'milestone': 'Milestone',
-                                      'assignee': 'Assignee',
-                                      'assignees': 'Assignees',
-                                      'author_association': 'Author association',
-                                      'labels': 'Labels',
-                                      'locked': 'Is locked?',
-                                      'active_lock_reason': 'Lock reason',
-                                      'closed_at': 'Closed at',
-                                      'created_at': 'Created at',
-                                      'updated_at': 'Updated at'}
-
-        # User organisations attributes
-        self.user_orgs_attrs = ['avatar_url', 'id', 'node_id', 'url', 'description']
-        self.user_orgs_attr_dict = {'avatar_url': 'Profile Photo',
-                                    'id': 'ID',
-                                    'node_id': 'Node ID',
-                                    'url': 'URL',
-                                    'description': 'About'}
+        # Commands mapped to their methods (dict lookup, prefix trie completion)
+        self.command_map = CommandRegistry([('ls', list_dir_and_files),
+                                            ("exit", exit_session),
+                                            ("clear", clear_screen),
+                                            ("stats", show_stats),
+                                            ("about", about),
+                                            ("author", self.author),
+                                            ("pipeline", self.pipeline),
+                                            ("help", help_command),
+                                            ("help:source", source_command),
+                                            ("help:search", search_command),
+                                            ("help:user", user_command),
+                                            ("help:repo", repo_command),
+                                            ("help:logs", logs_command),
+                                            ("help:csv", csv_command),
+                                            ("help:org", org_command),
+                                            ("source", source),
+                                            ("source:tarball", self.download_tarball),
+                                            ("source:zipball", self.download_zipball),
+                                            ("org", org),
+                                            ("org:events", self.org_events),
+                                            ("org:profile", self.org_profile),
+                                            ("org:repos", self.org_repos),
+                                            ("org:member", self.org_member),
+                                            ("org:identities", self.org_identities),
+                                            ("org:find_files", self.org_find_files),
+                                            ("diff:user", self.diff_user),
+                                            ("diff:org", self.diff_org),
+                                            ("diff:repo", self.diff_repo),
+                                            ("watch:user", self.watch_users),
+                                            ("watch:org", self.watch_orgs),
+                                            ("watchlist", self.watchlist),
+                                            ("repo", repo),
+                                            ("repo:path_contents", self.path_contents),
+                                            ("repo:tree", self.repo_tree),
+                                            ("repo:fetch_path", self.repo_fetch_path),
+                                            ("repo:profile", self.repo_profile),
+                                            ("repo:contributors", self.repo_contributors),
+                                            ("repo:stargazers", self.repo_stargazers),
+                                            ("repo:forks", self.repo_forks),
+                                            ("repo:issues", self.repo_issues),
+                                            ("repo:releases", self.repo_releases),
+                                            ("user", user),
+                                            ("user:email", self.get_user_email),
+                                            ("user:repos", self.user_repos),
+                                            ("user:gists", self.user_gists),
+                                            ("user:orgs", self.user_orgs),
+                                            ("user:profile", self.user_profile),
+                                            ("user:events", self.user_events),
+                                            ("user:followers", self.user_followers),
+                                            ("user:follows", self.user_follows),
+                                            ("user:following", self.user_following),
+                                            ("user:subscriptions", self.user_subscriptions),
+                                            ("search", search),
+                                            ("search:users", self.users_search),
+                                            ("search:repos", self.repos_search),
+                                            ("search:topics", self.topics_search),
+                                            ("search:issues", self.issues_search),
+                                            ("search:commits", self.commits_search),
+                                            ("logs", logs),
+                                            ("logs:view", view_logs),
+                                            ("logs:read", read_log),
+                                            ("logs:delete", delete_log),
+                                            ("logs:clear", clear_logs),
+                                            ("csv", csv),
+                                            ("csv:view", view_csv),
+                                            ("csv:read", read_csv),
+                                            ("csv:delete", delete_csv),
+                                            ("csv:clear", clear_csv)])
+
+        # Arguments map will be used to run Octosuite with argparse (--method)
+        self.argument_map = CommandRegistry([("user_profile", self.user_profile),
+                                             ("user_email", self.get_user_email),
+                                             ("user_repos", self.user_repos),
+                                             ("user_gists", self.user_gists),
+                                             ("user_orgs", self.user_orgs),
+                                             ("user_events", self.user_events),
+                                             ("user_subscriptions", self.user_subscriptions),
+                                             ("user_following", self.user_following),
+                                             ("user_followers", self.user_followers),
+                                             ("user_follows", self.user_follows),
+                                             ("users_search", self.users_search),
+                                             ("issues_search", self.issues_search),
+                                             ("commits_search", self.commits_search),
+                                             ("topics_search", self.topics_search),
+                                             ("repos_search", self.repos_search),
+                                             ("org_profile", self.org_profile),
+                                             ("org_repos", self.org_repos),
+                                             ("org_events", self.org_events),
+                                             ("org_member", self.org_member),
+                                             ("org_identities", self.org_identities),
+                                             ("org_find_files", self.org_find_files),
+                                             ("diff_user", self.diff_user),
+                                             ("diff_org", self.diff_org),
+                                             ("diff_repo", self.diff_repo),
+                                             ("watch_user", self.watch_users),
+                                             ("watch_org", self.watch_orgs),
+                                             ("watchlist", self.watchlist),
+                                             ("repo_profile", self.repo_profile),
+                                             ("repo_tree", self.repo_tree),
+                                             ("repo_fetch_path", self.repo_fetch_path),
+                                             ("repo_contributors", self.repo_contributors),
+                                             ("repo_stargazers", self.repo_stargazers),
+                                             ("repo_forks", self.repo_forks),
+                                             ("repo_issues", self.repo_issues),
+                                             ("repo_releases", self.repo_releases),
+                                             ("repo_path_contents", self.path_contents),
+                                             ("view_logs", view_logs),
+                                             ("read_log", read_log),
+                                             ("delete_log", delete_log),
+                                             ("clear_logs", clear_logs),
+                                             ("view_csv", view_csv),
+                                             ("read_csv", read_csv),
+                                             ("delete_csv", delete_csv),
+                                             ("clear_csv", clear_csv),
+                                             ("stats", show_stats),
+                                             ("about", about),
+                                             ("author", self.author)])
 
         # Author dictionary
         self.author_dict = {'Alias': 'rly0nheart',
@@ -513,8 +720,8 @@ class Octosuite:
                             'Buy Me A Coffee': 'https://buymeacoffee.com/189381184'}
 
     def get_repos_from_username(self, username):
-        response = requests.get(f"{self.endpoint}/users/{username}/repos?per_page=100&sort=pushed",
-                                auth=HTTPBasicAuth(username, '')).text
+        response = transport.get(f"{self.endpoint}/users/{username}/repos?per_page=100&sort=pushed",
+                                 auth=HTTPBasicAuth(username, '')).text
         repositories = re.findall(rf'"full_name":"{username}/(.*?)",.*?"fork":(.*?),', response)
         unforked_repos = []
         for repository in repositories:
@@ -526,7 +733,7 @@ class Octosuite:
         if args.username:
             username = args.username
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
         repos = self.get_repos_from_username(username)
         for repo in repos:
             email = get_email_from_contributor(username, repo, username)
@@ -539,17 +746,15 @@ class Octosuite:
         if args.organisation:
             organisation = args.organisation
         else:
-            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}")
-        response = requests.get(f"{self.endpoint}/orgs/{organisation}")
+            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}", target='organisation')
+        response = transport.get(f"{self.endpoint}/orgs/{organisation}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {org_not_found.format(organisation)}")
+            not_found(org_not_found.format(organisation))
         elif response.status_code == 200:
-            org_profile_tree = Tree(f"\n{response.json()['name']}")
-            for attr in self.org_attrs:
-                org_profile_tree.add(f"{self.org_attr_dict[attr]}: {response.json()[attr]}")
-            xprint(org_profile_tree)
+            show_item(schemas.org_profile, response.json())
+            take_snapshot('org', organisation, response.json())
 
-            if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            if csv_wanted():
                 log_org_profile(response)
         else:
             xprint(response.json())
@@ -559,18 +764,16 @@ class Octosuite:
         if args.username:
             username = args.username
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
-        response = requests.get(f"{self.endpoint}/users/{username}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
+        response = transport.get(f"{self.endpoint}/users/{username}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {user_not_found.format(username)}")
+            not_found(user_not_found.format(username))
         elif response.status_code == 200:
-            user_profile_tree = Tree(f"\n{response.json()['name']}")
-            for attr in self.profile_attrs:
-                user_profile_tree.add(f"{self.profile_attr_dict[attr]}: {response.json()[attr]}")
-            xprint(user_profile_tree)
+            show_item(schemas.user_profile, response.json())
+            take_snapshot('user', username, response.json())
 
             # Logging output to a csv file
-            if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            if csv_wanted():
                 log_user_profile(response)
         else:
             xprint(response.json())
@@ -581,22 +784,46 @@ class Octosuite:
             repo_name = args.repository
             username = args.username
         else:
-            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}")
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
-        response = requests.get(f"{self.endpoint}/repos/{username}/{repo_name}")
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
+        response = transport.get(f"{self.endpoint}/repos/{username}/{repo_name}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {repo_or_user_not_found.format(repo_name, username)}")
+            not_found(repo_or_user_not_found.format(repo_name, username))
         elif response.status_code == 200:
-            repo_profile_tree = Tree(f"\n{response.json()['full_name']}")
-            for attr in self.repo_attrs:
-                repo_profile_tree.add(f"{self.repo_attr_dict[attr]}: {response.json()[attr]}")
-            xprint(repo_profile_tree)
+            show_item(schemas.repository, response.json())
+            take_snapshot('repo', f"{username}/{repo_name}", response.json())
 
-            if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            if csv_wanted():
                 log_repo_profile(response)
         else:
             xprint(response.json())
 
+    # Change history of a user/organisation/repository, from its --snapshot's (see snapshots.py)
+    def diff_user(self):
+        self.diff('user', args.username or Prompt.ask(f"{white}@{green}Username{reset}", target='user'))
+
+    def diff_org(self):
+        self.diff('org', args.organisation or Prompt.ask(f"{white}@{green}Organisation{reset}", target='organisation'))
+
+    def diff_repo(self):
+        if args.repository and args.username:
+            repo_name = args.repository
+            username = args.username
+        else:
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
+        self.diff('repo', f"{username}/{repo_name}")
+
+    def diff(self, entity, target):
+        history = snapshots().history(entity, target, args.limit)
+        if history is None:
+            xprint(f"{NEGATIVE} {no_snapshot.format(target)}")
+        elif not history:
+            xprint(f"{INFO} {no_changes.format(target)}")
+        else:
+            for change in history:
+                show_item(schemas.change, change)
+
     # Get path contents
     def path_contents(self):
         if args.repository and args.username and args.path_name:
@@ -604,23 +831,89 @@ class Octosuite:
             username = args.username
             path_name = args.path_name
         else:
-            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}")
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
             path_name = Prompt.ask("~/path/name ")
-        response = requests.get(f"{self.endpoint}/repos/{username}/{repo_name}/contents/{path_name}")
+        response = transport.get_list(f"{self.endpoint}/repos/{username}/{repo_name}/contents/{path_name}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {info_not_found.format(repo_name, username, path_name)}")
+            not_found(info_not_found.format(repo_name, username, path_name))
         elif response.status_code == 200:
-            for content_count, content in enumerate(response.json(), start=1):
-                path_contents_tree = Tree("\n" + content['name'])
-                for attr in self.path_attrs:
-                    path_contents_tree.add(f"{self.path_attr_dict[attr]}: {content[attr]}")
-                xprint(path_contents_tree)
+            for content_count, content in enumerate(transport.items(response), start=1):
+                show_item(schemas.content, content)
                 log_repo_path_contents(content, repo_name)
                 xprint(INFO, f"Found {content_count} file(s) in {repo_name}/{path_name}.")
         else:
             xprint(response.json())
 
+    # Every file of a repository (at --ref), in one request to the git trees API (see trees.py)
+    def repo_tree(self):
+        if args.repository and args.username:
+            repo_name = args.repository
+            username = args.username
+        else:
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
+        repository = f"{username}/{repo_name}"
+        response = transport.get(tree_url(self.endpoint, repository, args.ref or 'HEAD'))
+        if response.status_code == 404:
+            not_found(repo_or_user_not_found.format(repo_name, username))
+        elif response.status_code == 409:
+            xprint(f"{NEGATIVE} {empty_repository.format(repository)}")
+        elif response.status_code == 200:
+            matcher = path_matcher()
+            sizes = {}
+            # Asked once for the whole tree, whose entries are written as they're listed
+            with (log_repo_tree(repository) if csv_wanted() else nullcontext()) as tree_csv:
+                for entry in walk_tree(self.endpoint, repository, response.json()):
+                    if matcher is not None and matcher.match(entry['path']) is None:
+                        continue
+                    show_item(schemas.tree_entry, entry)
+                    add_size(sizes, entry)
+                    if tree_csv is not None:
+                        tree_csv.write(entry)
+            if args.directory_sizes:
+                for directory, (files, size) in sorted(sizes.items()):
+                    show_item(schemas.directory_size, {'path': directory or '.', 'files': files, 'size': size})
+        else:
+            xprint(response.json())
+
+    # Download the files under a path of a repository (all of them without one) into downloads/ (see mirror.py)
+    def repo_fetch_path(self):
+        if args.repository and args.username:
+            repo_name = args.repository
+            username = args.username
+            path_name = args.path_name or ''
+        else:
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
+            path_name = Prompt.ask("~/path/name (empty: the whole repository)", default='')
+        repository = f"{username}/{repo_name}"
+        response = transport.get(tree_url(self.endpoint, repository, args.ref or 'HEAD'))
+        if response.status_code == 404:
+            not_found(repo_or_user_not_found.format(repo_name, username))
+        elif response.status_code == 409:
+            xprint(f"{NEGATIVE} {empty_repository.format(repository)}")
+        elif response.status_code == 200:
+            prefix = path_name.strip('/')
+            matcher = path_matcher()
+            entries = [entry for entry in walk_tree(self.endpoint, repository, response.json())
+                       if entry['type'] == 'blob' and (not prefix or entry['path'] == prefix or
+                                                       entry['path'].startswith(f"{prefix}/"))
+                       and (matcher is None or matcher.match(entry['path']) is not None)]
+            if not entries:
+                not_found(info_not_found.format(repo_name, username, path_name))
+                return
+            destination = os.path.join("downloads", username, repo_name)
+            files = downloaded = 0
+            for entry, fresh in mirror_files(self.endpoint, repository, entries, destination):
+                show_item(schemas.mirrored_file, {**entry, 'downloaded': fresh})
+                files += 1
+                downloaded += fresh
+            logging.info(path_mirrored.format(files, repository, destination, downloaded))
+            xprint(f"{POSITIVE} {path_mirrored.format(files, repository, destination, downloaded)}")
+        else:
+            xprint(response.json())
+
     # repo contributors
     def repo_contributors(self):
         if args.repository and args.username and args.limit:
@@ -628,23 +921,21 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}")
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
             limit = Prompt.ask(limit_output.format("contributors"))
-        response = requests.get(f"{self.endpoint}/repos/{username}/{repo_name}/contributors?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/repos/{username}/{repo_name}/contributors"
+                                      f"?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {repo_or_user_not_found.format(repo_name, username)}")
+            not_found(repo_or_user_not_found.format(repo_name, username))
         elif response.status_code == 200:
-            for contributor in response.json():
-                contributor_tree = Tree("\n" + contributor['login'])
-                for attr in self.user_attrs:
-                    contributor_tree.add(f"{self.user_attr_dict[attr]}: {contributor[attr]}")
-                xprint(contributor_tree)
+            for contributor in enriched(self.endpoint, transport.paginate(response, limit)):
+                show_user(contributor)
 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_repo_contributors(contributor, repo_name)
-            else:
-                xprint(response.json())
+        else:
+            xprint(response.json())
 
     # repo stargazers
     def repo_stargazers(self):
@@ -653,22 +944,20 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}")
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
             limit = Prompt.ask(limit_output.format("stargazers"))
-        response = requests.get(f"{self.endpoint}/repos/{username}/{repo_name}/stargazers?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/repos/{username}/{repo_name}/stargazers"
+                                      f"?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {repo_or_user_not_found.format(repo_name, username)}")
-        elif response.json() == {}:
-            xprint(f"{NEGATIVE} Repository does not have any stargazers -> ({repo_name})")
+            not_found(repo_or_user_not_found.format(repo_name, username))
         elif response.status_code == 200:
-            for stargazer in response.json():
-                stargazer_tree = Tree("\n" + stargazer['login'])
-                for attr in self.user_attrs:
-                    stargazer_tree.add(f"{self.user_attr_dict[attr]}: {stargazer[attr]}")
-                xprint(stargazer_tree)
+            stargazers = report_empty(transport.paginate(response, limit),
+                                      f"Repository does not have any stargazers -> ({repo_name})")
+            for stargazer in enriched(self.endpoint, stargazers):
+                show_user(stargazer)
                 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_repo_stargazers(stargazer, repo_name)
         else:
             xprint(response.json())
@@ -680,22 +969,20 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}")
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
             limit = Prompt.ask(limit_output.format("forks"))
-        response = requests.get(f"{self.endpoint}/repos/{username}/{repo_name}/forks?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/repos/{username}/{repo_name}/forks"
+                                      f"?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {repo_or_user_not_found.format(repo_name, username)}")
-        elif response.json() == {}:
-            xprint(f"{NEGATIVE} Repository does not have forks -> ({repo_name})")
+            not_found(repo_or_user_not_found.format(repo_name, username))
         elif response.status_code == 200:
-            for count, fork in enumerate(response.json()):
-                fork_tree = Tree("\n" + fork['full_name'])
-                for attr in self.repo_attrs:
-                    fork_tree.add(f"{self.repo_attr_dict[attr]}: {fork[attr]}")
-                xprint(fork_tree)
+            forks = report_empty(transport.paginate(response, limit),
+                                 f"Repository does not have forks -> ({repo_name})")
+            for count, fork in enumerate(forks):
+                show_item(schemas.repository, fork)
 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_repo_forks(fork, count)
         else:
             xprint(response.json())
@@ -707,21 +994,18 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}")
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
             limit = Prompt.ask(limit_output.format("issues"))
-        response = requests.get(f"{self.endpoint}/repos/{username}/{repo_name}/issues?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/repos/{username}/{repo_name}/issues"
+                                      f"?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {repo_or_user_not_found.format(repo_name, username)}")
-        elif not response.json():
-            xprint(f"{NEGATIVE} Repository does not have open issues -> ({repo_name})")
+            not_found(repo_or_user_not_found.format(repo_name, username))
         elif response.status_code == 200:
-            for issue in response.json():
-                issues_tree = Tree("\n" + issue['title'])
-                for attr in self.repo_issues_attrs:
-                    issues_tree.add(f"{self.repo_issues_attr_dict[attr]}: {issue[attr]}")
-                xprint(issues_tree)
-                xprint(issue['body'])
+            issues = report_empty(transport.paginate(response, limit),
+                                  f"Repository does not have open issues -> ({repo_name})")
+            for issue in issues:
+                show_item(schemas.issue, issue)
                 log_repo_issues(issue, repo_name)
         else:
             xprint(response.json())
@@ -733,23 +1017,20 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}")
-            username =  Prompt.ask(f"{white}@{green}Username{reset}")
+            repo_name = Prompt.ask(f"{white}%{green}Repository{reset}", target='repository')
+            username =  Prompt.ask(f"{white}@{green}Username{reset}", target='owner')
             limit = Prompt.ask(limit_output.format("repository releases"))
-        response = requests.get(f"{self.endpoint}/repos/{username}/{repo_name}/releases?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/repos/{username}/{repo_name}/releases"
+                                      f"?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {repo_or_user_not_found.format(repo_name, username)}")
-        elif not response.json():
-            xprint(f"{NEGATIVE} Repository does not have releases -> ({repo_name})")
+            not_found(repo_or_user_not_found.format(repo_name, username))
         elif response.status_code == 200:
-            for release in response.json():
-                releases_tree = Tree("\n" + release['name'])
-                for attr in self.repo_releases_attrs:
-                    releases_tree.add(f"{self.repo_releases_attr_dict[attr]}: {release[attr]}")
-                xprint(releases_tree)
-                xprint(release['body'])
-
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            releases = report_empty(transport.paginate(response, limit),
+                                    f"Repository does not have releases -> ({repo_name})")
+            for release in releases:
+                show_item(schemas.release, release)
+
+                if csv_wanted():
                     log_repo_releases(release, repo_name)
         else:
             xprint(response.json())
@@ -760,54 +1041,135 @@ class Octosuite:
             organisation = args.organisation
             limit = args.limit
         else:
-            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}")
+            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}", target='organisation')
             limit = Prompt.ask(limit_output.format("organisation repositories"))
-        response = requests.get(f"{self.endpoint}/orgs/{organisation}/repos?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/orgs/{organisation}/repos?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {org_not_found.format(organisation)}")
+            not_found(org_not_found.format(organisation))
         elif response.status_code == 200:
-            for repository in response.json():
-                repos_tree = Tree("\n" + repository['full_name'])
-                for attr in self.repo_attrs:
-                    repos_tree.add(f"{self.repo_attr_dict[attr]}: {repository[attr]}")
-                xprint(repos_tree)
+            for repository in transport.paginate(response, limit):
+                show_item(schemas.repository, repository)
                 
-                if args.log_csv or Prompt.ask(f"{PROMPT} {prompt_log_csv}") == "yes":
+                if csv_wanted():
                     log_org_repos(repository, organisation)
         else:
             xprint(response.json())
 
+    # Chained commands, eg. org:repos <organisation> | repo:contributors | user:profile (see pipelines.py)
+    def pipeline(self, definition=None):
+        definition = definition or args.pipeline or Prompt.ask(f"{white}{prompt_pipeline}{reset}")
+        limit = args.limit or 10
+        if os.path.isfile(definition):
+            stages = load_pipeline(definition, limit=limit, workers=args.pipeline_workers,
+                                   queue_size=args.pipeline_queue)
+        else:
+            stages = parse_chain(definition, limit=limit, workers=args.pipeline_workers,
+                                 queue_size=args.pipeline_queue)
+        counts = run_pipeline(stages, self.endpoint, lambda stage, row: present(stage.type.schema, row))
+        if not output.headless():
+            stages_table = Table(show_header=True, header_style=header_title)
+            stages_table.add_column("Stage", style="dim")
+            stages_table.add_column("Targets")
+            stages_table.add_column("Results")
+            for stage in stages:
+                stages_table.add_row(stage.name, str(len(stage.seen)), str(counts[stage.name]))
+            xprint(stages_table)
+
     # organisation events
     def org_events(self):
         if args.organisation and args.limit:
             organisation = args.organisation
             limit = args.limit
         else:
-            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}")
+            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}", target='organisation')
             limit = Prompt.ask(limit_output.format("organisation events"))
-        response = requests.get(f"{self.endpoint}/orgs/{organisation}/events?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/orgs/{organisation}/events?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {org_not_found.format(organisation)}")
+            not_found(org_not_found.format(organisation))
         elif response.status_code == 200:
-            for event in response.json():
-                events_tree = Tree("\n" + event['id'])
-                events_tree.add(f"Type: {event['type']}")
-                events_tree.add(f"Created at: {event['created_at']}")
-                xprint(events_tree)
-                xprint(event['payload'])
+            for event in transport.paginate(response, limit):
+                show_item(schemas.event, event)
             # log_org_events(event, organisation)
         else:
             xprint(response.json())
 
+    # Author/committer identities found in an organisation's commit history (see identities.py)
+    def org_identities(self):
+        if args.organisation and args.limit:
+            organisation = args.organisation
+            limit = args.limit
+        else:
+            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}", target='organisation')
+            limit = Prompt.ask(limit_output.format("organisation identities"))
+        scan = IdentityScan(self.endpoint, organisation, since=args.since, until=args.until)
+        response = scan.run()
+        if response.status_code == 404:
+            not_found(org_not_found.format(organisation))
+        elif response.status_code == 200:
+            logging.info(identities_scanned.format(scan.repositories, scan.commits, organisation))
+            xprint(f"{INFO} {identities_scanned.format(scan.repositories, scan.commits, organisation)}")
+            identities = scan.identities(limit)
+            for identity in identities:
+                show_item(schemas.identity, identity)
+
+            if identities and csv_wanted():
+                log_org_identities(identities, organisation)
+        else:
+            xprint(response.json())
+
+    # Paths matching --match/--match-regex in every repository of an organisation or user (see trees.py)
+    def org_find_files(self):
+        if args.organisation and (args.match or args.match_regex):
+            organisation = args.organisation
+            limit = args.limit
+            matcher = path_matcher()
+        else:
+            organisation = Prompt.ask(f"{white}@{green}Organisation (or username){reset}", target='organisation')
+            limit = Prompt.ask(limit_output.format("organisation repositories"))
+            matcher = path_matcher(Prompt.ask("Paths (comma separated globs, eg. .env,*.yml)"))
+        if matcher is None:
+            return
+        response = transport.get_list(f"{self.endpoint}/orgs/{organisation}/repos?per_page={transport.page_size(limit)}")
+        if response.status_code == 404:
+            # Not an organisation, a user then
+            response = transport.get_list(
+                f"{self.endpoint}/users/{organisation}/repos?per_page={transport.page_size(limit)}")
+        if response.status_code == 404:
+            not_found(org_not_found.format(organisation))
+        elif response.status_code == 200:
+            searched = []
+
+            def repositories():
+                for repository in transport.paginate(response, limit):
+                    searched.append(repository['full_name'])
+                    yield repository
+
+            cache = TreeCache()
+            count = 0
+            # Asked once for the whole search, matches are written as they're found
+            with (log_org_files(organisation) if csv_wanted() else nullcontext()) as files_csv:
+                for repository, entry, pattern in find_files(self.endpoint, repositories(), matcher, cache=cache):
+                    found = {**entry, 'repository': repository, 'pattern': pattern}
+                    show_item(schemas.found_file, found)
+                    # Streamed: a match shows as soon as its repository is searched
+                    output.flush()
+                    count += 1
+                    if files_csv is not None:
+                        files_csv.write(found)
+            logging.info(files_found.format(count, len(searched), organisation, cache.hits))
+            xprint(f"{INFO} {files_found.format(count, len(searched), organisation, cache.hits)}")
+        else:
+            xprint(response.json())
+
     # organisation member
     def org_member(self):
         if args.organisation and args.username:
             organisation = args.organisation
             username = args.username
         else:
-            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}")
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
-        response = requests.get(f"{self.endpoint}/orgs/{organisation}/public_members/{username}")
+            organisation = Prompt.ask(f"{white}@{green}Organisation{reset}", target='organisation')
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
+        response = transport.get(f"{self.endpoint}/orgs/{organisation}/public_members/{username}")
         if response.status_code == 204:
             xprint(f"{POSITIVE} User ({username}) is a public member of the organisation -> ({organisation})")
         else:
@@ -819,19 +1181,16 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
             limit = Prompt.ask(limit_output.format("repositories"))
-        response = requests.get(f"{self.endpoint}/users/{username}/repos?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/users/{username}/repos?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {user_not_found.format(username)}")
+            not_found(user_not_found.format(username))
         elif response.status_code == 200:
-            for repository in response.json():
-                repos_tree = Tree("\n" + repository['full_name'])
-                for attr in self.repo_attrs:
-                    repos_tree.add(f"{self.repo_attr_dict[attr]}: {repository[attr]}")
-                xprint(repos_tree)
+            for repository in transport.paginate(response, limit):
+                show_item(schemas.repository, repository)
 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_user_repos(repository, username)
         else:
             xprint(response.json())
@@ -842,21 +1201,17 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
             limit = Prompt.ask(limit_output.format('gists'))
-        response = requests.get(f"{self.endpoint}/users/{username}/gists?per_page={limit}")
-        if not response.json():
-            xprint(f"{NEGATIVE} User does not have gists.")
-        elif response.status_code == 404:
-            xprint(f"{NEGATIVE} {user_not_found.format(username)}")
+        response = transport.get_list(f"{self.endpoint}/users/{username}/gists?per_page={transport.page_size(limit)}")
+        if response.status_code == 404:
+            not_found(user_not_found.format(username))
         elif response.status_code == 200:
-            for gist in response.json():
-                gists_tree = Tree("\n" + gist['id'])
-                for attr in self.gists_attrs:
-                    gists_tree.add(f"{self.gists_attr_dict[attr]}: {gist[attr]}")
-                xprint(gists_tree)
+            gists = report_empty(transport.paginate(response, limit), "User does not have gists.")
+            for gist in gists:
+                show_item(schemas.gist, gist)
                 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_user_gists(gist)
         else:
             xprint(response.json())
@@ -867,21 +1222,18 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
             limit = Prompt.ask(limit_output.format("user organisations"))
-        response = requests.get(f"{self.endpoint}/users/{username}/orgs?per_page={limit}")
-        if not response.json():
-            xprint(f"{NEGATIVE} User ({username}) does not (belong to/own) any organisations.")
-        elif response.status_code == 404:
-            xprint(f"{NEGATIVE} {user_not_found.format(username)}")
+        response = transport.get_list(f"{self.endpoint}/users/{username}/orgs?per_page={transport.page_size(limit)}")
+        if response.status_code == 404:
+            not_found(user_not_found.format(username))
         elif response.status_code == 200:
-            for organisation in response.json():
-                org_tree = Tree("\n" + organisation['login'])
-                for attr in self.user_orgs_attrs:
-                    org_tree.add(f"{self.user_orgs_attr_dict[attr]}: {organisation[attr]}")
-                xprint(org_tree)
+            organisations = report_empty(transport.paginate(response, limit),
+                                         f"User ({username}) does not (belong to/own) any organisations.")
+            for organisation in organisations:
+                show_item(schemas.user_org, organisation)
                 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_user_orgs(organisation, username)
         else:
             xprint(response.json())
@@ -892,20 +1244,15 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
             limit = Prompt.ask(limit_output.format("events"))
-        response = requests.get(f"{self.endpoint}/users/{username}/events/public?per_page={limit}")
+        response = transport.get_list(f"{self.endpoint}/users/{username}/events/public"
+                                      f"?per_page={transport.page_size(limit)}")
         if response.status_code == 404:
-            xprint(f"{NEGATIVE} {user_not_found.format(username)}")
+            not_found(user_not_found.format(username))
         elif response.status_code == 200:
-            for event in response.json():
-                events_tree = Tree("\n" + event['id'])
-                events_tree.add(f"Actor: {event['actor']['login']}")
-                events_tree.add(f"Type: {event['type']}")
-                events_tree.add(f"Repository: {event['repo']['name']}")
-                events_tree.add(f"Created at: {event['created_at']}")
-                xprint(events_tree)
-                xprint(event['payload'])
+            for event in transport.paginate(response, limit):
+                show_item(schemas.event, event)
                 log_user_events(event)
         else:
             xprint(response.json())
@@ -916,21 +1263,18 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
             limit = Prompt.ask(limit_output.format("user subscriptions"))
-        response = requests.get(f"{self.endpoint}/users/{username}/subscriptions?per_page={limit}")
-        if not response.json():
-            xprint(f"{NEGATIVE} User does not have any subscriptions.")
-        elif response.status_code == 404:
-            xprint(f"{NEGATIVE} {user_not_found.format(username)}")
+        response = transport.get_list(f"{self.endpoint}/users/{username}/subscriptions"
+                                      f"?per_page={transport.page_size(limit)}")
+        if response.status_code == 404:
+            not_found(user_not_found.format(username))
         elif response.status_code == 200:
-            for repository in response.json():
-                subscriptions_tree = Tree("\n" + repository['full_name'])
-                for attr in self.repo_attrs:
-                    subscriptions_tree.add(f"{self.repo_attr_dict[attr]}: {repository[attr]}")
-                xprint(subscriptions_tree)
+            repositories = report_empty(transport.paginate(response, limit), "User does not have any subscriptions.")
+            for repository in repositories:
+                show_item(schemas.repository, repository)
                 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_user_subscriptions(repository, username)
         else:
             xprint(response.json())
@@ -941,21 +1285,18 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
             limit = Prompt.ask(limit_output.format("user' following"))
-        response = requests.get(f"{self.endpoint}/users/{username}/following?per_page={limit}")
-        if not response.json():
-            xprint(f"{NEGATIVE} User ({username})does not follow anyone.")
-        elif response.status_code == 404:
-            xprint(f"{NEGATIVE} {user_not_found.format(username)}")
+        response = transport.get_list(f"{self.endpoint}/users/{username}/following?per_page={transport.page_size(limit)}")
+        if response.status_code == 404:
+            not_found(user_not_found.format(username))
         elif response.status_code == 200:
-            for user in response.json():
-                following_tree = Tree("\n" + user['login'])
-                for attr in self.user_attrs:
-                    following_tree.add(f"{self.user_attr_dict[attr]}: {user[attr]}")
-                xprint(following_tree)
+            users = report_empty(transport.paginate(response, limit),
+                                 f"User ({username})does not follow anyone.")
+            for user in enriched(self.endpoint, users):
+                show_user(user)
                 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_user_following(user, username)
         else:
             xprint(response.json())
@@ -966,21 +1307,18 @@ class Octosuite:
             username = args.username
             limit = args.limit
         else:
-            username = Prompt.ask(f"{white}@{green}Username{reset}")
+            username = Prompt.ask(f"{white}@{green}Username{reset}", target='user')
             limit = Prompt.ask(limit_output.format("user followers"))
-        response = requests.get(f"{self.endpoint}/users/{username}/followers?per_page={limit}")
-        if not response.json():
-            xprint(f"{NEGATIVE} User ({username})does not have followers.")
-        elif response.status_code == 404:
-            xprint(f"{NEGATIVE} {user_not_found.format(username)}")
+        response = transport.get_list(f"{self.endpoint}/users/{username}/followers?per_page={transport.page_size(limit)}")
+        if response.status_code == 404:
+            not_found(user_not_found.format(username))
         elif response.status_code == 200:
-            for follower in response.json():
-                followers_tree = Tree("\n" + follower['login'])
-                for attr in self.user_attrs:
-                    followers_tree.add(f"{self.user_attr_dict[attr]}: {follower[attr]}")
-                xprint(followers_tree)
+            followers = report_empty(transport.paginate(response, limit),
+                                     f"User ({username})does not have followers.")
+            for follower in enriched(self.endpoint, followers):
+                show_user(follower)
                 
-                if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+                if csv_wanted():
                     log_user_followers(follower, username)
         else:
             xprint(response.json())
@@ -993,28 +1331,60 @@ class Octosuite:
         else:
             user_a = Prompt.ask(f"{white}@{green}User_A{reset}")
             user_b = Prompt.ask(f"{white}@{green}User_B{reset}")
-        response = requests.get(f"{self.endpoint}/users/{user_a}/following/{user_b}")
+        response = transport.get(f"{self.endpoint}/users/{user_a}/following/{user_b}")
         if response.status_code == 204:
             xprint(f"{POSITIVE} @{user_a} FOLLOWS @{user_b}")
         else:
             xprint(f"{NEGATIVE} @{user_a} DOES NOT FOLLOW @{user_b}")
 
+    # Stream the new events of users/organisations as they happen (see watch.py)
+    def watch_users(self):
+        self.watch('user', args.username, f"{white}@{green}Username(s){reset} (comma separated)")
+
+    def watch_orgs(self):
+        self.watch('org', args.organisation, f"{white}@{green}Organisation(s){reset} (comma separated)")
+
+    def watch(self, kind, names, prompt):
+        if args.targets:
+            names = read_targets()
+        else:
+            names = (names or Prompt.ask(prompt, target='organisation' if kind == 'org' else 'user')).split(',')
+        targets = [WatchTarget(kind, name.strip(), args.watch_interval) for name in names if name.strip()]
+        Watcher(self.endpoint, targets, emit_watched, interval=args.watch_interval).run(args.watch_for)
+
+    # Stream the new activity of a file of users, organisations and repositories, polling the busy ones more often
+    def watchlist(self):
+        filename = args.targets or Prompt.ask(f"{white}@{green}Watchlist file{reset} (user:<name>, org:<name> or "
+                                              f"repo:<owner>/<name> per line)")
+        targets = [WatchTarget(kind, name, args.watch_interval) for kind, name in read_watchlist(filename)]
+        # The intervals learned last time
+        state = WatchState()
+        state.load(targets)
+        try:
+            AdaptiveWatcher(self.endpoint, targets, emit_watched, min_interval=args.watch_interval,
+                            max_interval=args.watch_max_interval).run(args.watch_for)
+        finally:
+            state.save(targets)
+
+    # Results of a search: the first <limit> of the query, or every match with --exhaustive (see partitioning.py)
+    def search_results(self, kind, query, limit):
+        if args.exhaustive:
+            return exhaustive_search(self.endpoint, kind, query, limit, qualifier=args.partition_by)
+        response = transport.get_list(f"{self.endpoint}{search_paths[kind]}?q={query}&per_page={transport.page_size(limit)}")
+        return transport.paginate(response, limit, items_key='items')
+
     # User search
     def users_search(self):
         if args.query and args.limit and args.limit:
             query = args.query
             limit = args.limit
         else:
-            query = Prompt.ask(f"{white}@{green}Username{reset} (search)")
+            query = Prompt.ask(f"{white}@{green}Username{reset} (search)", target='query')
             limit = Prompt.ask(limit_output.format("user search"))
-        response = requests.get(f"{self.endpoint}/search/users?q={query}&per_page={limit}").json()
-        for user in response['items']:
-            users_search_tree = Tree("\n" + user['login'])
-            for attr in self.user_attrs:
-                users_search_tree.add(f"{self.user_attr_dict[attr]}: {user[attr]}")
-            xprint(users_search_tree)
+        for user in enriched(self.endpoint, self.search_results('users', query, limit)):
+            show_user(user)
             
-            if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            if csv_wanted():
                 log_users_search(user, query)
 
     # Repository search
@@ -1023,16 +1393,12 @@ class Octosuite:
             query = args.query
             limit = args.limit
         else:
-            query = Prompt.ask(f"{white}%{green}Repository{reset} (search)")
+            query = Prompt.ask(f"{white}%{green}Repository{reset} (search)", target='query')
             limit = Prompt.ask(limit_output.format("repositor[y][ies] search"))
-        response = requests.get(f"{self.endpoint}/search/repositories?q={query}&per_page={limit}").json()
-        for repository in response['items']:
-            repos_search_tree = Tree("\n" + repository['full_name'])
-            for attr in self.repo_attrs:
-                repos_search_tree.add(f"{self.repo_attr_dict[attr]}: {repository[attr]}")
-            xprint(repos_search_tree)
+        for repository in self.search_results('repos', query, limit):
+            show_item(schemas.repository, repository)
             
-            if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            if csv_wanted():
                 log_repos_search(repository, query)
 
     # Topics search
@@ -1041,16 +1407,12 @@ class Octosuite:
             query = args.query
             limit = args.limit
         else:
-            query = Prompt.ask(f"{white}:{green}Topics{reset} (search)")
+            query = Prompt.ask(f"{white}:{green}Topics{reset} (search)", target='query')
             limit = Prompt.ask(limit_output.format("topic(s) search"))
-        response = requests.get(f"{self.endpoint}/search/topics?q={query}&per_page={limit}").json()
-        for topic in response['items']:
-            topics_search_tree = Tree("\n" + topic['name'])
-            for attr in self.topic_attrs:
-                topics_search_tree.add(f"{self.topic_attr_dict[attr]}: {topic[attr]}")
-            xprint(topics_search_tree)
+        for topic in self.search_results('topics', query, limit):
+            show_item(schemas.topic, topic)
             
-            if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            if csv_wanted():
                 log_topics_search(topic, query)
 
     # Issue search
@@ -1059,17 +1421,12 @@ class Octosuite:
             query = args.query
             limit = args.limit
         else:
-            query = Prompt.ask(f"{white}!{green}Issues{reset} (search)")
+            query = Prompt.ask(f"{white}!{green}Issues{reset} (search)", target='query')
             limit = Prompt.ask(limit_output.format("issue(s) search"))
-        response = requests.get(f"{self.endpoint}/search/issues?q={query}&per_page={limit}").json()
-        for issue in response['items']:
-            issues_search_tree = Tree("\n" + issue['title'])
-            for attr in self.repo_issues_attrs:
-                issues_search_tree.add(f"{self.repo_issues_attr_dict[attr]}: {issue[attr]}")
-            xprint(issues_search_tree)
-            xprint(issue['body'])
+        for issue in self.search_results('issues', query, limit):
+            show_item(schemas.search_issue, issue)
             
-            if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            if csv_wanted():
                 log_issues_search(issue, query)
 
     # Commits search
@@ -1078,28 +1435,19 @@ class Octosuite:
             query = args.query
             limit = args.limit
         else:
-            query = Prompt.ask(f"{white};{green}Commits{reset} (search)")
+            query = Prompt.ask(f"{white};{green}Commits{reset} (search)", target='query')
             limit = Prompt.ask(limit_output.format("commit(s) search"))
-        response = requests.get(f"{self.endpoint}/search/commits?q={query}&per_page={limit}").json()
-        for commit in response['items']:
-            commits_search_tree = Tree("\n" + commit['commit']['tree']['sha'])
-            commits_search_tree.add(f"Author: {commit['commit']['author']['name']}")
-            commits_search_tree.add(f"Username: {commit['author']['login']}")
-            commits_search_tree.add(f"Email: {commit['commit']['author']['email']}")
-            commits_search_tree.add(f"Commiter: {commit['commit']['committer']['name']}")
-            commits_search_tree.add(f"Repository: {commit['repository']['full_name']}")
-            commits_search_tree.add(f"URL: {commit['html_url']}")
-            xprint(commits_search_tree)
-            xprint(commit['commit']['message'])
+        for commit in self.search_results('commits', query, limit):
+            show_item(schemas.commit, commit)
             
-            if args.log_csv or Confirm.ask(f"\n{PROMPT} {prompt_log_csv}"):
+            if csv_wanted():
                 log_commits_search(commit, query)
 
     # Downloading release tarball
     def download_tarball(self):
         logging.info(file_downloading.format(f"octosuite.v{version_tag}.tar"))
         xprint(INFO, file_downloading.format(f"octosuite.v{version_tag}.tar"))
-        data = requests.get(f"{self.endpoint}/repos/bellingcat/octosuite/tarball/{version_tag}")
+        data = transport.get(f"{self.endpoint}/repos/bellingcat/octosuite/tarball/{version_tag}")
         with open(os.path.join("downloads", f"octosuite.v{version_tag}.tar"), "wb") as file:
             file.write(data.content)
             file.close()
@@ -1111,7 +1459,7 @@ class Octosuite:
     def download_zipball(self):
         logging.info(file_downloading.format(f"octosuite.v{version_tag}.zip"))
         xprint(INFO, file_downloading.format(f"octosuite.v{version_tag}.zip"))
-        data = requests.get(f"{self.endpoint}/repos/rly0nheart/octosuite/zipball/{version_tag}")
+        data = transport.get(f"{self.endpoint}/repos/rly0nheart/octosuite/zipball/{version_tag}")
         with open(os.path.join("downloads", f"octosuite.v{version_tag}.zip"), "wb") as file:
             file.write(data.content)
             file.close()
@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import atexit
+
+# output.py
+# Headless output (--output ndjson/tsv): instead of being rendered with rich, every item a method finds is written
+# as one compact line to a block-buffered stdout, so results can be piped into jq, cut, sort, etc.
+# Messages (not found, logged to csv...) go to stderr, see config.py.
+output_format = None
+stream = None
+# Columns of the last tsv header written, a new header is written whenever the columns change
+tsv_columns = None
+
+
+def headless():
+    return output_format is not None
+
+
+def start(format_name, buffer_size=64 * 1024):
+    """
+    Send records to stdout
+
+    :param format_name: 'ndjson' or 'tsv'
+    :param buffer_size: bytes buffered before each write to stdout
+    """
+    global output_format, stream
+    output_format = format_name
+    stream = open(sys.stdout.fileno(), 'wb', buffering=buffer_size, closefd=False)
+    atexit.register(flush)
+
+
+# Nested values are kept as compact JSON, tabs/newlines are escaped so a record always stays on one line
+def tsv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def write_record(record):
+    """
+    Write one record (a flat dict) as a line of output
+    """
+    global tsv_columns
+    if output_format == 'ndjson':
+        line = json.dumps(record, separators=(',', ':'), ensure_ascii=False, default=str)
+    else:
+        columns = list(record)
+        if columns != tsv_columns:
+            tsv_columns = columns
+            write_line("\t".join(columns))
+        line = "\t".join(tsv_value(value) for value in record.values())
+    write_line(line)
+
+
+def write_line(line):
+    try:
+        stream.write(line.encode('utf-8') + b"\n")
+    except BrokenPipeError:
+        closed_pipe()
+        sys.exit(0)
+
+
+def flush():
+    if stream is None:
+        return
+    try:
+        stream.flush()
+    except BrokenPipeError:
+        closed_pipe()
+
+
+# The reader went away (eg. `| head`). Python ignores SIGPIPE, so writes fail with BrokenPipeError instead:
+# point stdout at devnull so the interpreter's own flush on exit doesn't fail again (and the run stops quietly).
+def closed_pipe():
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
@@ -0,0 +1,135 @@
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from octosuite import transport
+from octosuite.sharding import RateLimitGate
+from octosuite.log_roller import slice_truncated, slice_split, unknown_partition
+
+# partitioning.py
+# GitHub serves at most 1,000 results of any search, whatever its total_count. An exhaustive search (--exhaustive)
+# gets past that by splitting the query into disjoint slices of one qualifier (created:2008-01-01..2012-06-30,
+# stars:100..199...), bisecting every slice that still has more than 1,000 matches. Slices are fetched
+# concurrently (charged to the search rate-limit bucket), and their results are merged and de-duplicated by id.
+
+# GitHub serves at most this many results per search
+search_cap = 1000
+
+# Search kind -> endpoint, the key results are de-duplicated by and the qualifiers a query can be split on
+search_paths = {'users': '/search/users',
+                'repos': '/search/repositories',
+                'issues': '/search/issues',
+                'commits': '/search/commits',
+                'topics': '/search/topics'}
+id_keys = {'users': 'id', 'repos': 'id', 'issues': 'id', 'commits': 'sha', 'topics': 'name'}
+partition_qualifiers = {'users': ['created', 'followers', 'repos'],
+                        'repos': ['created', 'stars', 'size', 'forks'],
+                        'issues': ['created', 'comments'],
+                        'commits': ['author-date', 'committer-date'],
+                        'topics': ['created', 'repositories']}
+date_qualifiers = {'created', 'author-date', 'committer-date'}
+# Nothing on GitHub is older than this
+first_day = datetime.date(2007, 10, 1)
+# Unbounded slices (stars:>=N...) aren't split past this
+largest_number = 2 ** 31
+
+
+class Slice:
+    def __init__(self, qualifier, low, high):
+        """
+        :param qualifier: qualifier the slice is a range of (eg. 'created' or 'stars')
+        :param low: first date/number of the range
+        :param high: last date/number of the range (None: no upper bound)
+        """
+        self.qualifier = qualifier
+        self.low = low
+        self.high = high
+
+    def __str__(self):
+        if self.high is None:
+            return f"{self.qualifier}:>={self.low}"
+        return f"{self.qualifier}:{self.low}..{self.high}"
+
+    def split(self):
+        """
+        :return: two slices covering this one, or an empty list if it's a single day/number
+        """
+        if self.high is None:
+            # Unbounded numbers: a bounded slice and a further out unbounded one
+            if self.low > largest_number:
+                return []
+            edge = self.low * 2 + 100
+            return [Slice(self.qualifier, self.low, edge), Slice(self.qualifier, edge + 1, None)]
+        if self.high <= self.low:
+            return []
+        if self.qualifier in date_qualifiers:
+            middle = self.low + (self.high - self.low) // 2
+            return [Slice(self.qualifier, self.low, middle), Slice(self.qualifier, middle + datetime.timedelta(days=1),
+                                                                   self.high)]
+        middle = (self.low + self.high) // 2
+        return [Slice(self.qualifier, self.low, middle), Slice(self.qualifier, middle + 1, self.high)]
+
+
+def whole_range(qualifier):
+    if qualifier in date_qualifiers:
+        return Slice(qualifier, first_day, datetime.date.today())
+    return Slice(qualifier, 0, None)
+
+
+def fetch_slice(endpoint, kind, query, search_slice):
+    """
+    :return: (results of the slice, []) if GitHub serves all of them, otherwise ([], the slice's two halves)
+    """
+    response = transport.get(f"{endpoint}{search_paths[kind]}?q={query} {search_slice}&per_page=100")
+    if response.status_code != 200:
+        raise RuntimeError(f"{search_slice}: {response.status_code} {response.text[:200]}")
+    total = response.json()['total_count']
+    if total > search_cap:
+        halves = search_slice.split()
+        if halves:
+            logging.debug(slice_split.format(search_slice, total))
+            return [], halves
+        logging.warning(slice_truncated.format(query, search_slice, total, search_cap))
+    return list(transport.paginate(response, min(total, search_cap), items_key='items')), []
+
+
+def exhaustive_search(endpoint, kind, query, limit, qualifier=None, workers=4):
+    """
+    Yield every result of a search (up to <limit>), in no particular order
+
+    :param kind: 'users', 'repos', 'issues', 'commits' or 'topics'
+    :param qualifier: qualifier to split the query on, defaults to the kind's first partition_qualifiers
+    :param workers: slices fetched concurrently
+    """
+    qualifier = qualifier or partition_qualifiers[kind][0]
+    if qualifier not in partition_qualifiers[kind]:
+        raise ValueError(unknown_partition.format(qualifier, kind, ", ".join(partition_qualifiers[kind])))
+    if transport.rate_gate is None:
+        # Hold off while the search bucket is empty, instead of failing slices with 403s
+        transport.rate_gate = RateLimitGate(len(transport.tokens))
+
+    limit = int(limit)
+    id_key = id_keys[kind]
+    seen = set()
+    pending = set()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending.add(executor.submit(fetch_slice, endpoint, kind, query, whole_range(qualifier)))
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                items, halves = future.result()
+                for half in halves:
+                    pending.add(executor.submit(fetch_slice, endpoint, kind, query, half))
+                for item in items:
+                    # Slices don't overlap, but results can move between slices (and pages) while we page
+                    if item[id_key] in seen:
+                        continue
+                    seen.add(item[id_key])
+                    yield item
+                    if len(seen) >= limit:
+                        return
+    finally:
+        # Slices not started yet aren't needed anymore (shutdown's cancel_futures needs Python 3.9)
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,296 @@
+import queue
+import logging
+import threading
+from octosuite import transport, schemas
+from octosuite.log_roller import stage_failed, stage_finished, unknown_stage, stage_needs_input
+
+# pipelines.py
+# Chains commands so one command's results feed the next, eg.
+#
+#   org:repos bellingcat | repo:contributors | user:profile
+#
+# or the same as a YAML file (stages can also name the stage they read from, to fan out, and a stage given targets
+# as well works through both):
+#
+#   limit: 50
+#   stages:
+#     - command: org:repos
+#       target: bellingcat
+#     - command: repo:contributors
+#     - command: user:profile
+#
+# Every stage runs in its own pool of worker threads and streams: an entity found upstream is turned into a target
+# (a login, owner/repository...) and queued for the next stage straight away, so the chain takes roughly as long as
+# its slowest stage instead of the sum of all of them. Targets are de-duplicated per stage and queues are bounded,
+# so a fast stage blocks (backpressure) instead of buffering a whole organisation in memory.
+
+# Target fields of an entity (schema record) a stage can take, in order of preference
+target_fields = {'user': ['login', 'username', 'actor'],
+                 'org': ['login'],
+                 'repository': ['full_name', 'repository']}
+
+
+def list_items(endpoint, path, limit, items_key=None):
+    separator = '&' if '?' in path else '?'
+    response = transport.get_list(f"{endpoint}{path}{separator}per_page={transport.page_size(limit)}")
+    if response.status_code != 200:
+        logging.warning(stage_failed.format(path, response.status_code))
+        return
+    yield from transport.paginate(response, limit, items_key=items_key)
+
+
+def single_item(endpoint, path):
+    response = transport.get(f"{endpoint}{path}")
+    if response.status_code != 200:
+        logging.warning(stage_failed.format(path, response.status_code))
+        return
+    yield response.json()
+
+
+def user_email(endpoint, login, limit):
+    # Same approach as user:email, the author email of the latest commit in one of the user's own repositories
+    from octosuite.octosuite import get_email_from_contributor
+    for repository in list_items(endpoint, f"/users/{login}/repos?sort=pushed", 100):
+        if not repository['fork']:
+            email = get_email_from_contributor(login, repository['name'], login)
+            if email:
+                yield {'login': login, 'email': email}
+                return
+
+
+class StageType:
+    def __init__(self, takes, schema, fetch):
+        """
+        :param takes: kind of target the stage takes ('user', 'org', 'repository' or 'query')
+        :param schema: schema of the entities it yields
+        :param fetch: function(endpoint, target, limit) yielding entities
+        """
+        self.takes = takes
+        self.schema = schema
+        self.fetch = fetch
+
+
+# command -> StageType
+stage_types = {
+    'org:profile': StageType('org', schemas.org_profile, lambda e, t, l: single_item(e, f"/orgs/{t}")),
+    'org:repos': StageType('org', schemas.repository, lambda e, t, l: list_items(e, f"/orgs/{t}/repos", l)),
+    'org:events': StageType('org', schemas.event, lambda e, t, l: list_items(e, f"/orgs/{t}/events", l)),
+    'user:profile': StageType('user', schemas.user_profile, lambda e, t, l: single_item(e, f"/users/{t}")),
+    'user:email': StageType('user', schemas.user_email, user_email),
+    'user:repos': StageType('user', schemas.repository, lambda e, t, l: list_items(e, f"/users/{t}/repos", l)),
+    'user:gists': StageType('user', schemas.gist, lambda e, t, l: list_items(e, f"/users/{t}/gists", l)),
+    'user:orgs': StageType('user', schemas.user_org, lambda e, t, l: list_items(e, f"/users/{t}/orgs", l)),
+    'user:events': StageType('user', schemas.event,
+                             lambda e, t, l: list_items(e, f"/users/{t}/events/public", l)),
+    'user:subscriptions': StageType('user', schemas.repository,
+                                    lambda e, t, l: list_items(e, f"/users/{t}/subscriptions", l)),
+    'user:followers': StageType('user', schemas.user, lambda e, t, l: list_items(e, f"/users/{t}/followers", l)),
+    'user:following': StageType('user', schemas.user, lambda e, t, l: list_items(e, f"/users/{t}/following", l)),
+    'repo:profile': StageType('repository', schemas.repository, lambda e, t, l: single_item(e, f"/repos/{t}")),
+    'repo:contributors': StageType('repository', schemas.user,
+                                   lambda e, t, l: list_items(e, f"/repos/{t}/contributors", l)),
+    'repo:stargazers': StageType('repository', schemas.user,
+                                 lambda e, t, l: list_items(e, f"/repos/{t}/stargazers", l)),
+    'repo:forks': StageType('repository', schemas.repository, lambda e, t, l: list_items(e, f"/repos/{t}/forks", l)),
+    'repo:issues': StageType('repository', schemas.issue, lambda e, t, l: list_items(e, f"/repos/{t}/issues", l)),
+    'repo:releases': StageType('repository', schemas.release,
+                               lambda e, t, l: list_items(e, f"/repos/{t}/releases", l)),
+    'search:users': StageType('query', schemas.user,
+                              lambda e, t, l: list_items(e, f"/search/users?q={t}", l, items_key='items')),
+    'search:repos': StageType('query', schemas.repository,
+                              lambda e, t, l: list_items(e, f"/search/repositories?q={t}", l, items_key='items')),
+    'search:topics': StageType('query', schemas.topic,
+                               lambda e, t, l: list_items(e, f"/search/topics?q={t}", l, items_key='items')),
+    'search:issues': StageType('query', schemas.search_issue,
+                               lambda e, t, l: list_items(e, f"/search/issues?q={t}", l, items_key='items')),
+    'search:commits': StageType('query', schemas.commit,
+                                lambda e, t, l: list_items(e, f"/search/commits?q={t}", l, items_key='items')),
+}
+
+
+def target_of(takes, schema, row):
+    """
+    :return: the target a stage taking <takes> gets from an upstream entity, or None if it has none
+    """
+    for field in target_fields.get(takes, []):
+        if field in schema.keys:
+            value = row[schema.keys.index(field)]
+            if value:
+                return value
+    return None
+
+
+class Stage:
+    def __init__(self, name, command, targets=None, source=None, limit=10, workers=4, queue_size=100, show=None):
+        """
+        :param name: stage name (other stages refer to it with 'from')
+        :param command: the command it runs, one of stage_types
+        :param targets: targets it starts with (a first stage's, or ones added to what its source stage finds)
+        :param source: name of the stage it reads from
+        :param limit: maximum number of entities per target
+        :param workers: number of worker threads
+        :param queue_size: maximum number of targets waiting in its queue
+        :param show: whether its entities are shown, defaults to stages nothing reads from
+        """
+        if command not in stage_types:
+            raise ValueError(unknown_stage.format(command, ", ".join(sorted(stage_types))))
+        self.name = name
+        self.command = command
+        self.type = stage_types[command]
+        self.targets = targets or []
+        self.source = source
+        self.limit = int(limit)
+        self.workers = int(workers)
+        self.queue = queue.Queue(maxsize=int(queue_size))
+        self.show = show
+        self.consumers = []
+        self.seen = set()
+        self.seen_lock = threading.Lock()
+        self.running = 0
+        # Inputs (its targets, its source stage) still queueing targets
+        self.inputs = 0
+        self.count = 0
+
+    def offer(self, target):
+        """
+        Queue a target unless the stage already had it (blocks while the queue is full)
+        """
+        with self.seen_lock:
+            if target in self.seen:
+                return
+            self.seen.add(target)
+        self.queue.put(target)
+
+
+def parse_chain(text, limit=10, workers=4, queue_size=100):
+    """
+    :param text: 'command target | command | command ...'
+    :return: list of Stages
+    """
+    stages = []
+    for index, part in enumerate(text.split('|')):
+        words = part.split()
+        if not words:
+            continue
+        command, targets = words[0], words[1:]
+        stages.append(Stage(f"{index}:{command}", command, targets=targets,
+                            source=None if targets or not stages else stages[-1].name,
+                            limit=limit, workers=workers, queue_size=queue_size))
+    return stages
+
+
+def load_pipeline(filename, limit=10, workers=4, queue_size=100):
+    """
+    :param filename: YAML pipeline definition (see the top of this file)
+    :return: list of Stages
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("YAML pipelines need PyYAML: pip install octosuite[yaml]")
+    with open(filename) as file:
+        definition = yaml.safe_load(file)
+    limit = definition.get('limit', limit)
+    workers = definition.get('workers', workers)
+    queue_size = definition.get('queue_size', queue_size)
+    stages = []
+    for index, stage in enumerate(definition['stages']):
+        targets = stage.get('target', [])
+        if not isinstance(targets, list):
+            targets = [targets]
+        source = stage.get('from')
+        if source is None and not targets and stages:
+            source = stages[-1].name
+        stages.append(Stage(stage.get('name', f"{index}:{stage['command']}"), stage['command'],
+                            targets=[str(target) for target in targets], source=source,
+                            limit=stage.get('limit', limit), workers=stage.get('workers', workers),
+                            queue_size=stage.get('queue_size', queue_size), show=stage.get('show')))
+    return stages
+
+
+def run_pipeline(stages, endpoint, emit):
+    """
+    Run stages concurrently until every one of them has drained its queue
+
+    :param stages: list of Stages (parse_chain/load_pipeline)
+    :param endpoint: API endpoint
+    :param emit: function(stage, row) called (one call at a time) for every entity of a shown stage
+    :return: dict of stage name -> number of entities it found
+    """
+    # Stages can only read from earlier stages, so the graph has no cycles (which could deadlock the queues)
+    by_name = {}
+    for stage in stages:
+        if stage.source is not None:
+            if stage.source not in by_name:
+                raise ValueError(unknown_stage.format(stage.source, ", ".join(by_name)))
+            by_name[stage.source].consumers.append(stage)
+        elif not stage.targets:
+            raise ValueError(stage_needs_input.format(stage.name))
+        by_name[stage.name] = stage
+    for stage in stages:
+        if stage.show is None:
+            stage.show = not stage.consumers
+
+    emit_lock = threading.Lock()
+    finished_lock = threading.Lock()
+
+    def close_input(stage):
+        # The stage's last input to finish tells its workers that nothing else is coming
+        with finished_lock:
+            stage.inputs -= 1
+            last = stage.inputs == 0
+        if last:
+            for _ in range(stage.workers):
+                stage.queue.put(None)
+
+    def finish(stage):
+        # The stage's last worker closes each consumer's input
+        with finished_lock:
+            stage.running -= 1
+            last = stage.running == 0
+        if last:
+            logging.info(stage_finished.format(stage.name, stage.count, len(stage.seen)))
+            for consumer in stage.consumers:
+                close_input(consumer)
+
+    def work(stage):
+        try:
+            while True:
+                target = stage.queue.get()
+                if target is None:
+                    return
+                try:
+                    for item in stage.type.fetch(endpoint, target, stage.limit):
+                        row = stage.type.schema.row(item)
+                        with emit_lock:
+                            stage.count += 1
+                            if stage.show:
+                                emit(stage, row)
+                        for consumer in stage.consumers:
+                            consumer_target = target_of(consumer.type.takes, stage.type.schema, row)
+                            if consumer_target is not None:
+                                consumer.offer(consumer_target)
+                except Exception as e:
+                    logging.error(stage_failed.format(f"{stage.name} {target}", e))
+        finally:
+            finish(stage)
+
+    def feed(stage):
+        for target in stage.targets:
+            stage.offer(target)
+        close_input(stage)
+
+    threads = []
+    for stage in stages:
+        stage.running = stage.workers
+        stage.inputs = (stage.source is not None) + bool(stage.targets)
+        for _ in range(stage.workers):
+            threads.append(threading.Thread(target=work, args=(stage,), daemon=True))
+        # A stage with both targets and a source stage works through both
+        if stage.targets:
+            threads.append(threading.Thread(target=feed, args=(stage,), daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {stage.name: stage.count for stage in stages}
@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from datetime import datetime
+
+# profiler.py
+# This file wraps a dispatched command in cProfile (and optionally a stack sampler), saves the results under profiles/
+# and breaks the command's time down into phases (network, JSON decoding, rendering, CSV writing...).
+profiles_directory = "profiles"
+
+# Phases are matched against the file path (or, for C functions, the name) of every profiled function,
+# the first phase with a matching marker gets the function's own time.
+phases = [("Prompts", ['rich/prompt', "built-in method builtins.input", 'readline']),
+          ("Network", ['requests/', 'urllib3/', 'http/client', 'ssl.py', 'socket.py', '_socket', '_ssl',
+                       'octosuite/transport']),
+          ("JSON decoding", ['json/', '_json']),
+          ("Rendering", ['rich/', 'markdown_it/', 'pygments/']),
+          ("CSV writing", ['csv.py', '_csv', 'octosuite/csv_loggers', 'octosuite/catalog', 'sqlite3'])]
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of a thread every <interval> seconds and counts identical stacks,
+    which is what flame graph tools expect in their 'collapsed' input format.
+    """
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})")
+                frame = frame.f_back
+            if stack:
+                collapsed = ';'.join(reversed(stack))
+                self.stacks[collapsed] = self.stacks.get(collapsed, 0) + 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def save(self, filename):
+        with open(filename, 'w') as file:
+            for stack, count in sorted(self.stacks.items()):
+                file.write(f"{stack} {count}\n")
+
+
+def phase_of(filename, name):
+    location = f"{filename}:{name}".replace('\\', '/')
+    for phase, markers in phases:
+        if any(marker in location for marker in markers):
+            return phase
+    return "Other"
+
+
+def phase_breakdown(stats):
+    """
+    Group the profiled functions' own time (tottime) by phase
+
+    :param stats: pstats.Stats
+    :return: a list of (phase, seconds) tuples, slowest first
+    """
+    breakdown = {}
+    for (filename, line, name), (calls, primitive_calls, own_time, cumulative_time, callers) in stats.stats.items():
+        phase = phase_of(filename, name)
+        breakdown[phase] = breakdown.get(phase, 0.0) + own_time
+    return sorted(breakdown.items(), key=lambda item: item[1], reverse=True)
+
+
+def profile_command(name, method, collapsed=False, interval=0.005):
+    """
+    Run a command under cProfile and save its stats to profiles/<name>-<timestamp>.pstats
+
+    :param name: command name (used in the file names)
+    :param method: the command's method
+    :param collapsed: also sample the stack and save a flame graph compatible .collapsed file
+    :param interval: stack sampling interval in seconds
+    :return: dict with the command's 'elapsed' time, its 'phases' breakdown and the saved 'files'
+    """
+    os.makedirs(profiles_directory, exist_ok=True)
+    basename = os.path.join(profiles_directory,
+                            f"{name.replace(':', '_')}-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}")
+    sampler = StackSampler(threading.get_ident(), interval) if collapsed else None
+    profile = cProfile.Profile()
+
+    started = time.perf_counter()
+    if sampler:
+        sampler.start()
+    try:
+        profile.runcall(method)
+    finally:
+        elapsed = time.perf_counter() - started
+        if sampler:
+            sampler.stop()
+
+    files = [f"{basename}.pstats"]
+    profile.dump_stats(files[0])
+    if sampler:
+        files.append(f"{basename}.collapsed")
+        sampler.save(files[1])
+    return {'elapsed': elapsed, 'phases': phase_breakdown(pstats.Stats(profile)), 'files': files}
@@ -0,0 +1,305 @@
+from operator import itemgetter
+from rich.tree import Tree
+
+# schemas.py
+# One declarative schema per entity type (user, repository, issue...). A schema lists the entity's title, fields and
+# (optional) text as (key, label[, path]) tuples and compiles them into a single extractor (operator.itemgetter
+# when every path is top-level) that the tree renderer, csv files, ndjson/tsv records and result stores share.
+# Paths are dotted for nested values, eg. 'commit.author.email'; a null along the way yields None.
+
+
+def path_getter(path):
+    keys = path.split('.')
+    if len(keys) == 1:
+        return itemgetter(path)
+
+    def get(item):
+        for key in keys:
+            if item is None:
+                return None
+            item = item[key]
+        return item
+    return get
+
+
+def compile_extractor(paths):
+    """
+    :param paths: field paths
+    :return: function returning the tuple of an item's values at <paths>
+    """
+    if all('.' not in path for path in paths):
+        if len(paths) == 1:
+            getter = itemgetter(paths[0])
+            return lambda item: (getter(item),)
+        return itemgetter(*paths)
+    getters = [path_getter(path) for path in paths]
+    return lambda item: tuple([getter(item) for getter in getters])
+
+
+class Schema:
+    def __init__(self, name, title, fields, text=None):
+        """
+        :param name: entity name (its key in the registry)
+        :param title: (key, label[, path]) of the value an item is shown under
+        :param fields: (key, label[, path]) of the values shown under the title
+        :param text: (key, label[, path]) of a long value printed after the tree (eg. an issue's body)
+        """
+        self.name = name
+        self.text = text
+        columns = [title] + list(fields) + ([text] if text else [])
+        # Columns in row order: title, fields, text
+        self.keys = [column[0] for column in columns]
+        self.labels = [column[1] for column in columns]
+        self.paths = [column[2] if len(column) > 2 else column[0] for column in columns]
+        self.field_labels = self.labels[1:len(fields) + 1]
+        self.row = compile_extractor(self.paths)
+
+    def record(self, row):
+        """
+        :param row: values returned by .row(item)
+        :return: dict of key -> value
+        """
+        return dict(zip(self.keys, row))
+
+    def tree(self, row):
+        """
+        :param row: values returned by .row(item)
+        :return: rich Tree of the title and fields (the text is left out)
+        """
+        tree = Tree(f"\n{row[0]}")
+        for label, value in zip(self.field_labels, row[1:]):
+            tree.add(f"{label}: {value}")
+        return tree
+
+
+user = Schema('user', ('login', 'Username'),
+              [('avatar_url', 'Profile Photo'),
+               ('id', 'ID'),
+               ('node_id', 'Node ID'),
+               ('gravatar_id', 'Gravatar ID'),
+               ('site_admin', 'Is site admin?'),
+               ('type', 'Account type'),
+               ('html_url', 'URL')])
+
+user_profile = Schema('user_profile', ('name', 'Name'),
+                      [('avatar_url', 'Profile Photo'),
+                       ('login', 'Username'),
+                       ('id', 'ID'),
+                       ('node_id', 'Node ID'),
+                       ('bio', 'Bio'),
+                       ('blog', 'Blog'),
+                       ('email', 'Email'),
+                       ('location', 'Location'),
+                       ('followers', 'Followers'),
+                       ('following', 'Following'),
+                       ('twitter_username', 'Twitter Handle'),
+                       ('public_gists', 'Gists (public)'),
+                       ('public_repos', 'Repositories (public)'),
+                       ('company', 'organisation'),
+                       ('hireable', 'Is hireable?'),
+                       ('site_admin', 'Is site admin?'),
+                       ('created_at', 'Joined at'),
+                       ('updated_at', 'Updated at')])
+
+
+
+# Schema of a listed user: its profile's if it was fetched (--enrich), the list endpoints' stub otherwise
+def listed_user(item):
+    return user_profile if 'created_at' in item else user
+
+
+org_profile = Schema('org_profile', ('name', 'Name'),
+                     [('avatar_url', 'Profile Photo'),
+                      ('login', 'Username'),
+                      ('id', 'ID'),
+                      ('node_id', 'Node ID'),
+                      ('email', 'Email'),
+                      ('description', 'About'),
+                      ('blog', 'Blog'),
+                      ('location', 'Location'),
+                      ('followers', 'Followers'),
+                      ('following', 'Following'),
+                      ('twitter_username', 'Twitter handle'),
+                      ('public_gists', 'Gists'),
+                      ('public_repos', 'Repositories'),
+                      ('type', 'Account type'),
+                      ('is_verified', 'Is verified?'),
+                      ('has_organisation_projects', 'Has organisation projects?'),
+                      ('has_repository_projects', 'Has repository projects?'),
+                      ('created_at', 'Created at'),
+                      ('updated_at', 'Updated at')])
+
+repository = Schema('repository', ('full_name', 'Name'),
+                    [('id', 'ID'),
+                     ('description', 'About'),
+                     ('forks', 'Forks'),
+                     ('stargazers_count', 'Stars'),
+                     ('watchers', 'Watchers'),
+                     ('license', 'License'),
+                     ('default_branch', 'Branch'),
+                     ('visibility', 'Visibility'),
+                     ('language', 'Language(s)'),
+                     ('open_issues', 'Open issues'),
+                     ('topics', 'Topics'),
+                     ('homepage', 'Homepage'),
+                     ('clone_url', 'Clone URL'),
+                     ('ssh_url', 'SSH URL'),
+                     ('fork', 'Is fork?'),
+                     ('allow_forking', 'Is forkable?'),
+                     ('private', 'Is private?'),
+                     ('archived', 'Is archived?'),
+                     ('is_template', 'Is template?'),
+                     ('has_downloads', 'Has downloads?'),
+                     ('has_issues', 'Has issues?'),
+                     ('has_pages', 'Has pages?'),
+                     ('has_projects', 'Has projects?'),
+                     ('has_wiki', 'Has wiki?'),
+                     ('pushed_at', 'Pushed at'),
+                     ('created_at', 'Created at'),
+                     ('updated_at', 'Updated at')])
+
+content = Schema('content', ('name', 'Filename'),
+                 [('size', 'Size (bytes)'),
+                  ('type', 'Type'),
+                  ('path', 'Path'),
+                  ('sha', 'SHA'),
+                  ('html_url', 'URL')])
+
+issue = Schema('issue', ('title', 'Title'),
+               [('id', 'ID'),
+                ('node_id', 'Node ID'),
+                ('state', 'State'),
+                ('reactions', 'Reactions'),
+                ('number', 'Number'),
+                ('comments', 'Comments'),
+                ('milestone', 'Milestone'),
+                ('assignee', 'Assignee'),
+                ('active_lock_reason', 'Lock reason'),
+                ('author_association', 'Author association'),
+                ('assignees', 'Assignees'),
+                ('labels', 'Labels'),
+                ('locked', 'Is locked?'),
+                ('closed_at', 'Closed at'),
+                ('created_at', 'Created at'),
+                ('updated_at', 'Updated at')],
+               text=('body', 'Body'))
+
+# /search/issues items carry a relevance score and (for pull requests) a draft flag
+search_issue = Schema('search_issue', ('title', 'Title'),
+                      [('id', 'ID'),
+                       ('node_id', 'Node ID'),
+                       ('score', 'Score'),
+                       ('state', 'State'),
+                       ('number', 'Number'),
+                       ('comments', 'Comments'),
+                       ('milestone', 'Milestone'),
+                       ('assignee', 'Assignee'),
+                       ('assignees', 'Assignees'),
+                       ('labels', 'Labels'),
+                       ('locked', 'Is locked?'),
+                       ('draft', 'Is draft?'),
+                       ('closed_at', 'Closed at'),
+                       ('created_at', 'Created at')],
+                      text=('body', 'Body'))
+
+release = Schema('release', ('name', 'Name'),
+                 [('id', 'ID'),
+                  ('node_id', 'Node ID'),
+                  ('tag_name', 'Tag'),
+                  ('target_commitish', 'Branch'),
+                  ('assets', 'Assets'),
+                  ('draft', 'Is draft?'),
+                  ('prerelease', 'Is prerelease?'),
+                  ('created_at', 'Created at'),
+                  ('published_at', 'Published at')],
+                 text=('body', 'Body'))
+
+event = Schema('event', ('id', 'ID'),
+               [('actor', 'Actor', 'actor.login'),
+                ('type', 'Type'),
+                ('repository', 'Repository', 'repo.name'),
+                ('created_at', 'Created at')],
+               text=('payload', 'Payload'))
+
+gist = Schema('gist', ('id', 'ID'),
+              [('node_id', 'Node ID'),
+               ('description', 'About'),
+               ('comments', 'Comments'),
+               ('files', 'Files'),
+               ('git_push_url', 'Git Push URL'),
+               ('public', 'Is public?'),
+               ('truncated', 'Is truncated?'),
+               ('updated_at', 'Updated at')])
+
+user_org = Schema('user_org', ('login', 'Username'),
+                  [('avatar_url', 'Profile Photo'),
+                   ('id', 'ID'),
+                   ('node_id', 'Node ID'),
+                   ('url', 'URL'),
+                   ('description', 'About')])
+
+topic = Schema('topic', ('name', 'Name'),
+               [('score', 'Score'),
+                ('curated', 'Curated'),
+                ('featured', 'Featured'),
+                ('display_name', 'Display name'),
+                ('created_by', 'Created by'),
+                ('created_at', 'Created at'),
+                ('updated_at', 'Updated at')])
+
+commit = Schema('commit', ('sha', 'SHA', 'commit.tree.sha'),
+                [('author', 'Author', 'commit.author.name'),
+                 ('username', 'Username', 'author.login'),
+                 ('email', 'Email', 'commit.author.email'),
+                 ('committer', 'Committer', 'commit.committer.name'),
+                 ('repository', 'Repository', 'repository.full_name'),
+                 ('html_url', 'URL')],
+                text=('message', 'Message', 'commit.message'))
+
+user_email = Schema('user_email', ('login', 'Username'),
+                    [('email', 'Email')])
+
+identity = Schema('identity', ('email', 'Email'),
+                  [('name', 'Name'),
+                   ('login', 'Username'),
+                   ('commits', 'Commits'),
+                   ('authored', 'Authored'),
+                   ('committed', 'Committed'),
+                   ('repositories', 'Repositories'),
+                   ('first_seen', 'First seen'),
+                   ('last_seen', 'Last seen')])
+
+change = Schema('change', ('field', 'Field'),
+                [('entity', 'Entity'),
+                 ('target', 'Target'),
+                 ('old', 'Before'),
+                 ('new', 'After'),
+                 ('changed_at', 'Changed at')])
+
+tree_entry = Schema('tree_entry', ('path', 'Path'),
+                    [('type', 'Type'),
+                     ('mode', 'Mode'),
+                     ('sha', 'SHA'),
+                     ('size', 'Size (bytes)')])
+
+directory_size = Schema('directory_size', ('path', 'Directory'),
+                        [('files', 'Files'),
+                         ('size', 'Size (bytes)')])
+
+mirrored_file = Schema('mirrored_file', ('path', 'Path'),
+                       [('sha', 'SHA'),
+                        ('size', 'Size (bytes)'),
+                        ('downloaded', 'Downloaded?')])
+
+found_file = Schema('found_file', ('path', 'Path'),
+                    [('repository', 'Repository'),
+                     ('pattern', 'Pattern'),
+                     ('sha', 'SHA'),
+                     ('size', 'Size (bytes)')])
+
+# entity name -> schema
+registry = {schema.name: schema for schema in [user, user_profile, org_profile, repository, content, issue,
+                                               search_issue, release,
+                                               event, gist, user_org, topic, commit, user_email, identity,
+                                               change, tree_entry, directory_size, mirrored_file,
+                                               found_file]}
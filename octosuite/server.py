@@ -0,0 +1,153 @@
+import json
+import logging
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from octosuite import telemetry, output
+from octosuite.config import xprint
+from octosuite.message_prefixes import INFO
+from octosuite.pipelines import stage_types
+from octosuite.log_roller import error, serving, request_served, client_gone
+
+# server.py
+# octosuite --serve keeps one process (its pooled connections, ETag cache and tokens) running and answers
+# methods over a local HTTP/JSON API, so tools calling Octosuite many times a minute don't pay for a new process,
+# the banner and the update check on every call. Every request is handled in its own thread, and results are
+# streamed back (chunked, one JSON record per line) while they are being fetched:
+#
+#   GET  /methods                                          methods that can be run
+#   GET  /run?method=org_repos&target=bellingcat&limit=50  ndjson (or &format=tsv) records
+#   POST /run  {"method": "org_repos", "target": "bellingcat", "limit": 50}
+#   GET  /stats                                            request statistics (see telemetry.py)
+#   GET  /health
+
+
+def stage_name(method):
+    """
+    :return: the pipeline stage (pipelines.stage_types) running a --method, eg. users_search -> search:users
+    """
+    if method.endswith('_search'):
+        return f"search:{method[:-len('_search')]}"
+    return method.replace('_', ':', 1)
+
+
+def served_methods(argument_map):
+    """
+    :return: dict of --method name -> StageType, for the methods that take a single target
+    """
+    return {method: stage_types[stage_name(method)] for method in argument_map if stage_name(method) in stage_types}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, and chunked responses
+    protocol_version = 'HTTP/1.1'
+    # Set by serve()
+    endpoint = None
+    methods = {}
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+    def send_json(self, status, body):
+        data = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/run':
+            self.run({key: values[-1] for key, values in parse_qs(url.query).items()})
+        elif url.path == '/methods':
+            self.send_json(200, {'methods': sorted(self.methods)})
+        elif url.path == '/stats':
+            self.send_json(200, telemetry.summary())
+        elif url.path == '/health':
+            self.send_json(200, {'status': 'ok'})
+        else:
+            self.send_json(404, {'error': f"not found: {url.path}"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/run':
+            self.send_json(404, {'error': f"not found: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            parameters = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self.send_json(400, {'error': f"invalid JSON body: {e}"})
+            return
+        self.run(parameters)
+
+    def run(self, parameters):
+        method, target = parameters.get('method'), parameters.get('target')
+        record_format = parameters.get('format', 'ndjson')
+        if method not in self.methods:
+            self.send_json(404, {'error': f"unknown method: {method}", 'methods': sorted(self.methods)})
+            return
+        if not target:
+            self.send_json(400, {'error': "target is required"})
+            return
+        if record_format not in ('ndjson', 'tsv'):
+            self.send_json(400, {'error': "format must be ndjson or tsv"})
+            return
+        try:
+            limit = int(parameters.get('limit', 10))
+        except ValueError:
+            self.send_json(400, {'error': "limit must be a number"})
+            return
+
+        stage_type = self.methods[method]
+        schema = stage_type.schema
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson' if record_format == 'ndjson'
+                         else 'text/tab-separated-values')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        count = 0
+        try:
+            if record_format == 'tsv':
+                self.send_chunk("\t".join(schema.keys).encode('utf-8') + b"\n")
+            for item in stage_type.fetch(self.endpoint, target, limit):
+                row = schema.row(item)
+                if record_format == 'ndjson':
+                    line = json.dumps(schema.record(row), separators=(',', ':'), ensure_ascii=False, default=str)
+                else:
+                    line = "\t".join(output.tsv_value(value) for value in row)
+                self.send_chunk(line.encode('utf-8') + b"\n")
+                count += 1
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away, stop fetching for it
+            logging.info(client_gone.format(method, target))
+            self.close_connection = True
+            return
+        except Exception as e:
+            # Headers are gone already: end the connection without the last chunk, so the client sees a broken stream
+            logging.error(error.format(e))
+            self.close_connection = True
+            return
+        logging.info(request_served.format(method, target, count))
+
+
+def serve(host, port, endpoint, argument_map):
+    """
+    Answer requests until interrupted (Ctrl+C)
+
+    :param endpoint: API endpoint
+    :param argument_map: the session's --method map, the methods that take a single target are served
+    """
+    RequestHandler.endpoint = endpoint
+    RequestHandler.methods = served_methods(argument_map)
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.daemon_threads = True
+    logging.info(serving.format(host, server.server_address[1]))
+    xprint(f"{INFO} {serving.format(host, server.server_address[1])}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
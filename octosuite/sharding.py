@@ -0,0 +1,236 @@
+import time
+import queue
+import bisect
+import hashlib
+import logging
+import requests
+import multiprocessing
+from octosuite import transport, telemetry, csv_loggers
+from octosuite.config import args
+from octosuite.log_handlers import ContextFilter, RecordQueueHandler, command_context, target_context
+from octosuite.log_roller import worker_failed, worker_finished, rate_limit_wait
+
+# sharding.py
+# Batch runs (--method with --targets) over many targets can be spread over worker processes (--workers), so
+# decoding and rendering use more than one core. Targets are assigned to workers with a consistent hash ring (the
+# same target always lands on the same worker, and changing the number of workers only moves a fraction of them).
+# Every worker has its own HTTP session and its own slice of the tokens (OCTOSUITE_TOKENS), sends the rows it finds
+# back to the parent process, which is the only one writing results (stdout, --export, --log-to-csv files and their
+# catalog rows...), and charges its requests to a RateLimitGate shared by all the workers, so together they don't run
+# a token's budget into the ground. Workers are forked, so they inherit the parsed arguments and settings (a spawned
+# worker would import config again, parsing the command line and asking for colo[u]rs).
+
+# Rate-limit resources tracked per token, see transport.rate_limit_resource()
+resources = ['core', 'search', 'graphql']
+# Rows sent to the parent per message
+batch_size = 100
+
+
+def start_context():
+    """
+    :return: the multiprocessing context workers are forked with, None where processes can't be forked (Windows)
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def stable_hash(value):
+    # hash() is salted per process, blake2b gives every process the same ring
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    def __init__(self, shards, replicas=64):
+        """
+        :param shards: number of shards (workers)
+        :param replicas: points per shard on the ring, more points spread targets more evenly
+        """
+        self.points = sorted((stable_hash(f"{shard}:{replica}"), shard)
+                             for shard in range(shards) for replica in range(replicas))
+        self.hashes = [point[0] for point in self.points]
+
+    def shard_of(self, target):
+        # The first point clockwise from the target's hash
+        index = bisect.bisect(self.hashes, stable_hash(target)) % len(self.points)
+        return self.points[index][1]
+
+
+class RateLimitGate:
+    def __init__(self, tokens, reserve=0, context=multiprocessing):
+        """
+        Rate-limit budgets (per token and resource) in shared memory, so every worker process sees the others' requests
+
+        :param tokens: number of tokens (1 for unauthenticated requests)
+        :param reserve: requests left unspent per budget, requests wait for the reset once only this many remain
+        :param context: multiprocessing context the workers are started with
+        """
+        slots = max(1, tokens) * len(resources)
+        self.lock = context.Lock()
+        # -1 until a response tells the budget
+        self.remaining = context.RawArray('q', [-1] * slots)
+        self.reset = context.RawArray('q', [0] * slots)
+        self.reserve = reserve
+
+    def slot(self, token, resource):
+        return token * len(resources) + (resources.index(resource) if resource in resources else 0)
+
+    def acquire(self, token, resource):
+        """
+        Take one request from a budget, waiting for its reset while it is (nearly) used up
+        """
+        slot = self.slot(token, resource)
+        while True:
+            with self.lock:
+                remaining, reset = self.remaining[slot], self.reset[slot]
+                wait = reset - time.time()
+                if remaining < 0 or remaining > self.reserve or wait <= 0:
+                    # Charged before the response arrives, so concurrent workers don't all spend the last requests
+                    self.remaining[slot] = remaining - 1 if remaining > 0 else -1
+                    return
+            logging.warning(rate_limit_wait.format(resource, round(wait)))
+            time.sleep(min(wait + 1, 60))
+
+    def update(self, token, headers):
+        """
+        Sync a budget with a response's X-RateLimit headers
+        """
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        slot = self.slot(token, headers.get('X-RateLimit-Resource', 'core'))
+        remaining = int(headers['X-RateLimit-Remaining'])
+        reset = int(headers.get('X-RateLimit-Reset', 0))
+        with self.lock:
+            # Within the same window, requests charged by other workers may not be reflected in this response yet
+            if reset == self.reset[slot] and 0 <= self.remaining[slot] < remaining:
+                remaining = self.remaining[slot]
+            self.remaining[slot] = remaining
+            self.reset[slot] = reset
+
+
+def token_slices(tokens, workers):
+    """
+    :return: per worker, the positions of the tokens it uses (workers share tokens when there are fewer tokens)
+    """
+    if not tokens:
+        return [[] for _ in range(workers)]
+    if len(tokens) >= workers:
+        return [list(range(worker, len(tokens), workers)) for worker in range(workers)]
+    return [[worker % len(tokens)] for worker in range(workers)]
+
+
+def apply_target(method, target):
+    """
+    Point the --method's arguments at a target (a login, an organisation, owner/repository or a search query)
+    """
+    if method.startswith('repo_') or method == 'diff_repo':
+        args.username, _, args.repository = target.partition('/')
+    elif method.startswith('org_') or method == 'diff_org':
+        args.organisation = target
+    elif method.endswith('_search'):
+        args.query = target
+    else:
+        args.username = target
+
+
+def shard_worker(shard, targets, endpoint, tokens, slots, gate, results):
+    """
+    Run the --method for every target of a shard, in a worker process
+
+    :param results: queue the worker's rows, log records and telemetry go to
+    """
+    from octosuite import octosuite as suite
+
+    # Its own connection pool (a forked session would share the parent's sockets)
+    transport.session = requests.Session()
+    transport.use_tokens(tokens, slots, gate)
+
+    # Log records are written by the parent
+    handler = RecordQueueHandler(results)
+    handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+
+    rows = []
+
+    def send_rows():
+        if rows:
+            results.put(('rows', list(rows)))
+            rows.clear()
+
+    def collect(schema, row):
+        rows.append((schema.name, row))
+        if len(rows) >= batch_size:
+            send_rows()
+
+    suite.result_sink = collect
+    csv_loggers.csv_sink = lambda *csv_file: results.put(('csv', csv_file))
+    run = suite.Octosuite()
+    run.endpoint = endpoint
+    method = run.argument_map.get(args.method)
+    command_context.set(args.method)
+    for target in targets:
+        target_context.set(target)
+        apply_target(args.method, target)
+        try:
+            method()
+        except Exception as e:
+            logging.error(worker_failed.format(shard, f"{target}: {e}"))
+        send_rows()
+    results.put(('done', shard, telemetry.snapshot()))
+
+
+def run_sharded(targets, workers, endpoint, tokens, present):
+    """
+    Run the --method for every target, spread over worker processes
+
+    :param targets: logins/organisations/repositories/queries
+    :param workers: number of worker processes
+    :param endpoint: API endpoint
+    :param tokens: GitHub tokens shared out between the workers
+    :param present: function(schema name, row) called by this (the only writing) process for every row
+    """
+    context = start_context()
+    ring = HashRing(workers)
+    shards = [[] for _ in range(workers)]
+    for target in dict.fromkeys(targets):
+        shards[ring.shard_of(target)].append(target)
+
+    gate = RateLimitGate(len(tokens), reserve=workers, context=context)
+    # Bounded, so workers wait for the writer instead of piling rows up in memory
+    results = context.Queue(maxsize=workers * 16)
+    processes = {}
+    for shard, (shard_targets, slots) in enumerate(zip(shards, token_slices(tokens, workers))):
+        if not shard_targets:
+            continue
+        process = context.Process(target=shard_worker, daemon=True,
+                                  args=(shard, shard_targets, endpoint, [tokens[slot] for slot in slots], slots,
+                                        gate, results))
+        process.start()
+        processes[shard] = process
+
+    running = set(processes)
+    while running:
+        try:
+            message = results.get(timeout=1)
+        except queue.Empty:
+            # A worker that died without saying so (killed, out of memory...)
+            for shard in list(running):
+                if not processes[shard].is_alive():
+                    running.discard(shard)
+                    logging.error(worker_failed.format(shard, f"exit code {processes[shard].exitcode}"))
+            continue
+        if isinstance(message, logging.LogRecord):
+            logging.getLogger().handle(message)
+        elif message[0] == 'rows':
+            for name, row in message[1]:
+                present(name, row)
+        elif message[0] == 'csv':
+            csv_loggers.write_csv(*message[1])
+        elif message[0] == 'done':
+            _, shard, stats = message
+            telemetry.merge(stats)
+            running.discard(shard)
+            logging.info(worker_finished.format(shard, len(shards[shard])))
+    for process in processes.values():
+        process.join()
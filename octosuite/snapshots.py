@@ -0,0 +1,115 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# snapshots.py
+# With --snapshot, every user/organisation/repository profile fetched is normalized (flattened to dotted keys, without
+# the API's *_url links and the timestamps that move whenever anything else does) and saved to a SQLite file with
+# its SHA-256. The next fetch of the same entity compares hashes first: an unchanged entity only has its check time
+# updated, and a field-level diff is worked out (and kept in the change history diff:<entity> shows) only when the
+# hash differs, so a sweep of tens of thousands of profiles surfaces just the few that changed.
+snapshots_file = ".snapshots.db"
+
+# Fields left out of snapshots: they change on every change, or on their own
+volatile_fields = {'updated_at', 'pushed_at'}
+
+
+def normalize(item, prefix=''):
+    """
+    :return: dict of dotted key -> value of an API object (nested objects are flattened, links left out)
+    """
+    fields = {}
+    for key, value in item.items():
+        if key == 'url' or key.endswith('_url') or key in volatile_fields:
+            continue
+        if isinstance(value, dict):
+            fields.update(normalize(value, f"{prefix}{key}."))
+        else:
+            fields[f"{prefix}{key}"] = value
+    return fields
+
+
+def content_hash(fields):
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+                          ).hexdigest()
+
+
+def field_diff(old, new):
+    """
+    :return: sorted list of (field, old value, new value) of the fields that differ (None for added/removed fields)
+    """
+    return [(field, old.get(field), new.get(field)) for field in sorted(old.keys() | new.keys())
+            if old.get(field) != new.get(field)]
+
+
+class SnapshotStore:
+    def __init__(self, filename=snapshots_file):
+        """
+        Latest snapshot of every entity, and the history of its changes
+        """
+        self.lock = threading.Lock()
+        # Sharded batches (--workers) write from several processes
+        self.connection = sqlite3.connect(filename, timeout=60, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS snapshots (entity TEXT,
+                                                                         target TEXT,
+                                                                         hash TEXT,
+                                                                         document TEXT,
+                                                                         taken_at REAL,
+                                                                         checked_at REAL,
+                                                                         PRIMARY KEY (entity, target))""")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS changes (entity TEXT,
+                                                                       target TEXT,
+                                                                       field TEXT,
+                                                                       old TEXT,
+                                                                       new TEXT,
+                                                                       changed_at REAL)""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS changes_target ON changes (entity, target, changed_at)")
+
+    def record(self, entity, target, item):
+        """
+        Save a fetched entity, if it changed since its last snapshot
+
+        :param entity: 'user', 'org' or 'repo'
+        :param target: login or owner/repository (case-insensitive)
+        :param item: the API's object
+        :return: list of (field, old value, new value), empty if nothing changed or it's the entity's first snapshot
+        """
+        target = target.lower()
+        fields = normalize(item)
+        digest = content_hash(fields)
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT hash, document FROM snapshots WHERE entity = ? AND target = ?",
+                                          (entity, target)).fetchone()
+            if row is not None and row[0] == digest:
+                self.connection.execute("UPDATE snapshots SET checked_at = ? WHERE entity = ? AND target = ?",
+                                        (now, entity, target))
+                return []
+            changes = [] if row is None else field_diff(json.loads(row[1]), fields)
+            self.connection.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                                    (entity, target, digest, json.dumps(fields, sort_keys=True, default=str), now,
+                                     now))
+            self.connection.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?)",
+                                        [(entity, target, field, json.dumps(old, default=str),
+                                          json.dumps(new, default=str), now) for field, old, new in changes])
+        return changes
+
+    def history(self, entity, target, limit=None):
+        """
+        :return: the entity's changes, newest first, as dicts (None if it was never snapshotted)
+        """
+        target = target.lower()
+        with self.lock:
+            if self.connection.execute("SELECT 1 FROM snapshots WHERE entity = ? AND target = ?",
+                                       (entity, target)).fetchone() is None:
+                return None
+            cursor = self.connection.execute("SELECT field, old, new, changed_at FROM changes "
+                                             "WHERE entity = ? AND target = ? ORDER BY changed_at DESC, field "
+                                             "LIMIT ?", (entity, target, -1 if limit is None else int(limit)))
+            return [{'field': field, 'entity': entity, 'target': target, 'old': json.loads(old),
+                     'new': json.loads(new),
+                     'changed_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(changed_at))}
+                    for field, old, new, changed_at in cursor.fetchall()]
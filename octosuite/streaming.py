@@ -0,0 +1,163 @@
+import re
+import json
+import codecs
+
+# streaming.py
+# Decodes the items of a JSON list response while its body is still arriving (--stream), instead of holding the
+# whole body and its decoded object graph: each array item is handed to the caller as soon as its last byte has been
+# read, and dropped from the buffer after. With ijson installed (pip install octosuite[fast]), its C parser does the
+# work. Otherwise the standard library's decoder is run item by item over a buffer of the unparsed bytes.
+# orjson, when installed, decodes whole (non-streamed) bodies, see loads().
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bytes read from the socket at a time
+chunk_size = 65536
+
+whitespace = re.compile(r'[ \t\n\r]*')
+decoder = json.JSONDecoder()
+
+
+def loads(content):
+    """
+    :param content: a whole JSON body (bytes)
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class ChunkFile:
+    def __init__(self, chunks):
+        """
+        Read-only file over an iterator of byte chunks (for ijson)
+        """
+        self.chunks = iter(chunks)
+        self.pending = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.pending) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.pending += chunk
+        if size < 0:
+            size = len(self.pending)
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+
+class ChunkReader:
+    def __init__(self, chunks):
+        """
+        Buffer of the text of byte chunks that haven't been parsed yet
+        """
+        self.chunks = iter(chunks)
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.finished = False
+
+    def fill(self):
+        """
+        Append the next chunk to the buffer (dropping what was parsed)
+
+        :return: False at the end of the body
+        """
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            if not self.finished:
+                self.finished = True
+                self.buffer = self.buffer[self.position:] + self.text.decode(b'', final=True)
+                self.position = 0
+            return False
+        self.buffer = self.buffer[self.position:] + self.text.decode(chunk)
+        self.position = 0
+        return True
+
+    def peek(self):
+        """
+        :return: the next character that isn't whitespace ('' at the end of the body)
+        """
+        while True:
+            self.position = whitespace.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ''
+
+    def expect(self, character):
+        if self.peek() != character:
+            raise ValueError(f"expected {character!r} at {self.buffer[self.position:self.position + 40]!r}")
+        self.position += 1
+
+    def value(self):
+        """
+        :return: the next JSON value, once all of it has been read
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number running up to the end of the buffer may go on in the next chunk
+            if end == len(self.buffer) and not self.finished and self.fill():
+                continue
+            self.position = end
+            return value
+
+    def array(self):
+        """
+        Yield the items of the array that starts here
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ']':
+                self.position += 1
+                return
+            self.expect(',')
+
+
+def decode_items(reader, items_key):
+    if items_key is None:
+        yield from reader.array()
+        return
+    # The object holding the items: skip the values before <items_key>, and stop at its end
+    reader.expect('{')
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.expect(':')
+        if key == items_key:
+            yield from reader.array()
+            return
+        reader.value()
+        if reader.peek() == ',':
+            reader.position += 1
+    raise KeyError(items_key)
+
+
+def iter_items(chunks, items_key=None):
+    """
+    Yield the items of a JSON list body as they arrive
+
+    :param chunks: iterator of the body's bytes (eg. response.iter_content())
+    :param items_key: key holding the items if the body is an object (eg. 'items' for search results)
+    """
+    if ijson is not None:
+        prefix = 'item' if items_key is None else f"{items_key}.item"
+        yield from ijson.items(ChunkFile(chunks), prefix, use_float=True)
+        return
+    yield from decode_items(ChunkReader(chunks), items_key)
@@ -0,0 +1,199 @@
+import time
+import threading
+from array import array
+from urllib.parse import urlsplit
+
+# telemetry.py
+# This file keeps per-session request statistics: per-endpoint counts, latencies, bytes, status codes,
+# cache hits/misses and the last seen rate-limit budget. transport.get() feeds it on every request.
+telemetry_lock = threading.Lock()
+
+# Latency histogram buckets (milliseconds) used for the Prometheus export
+latency_buckets = [25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Path segments that are part of an endpoint's name, anything else is treated as a parameter (login, repo name, sha...)
+endpoint_segments = {'users', 'orgs', 'repos', 'search', 'repositories', 'topics', 'issues', 'commits', 'commit',
+                     'contents', 'contributors', 'stargazers', 'forks', 'releases', 'latest', 'events', 'public',
+                     'gists', 'subscriptions', 'following', 'followers', 'public_members', 'tarball', 'zipball',
+                     'members', 'git', 'trees', 'blobs', 'graphql', 'rate_limit'}
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.latencies = array('d')
+        self.statuses = {}
+
+
+session_started = time.time()
+endpoints = {}
+statuses = {}
+cache = {'hits': 0, 'misses': 0}
+rate_limit = {}
+
+
+def endpoint_name(url):
+    """
+    Collapse a url into its endpoint, eg. https://api.github.com/users/octocat/repos?per_page=10 -> /users/{}/repos
+    """
+    parts = urlsplit(url)
+    segments = [segment if segment in endpoint_segments else '{}' for segment in parts.path.strip('/').split('/') if segment]
+    endpoint = '/' + '/'.join(segments)
+    return endpoint if parts.netloc == 'api.github.com' else f"{parts.netloc}{endpoint}"
+
+
+def record_request(url, status, latency, size, headers=None):
+    """
+    Record a completed request
+
+    :param url: requested url
+    :param status: response status code
+    :param latency: request latency in milliseconds
+    :param size: response size in bytes
+    :param headers: response headers, used to track the rate-limit budget
+    """
+    endpoint = endpoint_name(url)
+    with telemetry_lock:
+        stats = endpoints.get(endpoint)
+        if stats is None:
+            stats = endpoints[endpoint] = EndpointStats()
+        stats.count += 1
+        stats.bytes += size
+        stats.latencies.append(latency)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        statuses[status] = statuses.get(status, 0) + 1
+        if headers and 'X-RateLimit-Remaining' in headers:
+            resource = headers.get('X-RateLimit-Resource', 'core')
+            rate_limit[resource] = {'remaining': int(headers['X-RateLimit-Remaining']),
+                                    'limit': int(headers.get('X-RateLimit-Limit', 0)),
+                                    'reset': int(headers.get('X-RateLimit-Reset', 0))}
+
+
+def record_bytes(url, size):
+    # Size of a streamed body, known once it has been read (see transport.items())
+    with telemetry_lock:
+        endpoints[endpoint_name(url)].bytes += size
+
+
+def record_cache(hit):
+    with telemetry_lock:
+        cache['hits' if hit else 'misses'] += 1
+
+
+def snapshot():
+    """
+    Raw statistics of this process, for merge() in another one (worker processes, see sharding.py)
+    """
+    with telemetry_lock:
+        return {'endpoints': {endpoint: (stats.count, stats.bytes, stats.latencies.tolist(), dict(stats.statuses))
+                              for endpoint, stats in endpoints.items()},
+                'cache': dict(cache),
+                'rate_limit': {resource: dict(budget) for resource, budget in rate_limit.items()}}
+
+
+def merge(other):
+    """
+    Add the statistics of a snapshot() taken in another process to this one's
+    """
+    with telemetry_lock:
+        for endpoint, (count, size, latencies, endpoint_statuses) in other['endpoints'].items():
+            stats = endpoints.get(endpoint)
+            if stats is None:
+                stats = endpoints[endpoint] = EndpointStats()
+            stats.count += count
+            stats.bytes += size
+            stats.latencies.extend(latencies)
+            for status, status_count in endpoint_statuses.items():
+                stats.statuses[status] = stats.statuses.get(status, 0) + status_count
+                statuses[status] = statuses.get(status, 0) + status_count
+        for key, value in other['cache'].items():
+            cache[key] += value
+        for resource, budget in other['rate_limit'].items():
+            # Keep the lowest budget seen
+            if resource not in rate_limit or budget['remaining'] < rate_limit[resource]['remaining']:
+                rate_limit[resource] = dict(budget)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summary():
+    """
+    Return a snapshot of the session's telemetry
+
+    :return: dict with 'endpoints' (a list of per-endpoint dicts, slowest p95 first), 'statuses', 'cache',
+    'rate_limit', 'requests', 'bytes' and 'elapsed' (seconds since the session started)
+    """
+    with telemetry_lock:
+        rows = []
+        for endpoint, stats in endpoints.items():
+            latencies = sorted(stats.latencies)
+            rows.append({'endpoint': endpoint,
+                         'count': stats.count,
+                         'bytes': stats.bytes,
+                         'p50': percentile(latencies, 0.50),
+                         'p95': percentile(latencies, 0.95),
+                         'p99': percentile(latencies, 0.99),
+                         'total_latency': sum(latencies),
+                         'statuses': dict(stats.statuses)})
+        rows.sort(key=lambda row: row['p95'], reverse=True)
+        return {'endpoints': rows,
+                'statuses': dict(statuses),
+                'cache': dict(cache),
+                'rate_limit': {resource: dict(budget) for resource, budget in rate_limit.items()},
+                'requests': sum(row['count'] for row in rows),
+                'bytes': sum(row['bytes'] for row in rows),
+                'elapsed': time.time() - session_started}
+
+
+def prometheus_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def to_prometheus():
+    """
+    Render the session's telemetry in the Prometheus text exposition format
+    """
+    with telemetry_lock:
+        lines = ['# HELP octosuite_requests_total Requests sent, by endpoint and status code.',
+                 '# TYPE octosuite_requests_total counter']
+        for endpoint, stats in endpoints.items():
+            for status, count in stats.statuses.items():
+                lines.append(f'octosuite_requests_total{{endpoint="{prometheus_label(endpoint)}",status="{status}"}} {count}')
+
+        lines += ['# HELP octosuite_response_bytes_total Response bytes received, by endpoint.',
+                  '# TYPE octosuite_response_bytes_total counter']
+        for endpoint, stats in endpoints.items():
+            lines.append(f'octosuite_response_bytes_total{{endpoint="{prometheus_label(endpoint)}"}} {stats.bytes}')
+
+        lines += ['# HELP octosuite_request_latency_milliseconds Request latency, by endpoint.',
+                  '# TYPE octosuite_request_latency_milliseconds histogram']
+        for endpoint, stats in endpoints.items():
+            label = prometheus_label(endpoint)
+            for bucket in latency_buckets:
+                count = sum(1 for latency in stats.latencies if latency <= bucket)
+                lines.append(f'octosuite_request_latency_milliseconds_bucket{{endpoint="{label}",le="{bucket}"}} {count}')
+            lines.append(f'octosuite_request_latency_milliseconds_bucket{{endpoint="{label}",le="+Inf"}} {stats.count}')
+            lines.append(f'octosuite_request_latency_milliseconds_sum{{endpoint="{label}"}} {sum(stats.latencies)}')
+            lines.append(f'octosuite_request_latency_milliseconds_count{{endpoint="{label}"}} {stats.count}')
+
+        lines += ['# HELP octosuite_cache_requests_total Cache lookups, by result.',
+                  '# TYPE octosuite_cache_requests_total counter',
+                  f'octosuite_cache_requests_total{{result="hit"}} {cache["hits"]}',
+                  f'octosuite_cache_requests_total{{result="miss"}} {cache["misses"]}']
+
+        lines += ['# HELP octosuite_rate_limit_remaining Remaining rate-limit budget, by resource.',
+                  '# TYPE octosuite_rate_limit_remaining gauge']
+        for resource, budget in rate_limit.items():
+            lines.append(f'octosuite_rate_limit_remaining{{resource="{prometheus_label(resource)}"}} {budget["remaining"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def export_prometheus(filename):
+    with open(filename, 'w') as file:
+        file.write(to_prometheus())
@@ -0,0 +1,282 @@
+import time
+import hashlib
+import logging
+import requests
+import itertools
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from octosuite import telemetry, cassettes, streaming
+from octosuite.log_roller import request_made, page_failed
+
+# transport.py
+# Every HTTP request Octosuite makes goes through get(), which reuses pooled connections from a single
+# requests.Session, revalidates previously seen responses with their ETag (GitHub doesn't charge 304s against
+# the rate limit), and logs/records each request with its url, status, latency and size.
+# Exchanges can be recorded to disk (start_recording) and served back from it (start_replaying).
+# API requests can be authenticated with tokens (use_tokens), whose rate-limit budget can be shared by worker processes.
+# List responses can be decoded item by item while they arrive (--stream, see streaming.py).
+session = requests.Session()
+# Stream the pages of list endpoints (get_list)
+stream_lists = False
+recording_directory = None
+replayer = None
+
+# Tokens API requests are authenticated with (rotated per request), and each token's slot in rate_gate
+tokens = []
+token_slots = []
+token_counter = itertools.count()
+# sharding.RateLimitGate shared with the other worker processes of a --workers run
+rate_gate = None
+
+# (url, Accept, token) -> CachedBody of the last 200 response that carried an ETag, least recently used first
+etag_cache = OrderedDict()
+etag_cache_size = 512
+etag_cache_lock = threading.Lock()
+# Headers of the cached response a 304 doesn't necessarily repeat
+kept_headers = ('Content-Type', 'Link')
+
+
+class CachedBody:
+    __slots__ = ('etag', 'content', 'headers')
+
+    def __init__(self, response):
+        self.etag = response.headers['ETag']
+        self.content = response.content
+        self.headers = {name: response.headers[name] for name in kept_headers if name in response.headers}
+
+
+def cache_key(url, headers):
+    """
+    A response is only reused for a request asking for the same representation (Accept) with the same token
+    """
+    authorization = headers.get('Authorization')
+    return (url, headers.get('Accept'),
+            hashlib.sha256(authorization.encode()).hexdigest() if authorization else None)
+
+
+def cached_response(key):
+    with etag_cache_lock:
+        cached = etag_cache.get(key)
+        if cached is not None:
+            etag_cache.move_to_end(key)
+        return cached
+
+
+def cache_response(key, response):
+    with etag_cache_lock:
+        etag_cache[key] = CachedBody(response)
+        etag_cache.move_to_end(key)
+        while len(etag_cache) > etag_cache_size:
+            etag_cache.popitem(last=False)
+
+
+def revalidated(response, cached):
+    """
+    Turn a 304 Not Modified into the 200 it stands for, with the cached body (and its up to date headers)
+
+    :return: the response, with .revalidated set
+    """
+    response.status_code = 200
+    response.reason = 'OK'
+    response._content = cached.content
+    for name, value in cached.headers.items():
+        response.headers.setdefault(name, value)
+    response.revalidated = True
+    return response
+
+
+# Save every exchange to a cassette directory
+def start_recording(directory):
+    global recording_directory
+    recording_directory = directory
+
+
+# Serve every request from a cassette directory instead of the network
+def start_replaying(directory, latency=0, rate_limit=None):
+    global replayer
+    replayer = cassettes.Replayer(directory, latency=latency, rate_limit=rate_limit)
+
+
+def use_tokens(token_list, slots=None, gate=None):
+    """
+    Authenticate API requests with tokens
+
+    :param token_list: GitHub tokens, rotated per request
+    :param slots: each token's slot in <gate> (defaults to its position in <token_list>)
+    :param gate: sharding.RateLimitGate that holds off requests while a token's budget is used up
+    """
+    global tokens, token_slots, rate_gate
+    tokens = list(token_list)
+    token_slots = list(slots) if slots is not None else list(range(len(tokens)))
+    rate_gate = gate
+
+
+# The rate-limit bucket a request is charged to
+def rate_limit_resource(url):
+    path = urlsplit(url).path
+    if path.startswith('/search/'):
+        return 'search'
+    if path.startswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+
+def authorize(url, kwargs):
+    """
+    Add the next token to a request's headers
+
+    :param kwargs: the request's keyword arguments
+    :return: the token's slot in rate_gate (0 without tokens)
+    """
+    # Tokens only go to the API (github.com pages are requested with their own auth)
+    if not tokens or urlsplit(url).netloc == 'github.com':
+        return 0
+    index = next(token_counter) % len(tokens)
+    kwargs['headers'] = {**kwargs.get('headers', {}), 'Authorization': f"token {tokens[index]}"}
+    return token_slots[index]
+
+
+def get(url, **kwargs):
+    """
+    Send a GET request through the shared session
+
+    :param url: url to request
+    :param kwargs: passed on to requests.Session.get (with stream=True, a 200's body is left unread for items())
+    :return: requests.Response (with the cached body and .revalidated set if the server answered 304 Not Modified)
+    """
+    slot = authorize(url, kwargs)
+    key = cache_key(url, kwargs.get('headers', {}))
+    cached = cached_response(key)
+    if cached is not None:
+        kwargs['headers'] = {**kwargs.get('headers', {}), 'If-None-Match': cached.etag}
+
+    if rate_gate is not None:
+        rate_gate.acquire(slot, rate_limit_resource(url))
+
+    started = time.perf_counter()
+    if replayer is not None:
+        response = replayer.get(url, **kwargs)
+    else:
+        response = session.get(url, **kwargs)
+        if recording_directory:
+            cassettes.record(recording_directory, url, response.request.headers, response)
+    latency = round((time.perf_counter() - started) * 1000, 2)
+    # Recorded/replayed bodies are read whole anyway
+    streamed = kwargs.get('stream', False) and response.status_code == 200 and replayer is None \
+        and not recording_directory
+    if streamed:
+        # Counted by items() as it's read, if the server didn't say
+        size = int(response.headers.get('Content-Length') or 0)
+        response.streamed = url
+    else:
+        size = int(response.headers.get('Content-Length') or len(response.content))
+    logging.debug(request_made.format('GET', url, response.status_code, latency, size),
+                  extra={'url': url, 'status': response.status_code, 'latency': latency, 'bytes': size})
+    telemetry.record_request(url, response.status_code, latency, size, response.headers)
+    if rate_gate is not None:
+        rate_gate.update(slot, response.headers)
+
+    if cached is not None and response.status_code == 304:
+        telemetry.record_cache(hit=True)
+        return revalidated(response, cached)
+    telemetry.record_cache(hit=False)
+    # A streamed body isn't kept, so there is nothing to revalidate later
+    if response.status_code == 200 and 'ETag' in response.headers and not streamed:
+        cache_response(key, response)
+    return response
+
+
+def post(url, **kwargs):
+    """
+    Send a POST request (GraphQL queries) through the shared session, with the tokens.
+    Its response isn't cached, recorded or replayed.
+
+    :param kwargs: passed on to requests.Session.post (eg. json=)
+    """
+    slot = authorize(url, kwargs)
+    if rate_gate is not None:
+        rate_gate.acquire(slot, rate_limit_resource(url))
+    started = time.perf_counter()
+    response = session.post(url, **kwargs)
+    latency = round((time.perf_counter() - started) * 1000, 2)
+    size = int(response.headers.get('Content-Length') or len(response.content))
+    logging.debug(request_made.format('POST', url, response.status_code, latency, size),
+                  extra={'url': url, 'status': response.status_code, 'latency': latency, 'bytes': size})
+    telemetry.record_request(url, response.status_code, latency, size, response.headers)
+    if rate_gate is not None:
+        rate_gate.update(slot, response.headers)
+    return response
+
+
+def get_list(url, **kwargs):
+    """
+    Request the first page of a list endpoint (streamed with --stream)
+    """
+    return get(url, stream=stream_lists, **kwargs)
+
+
+def counted_chunks(response):
+    """
+    Yield the chunks of a response's body, counting the size of a streamed one the server didn't give
+    """
+    size = 0
+    for chunk in response.iter_content(chunk_size=streaming.chunk_size):
+        size += len(chunk)
+        yield chunk
+    if getattr(response, 'streamed', None) and 'Content-Length' not in response.headers:
+        telemetry.record_bytes(response.streamed, size)
+
+
+def items(response, items_key=None):
+    """
+    Yield the items of a list response, decoded one at a time as they arrive if it was streamed
+
+    :param items_key: key holding the items in the JSON, if it isn't a list
+    """
+    if getattr(response, 'streamed', None):
+        yield from streaming.iter_items(counted_chunks(response), items_key)
+        return
+    page = streaming.loads(response.content)
+    yield from page if items_key is None else page[items_key]
+
+
+# GitHub list endpoints return at most 100 items per page
+def page_size(limit):
+    return max(1, min(int(limit), 100))
+
+
+def paginate(response, limit, items_key=None, strict=False):
+    """
+    Yield up to <limit> items from a list endpoint, starting with an already fetched first page
+    and following the Link rel="next" headers for the rest
+
+    :param response: the first page's response
+    :param limit: maximum number of items to yield
+    :param items_key: key holding the items in the page's JSON (eg. 'items' for search results), if it isn't a list
+    :param strict: raise RuntimeError if a later page fails, rather than logging it and stopping (for callers that
+    must not mistake a cut short listing for a complete one)
+    """
+    limit = int(limit)
+    count = 0
+    while True:
+        for item in items(response, items_key):
+            if count >= limit:
+                break
+            yield item
+            count += 1
+        streamed = bool(getattr(response, 'streamed', None))
+        if streamed:
+            # Don't read the rest of a page that isn't needed
+            response.close()
+        next_url = response.links.get('next', {}).get('url')
+        if count >= limit or not next_url:
+            return
+        response = get(next_url, stream=streamed)
+        if response.status_code != 200:
+            # An error body (eg. a 403 once the rate limit runs out) isn't a page of items
+            failure = page_failed.format(next_url, response.status_code, response.text[:200])
+            if strict:
+                raise RuntimeError(failure)
+            logging.warning(failure)
+            return
@@ -0,0 +1,279 @@
+import re
+import fnmatch
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from octosuite import transport
+from octosuite.log_roller import tree_truncated, empty_repository, fetch_failed
+
+# trees.py
+# repo:tree lists every file of a repository (at a branch, tag, commit or tree SHA) with a single request to the git
+# trees API (recursive=1), instead of a /contents request per directory. GitHub truncates recursive listings past
+# 100,000 entries (or 7 MB) and says so ('truncated'): the tree is then listed level by level, fetching each subtree
+# recursively and concurrently, and splitting up any subtree that is truncated too. Paths can be filtered with
+# globs/regexes compiled into a single pattern (PathMatcher). org:find_files does the same for every repository of an
+# organisation or user at once (find_files), keeping the listings in a cache keyed by tree SHA (TreeCache): each
+# repository's root tree SHA is looked up (from its branch) before its tree is listed, so forks at the same tree, or a
+# subtree vendored in several repositories, are listed once.
+
+
+def tree_url(endpoint, repository, tree, recursive=True):
+    """
+    :param tree: branch, tag, commit or tree SHA (HEAD: the default branch)
+    """
+    return f"{endpoint}/repos/{repository}/git/trees/{quote(tree, safe='')}{'?recursive=1' if recursive else ''}"
+
+
+class TreeCache:
+    def __init__(self, max_entries=200000):
+        """
+        Tree listings by SHA, least recently used first (a tree SHA always lists the same entries)
+
+        :param max_entries: entries kept in all, the oldest listings are dropped past it
+        """
+        self.max_entries = max_entries
+        self.listings = OrderedDict()
+        self.entries = 0
+        # Listings found in the cache
+        self.hits = 0
+        self.lock = threading.Lock()
+        # (sha, recursive) -> Event set once the thread listing it is done, so no other thread lists it too
+        self.fetching = {}
+
+    def get(self, sha, recursive):
+        with self.lock:
+            listing = self.listings.get((sha, recursive))
+            if listing is not None:
+                self.listings.move_to_end((sha, recursive))
+                self.hits += 1
+            return listing
+
+    def put(self, listing, recursive):
+        if recursive and listing['truncated']:
+            # Only its SHA is needed to start over (see split_listing)
+            listing = {'sha': listing['sha'], 'truncated': True, 'tree': []}
+        with self.lock:
+            if (listing['sha'], recursive) in self.listings:
+                return
+            self.listings[(listing['sha'], recursive)] = listing
+            self.entries += len(listing['tree'])
+            while self.entries > self.max_entries and len(self.listings) > 1:
+                _, dropped = self.listings.popitem(last=False)
+                self.entries -= len(dropped['tree'])
+
+
+    def listing(self, sha, recursive, fetch):
+        """
+        :param fetch: function returning the listing when it isn't cached, called by one thread at a time per
+        listing (the others wait for it rather than listing the same tree too)
+        :return: the listing of the tree <sha>
+        """
+        key = (sha, recursive)
+        while True:
+            listing = self.get(sha, recursive)
+            if listing is not None:
+                return listing
+            with self.lock:
+                fetched = self.fetching.get(key)
+                if fetched is None:
+                    fetched = self.fetching[key] = threading.Event()
+                    break
+            # Listed by another thread meanwhile (or it failed, and this thread tries)
+            fetched.wait()
+        try:
+            listing = fetch()
+            self.put(listing, recursive)
+            return listing
+        finally:
+            with self.lock:
+                del self.fetching[key]
+            fetched.set()
+
+
+def fetch_listing(endpoint, repository, tree, recursive, prefix=''):
+    """
+    :param prefix: path of the tree in the repository, for the error message
+    :return: the tree's listing (see tree_url)
+    """
+    response = transport.get(tree_url(endpoint, repository, tree, recursive))
+    if response.status_code != 200:
+        raise RuntimeError(f"{repository} {prefix or tree}: {response.status_code} {response.text[:200]}")
+    return response.json()
+
+
+def fetch_tree(endpoint, repository, tree, prefix, recursive, cache=None):
+    """
+    :param prefix: path of the tree in the repository ('' or ending with '/')
+    :param cache: TreeCache to look the listing up in first, and keep it in
+    :return: (entries with their paths in the repository, [(tree, prefix, recursive)] of the listings still needed)
+    """
+    if cache is None:
+        listing = fetch_listing(endpoint, repository, tree, recursive, prefix)
+    else:
+        listing = cache.listing(tree, recursive,
+                                lambda: fetch_listing(endpoint, repository, tree, recursive, prefix))
+    return split_listing(listing, prefix, recursive)
+
+
+def split_listing(listing, prefix, recursive):
+    if recursive and listing['truncated']:
+        # Start over with this level alone, and fetch its subtrees one by one
+        return [], [(listing['sha'], prefix, False)]
+    # Only blobs have a size
+    entries = [{'size': None, **entry, 'path': f"{prefix}{entry['path']}"} for entry in listing['tree']]
+    if recursive:
+        return entries, []
+    return entries, [(entry['sha'], f"{entry['path']}/", True) for entry in entries if entry['type'] == 'tree']
+
+
+def walk_tree(endpoint, repository, listing, workers=8, cache=None):
+    """
+    Yield every entry (blob, tree or commit for submodules) of a tree, in no particular order when it's truncated
+
+    :param listing: the tree's recursive listing (see tree_url)
+    :param workers: subtrees listed concurrently when the recursive listing is truncated
+    :param cache: TreeCache of the subtree listings
+    """
+    entries, pending = split_listing(listing, '', True)
+    yield from entries
+    if not pending:
+        return
+    logging.info(tree_truncated.format(repository, listing['sha']))
+    futures = set()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures.update(executor.submit(fetch_tree, endpoint, repository, *subtree, cache) for subtree in pending)
+        while futures:
+            finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                entries, pending = future.result()
+                for subtree in pending:
+                    futures.add(executor.submit(fetch_tree, endpoint, repository, *subtree, cache))
+                yield from entries
+    finally:
+        # Listings not started yet aren't needed anymore (shutdown's cancel_futures needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def add_size(sizes, entry):
+    """
+    Count a blob in the totals of every directory above it
+
+    :param sizes: dict of directory path ('' for the root) -> [files, bytes] of the blobs anywhere under it
+    """
+    if entry['type'] != 'blob':
+        return
+    parts = entry['path'].split('/')
+    for depth in range(len(parts)):
+        totals = sizes.setdefault('/'.join(parts[:depth]), [0, 0])
+        totals[0] += 1
+        totals[1] += entry['size'] or 0
+
+
+class PathMatcher:
+    def __init__(self, globs=(), regexes=()):
+        """
+        Match paths against many patterns at once: they're compiled into a single regex
+
+        :param globs: fnmatch patterns, a glob without '/' matches file names at any depth (eg. *.yml, .env)
+        :param regexes: regular expressions searched for anywhere in the path
+        """
+        self.patterns = list(globs) + list(regexes)
+        alternatives = []
+        for glob in globs:
+            pattern = fnmatch.translate(glob)
+            alternatives.append(pattern if '/' in glob else f"(?:.*/)?{pattern}")
+        alternatives += [f".*?(?:{regex})" for regex in regexes]
+        # A named group per pattern, so a match tells which pattern it was
+        self.regex = re.compile('|'.join(f"(?P<p{index}>{pattern})" for index, pattern in enumerate(alternatives)))
+
+    def match(self, path):
+        """
+        :return: the (first) pattern matching the path, or None
+        """
+        match = self.regex.match(path)
+        return None if match is None else self.patterns[int(match.lastgroup[1:])]
+
+
+def root_tree(endpoint, repository, branch):
+    """
+    :return: the SHA of the tree at the head of a branch, None if it can't be told (eg. an empty repository)
+    """
+    response = transport.get(f"{endpoint}/repos/{repository}/branches/{quote(branch, safe='')}")
+    if response.status_code != 200:
+        return None
+    return response.json()['commit']['commit']['tree']['sha']
+
+
+def search_repository(endpoint, repository, matcher, cache=None):
+    """
+    :param repository: the API's repository object
+    :return: list of (entry, pattern) of the repository's paths matching <matcher>
+    """
+    name = repository['full_name']
+    branch = repository.get('default_branch') or 'HEAD'
+    # The root tree's SHA first (a small request): forks at the same tree list it once between them
+    sha = root_tree(endpoint, name, branch) if cache is not None else None
+    if sha is not None:
+        listing = cache.listing(sha, True, lambda: fetch_listing(endpoint, name, sha, True))
+    else:
+        response = transport.get(tree_url(endpoint, name, branch))
+        if response.status_code == 409:
+            logging.info(empty_repository.format(name))
+            return []
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.status_code} {response.text[:200]}")
+        listing = response.json()
+    found = []
+    for entry in walk_tree(endpoint, name, listing, cache=cache):
+        pattern = matcher.match(entry['path'])
+        if pattern is not None:
+            found.append((entry, pattern))
+    return found
+
+
+def find_files(endpoint, repositories, matcher, workers=16, cache=None):
+    """
+    Search the trees of many repositories concurrently
+
+    :param repositories: iterator of the API's repository objects (read as the searches go)
+    :param matcher: PathMatcher
+    :param workers: repositories searched concurrently
+    :param cache: TreeCache shared by the searches (a new one by default)
+    :return: yields (repository name, entry, pattern) per matching path, a repository's as soon as it's searched
+    """
+    cache = TreeCache() if cache is None else cache
+    repositories = iter(repositories)
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        exhausted = False
+        while True:
+            # Keep the pool busy without reading the whole repository listing up front
+            while not exhausted and len(futures) < workers * 2:
+                repository = next(repositories, None)
+                if repository is None:
+                    exhausted = True
+                    break
+                futures[executor.submit(search_repository, endpoint, repository, matcher, cache)] = repository
+            if not futures:
+                return
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = futures.pop(future)['full_name']
+                try:
+                    found = future.result()
+                except Exception as e:
+                    logging.error(fetch_failed.format("the tree", name, e))
+                    continue
+                for entry, pattern in found:
+                    yield name, entry, pattern
+    finally:
+        # Searches not started yet aren't needed anymore (shutdown's cancel_futures needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
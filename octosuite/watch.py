@@ -0,0 +1,293 @@
+import time
+import heapq
+import queue
+import sqlite3
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from octosuite import transport, telemetry, schemas
+from octosuite.sharding import RateLimitGate
+from octosuite.log_roller import watching, watch_failed
+
+# watch.py
+# watch:user and watch:org poll the events of many users/organisations from one process and stream only the events
+# that weren't seen before (watchlist does the same for a file of users, organisations and repositories' issues, and
+# polls each target as often as its activity calls for, see AdaptiveWatcher). Polls are conditional (If-None-Match
+# with the last ETag, see transport.py), and GitHub doesn't charge 304 Not Modified responses against the rate limit,
+# so a quiet target costs nothing. Each target is polled no more often than its X-Poll-Interval header asks. A single
+# scheduler thread keeps the targets in a heap ordered by when they are next due, and hands due polls to a small pool
+# of threads.
+
+# Kind of target -> the endpoint listing its activity (newest first), and the schema of what it lists
+watch_kinds = {'user': ("/users/{}/events/public", schemas.event),
+               'org': ("/orgs/{}/events", schemas.event),
+               'repo': ("/repos/{}/issues?state=all&sort=updated", schemas.issue)}
+
+
+def activity_id(kind, item):
+    # An issue that was updated again is new activity
+    return f"{item['id']}:{item['updated_at']}" if kind == 'repo' else item['id']
+
+
+class SeenEvents:
+    def __init__(self, size=1000):
+        """
+        Bounded LRU set of event ids
+        """
+        self.size = size
+        self.ids = OrderedDict()
+
+    def __contains__(self, event_id):
+        return event_id in self.ids
+
+    def add(self, event_id):
+        self.ids[event_id] = None
+        self.ids.move_to_end(event_id)
+        while len(self.ids) > self.size:
+            self.ids.popitem(last=False)
+
+
+class WatchTarget:
+    def __init__(self, kind, name, interval):
+        """
+        :param kind: 'user', 'org' or 'repo' (see watch_kinds)
+        :param name: login, or owner/repository
+        :param interval: seconds between polls
+        """
+        self.kind = kind
+        self.name = name
+        self.schema = watch_kinds[kind][1]
+        self.interval = interval
+        # GitHub's X-Poll-Interval, polls never come closer together than this
+        self.poll_interval = 0
+        self.seen = SeenEvents()
+        # Successful (200) polls
+        self.polls = 0
+        # When it was last polled (time.monotonic()), and whether that poll was charged (anything but a 304)
+        self.polled_at = None
+        self.charged = False
+        # Activity rate (new items per second), see AdaptiveWatcher
+        self.rate = 0.0
+
+    def path(self):
+        return watch_kinds[self.kind][0].format(self.name)
+
+
+class Watcher:
+    def __init__(self, endpoint, targets, emit, interval=60, workers=8):
+        """
+        :param endpoint: API endpoint
+        :param targets: WatchTargets
+        :param emit: function(target, event) called from the scheduler thread for every new event, oldest first
+        :param interval: seconds between polls of a target (at least its X-Poll-Interval)
+        :param workers: polls sent concurrently
+        """
+        self.endpoint = endpoint
+        self.targets = list(targets)
+        self.emit = emit
+        self.interval = interval
+        self.workers = workers
+        # (due time, tie breaker, target)
+        self.schedule = []
+        self.order = itertools.count()
+        # Finished polls: (target, new events)
+        self.finished = queue.Queue()
+        self.stopped = threading.Event()
+
+    def poll(self, target):
+        """
+        :return: the target's events that weren't seen before, oldest first
+        """
+        path = target.path()
+        response = transport.get(f"{self.endpoint}{path}{'&' if '?' in path else '?'}per_page=100")
+        if 'X-Poll-Interval' in response.headers:
+            target.poll_interval = int(response.headers['X-Poll-Interval'])
+        # transport.get() hands back the cached body (marked revalidated) when the server answered 304 Not Modified
+        target.charged = not getattr(response, 'revalidated', False)
+        if not target.charged:
+            return []
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.status_code} {response.text[:200]}")
+        # Only a successful poll counts: until one has noted what is already there, nothing is new
+        target.polls += 1
+        first_poll = target.polls == 1
+        new_events = []
+        for event in response.json():
+            if activity_id(target.kind, event) in target.seen:
+                # Activity is listed newest first, everything from here on was seen
+                break
+            new_events.append(event)
+        for event in new_events:
+            target.seen.add(activity_id(target.kind, event))
+        # The first poll only notes what is already there
+        return [] if first_poll else new_events[::-1]
+
+    def next_interval(self, target, new_events):
+        """
+        :param new_events: what the poll found, None if it failed
+        :return: seconds until the target's next poll
+        """
+        return max(target.interval, target.poll_interval)
+
+    def schedule_poll(self, target, delay):
+        heapq.heappush(self.schedule, (time.monotonic() + delay, next(self.order), target))
+
+    def run(self, duration=None):
+        """
+        Poll until interrupted (Ctrl+C), or for <duration> seconds
+        """
+        if transport.rate_gate is None:
+            transport.rate_gate = RateLimitGate(len(transport.tokens))
+        # Every target's last response (per token) has to stay in the ETag cache for its polls to be conditional
+        transport.etag_cache_size = max(transport.etag_cache_size,
+                                        len(self.targets) * 2 * max(1, len(transport.tokens)))
+        for position, target in enumerate(self.targets):
+            # Spread the first polls out a little
+            self.schedule_poll(target, position * 0.01)
+        logging.info(watching.format(len(self.targets)))
+        stop_at = None if duration is None else time.monotonic() + duration
+        in_flight = 0
+
+        def run_poll(target):
+            try:
+                self.finished.put((target, self.poll(target)))
+            except Exception as e:
+                logging.warning(watch_failed.format(target.kind, target.name, e))
+                self.finished.put((target, None))
+
+        # Polls handed to the executor that may not have finished
+        submitted = []
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            while not self.stopped.is_set() and (stop_at is None or time.monotonic() < stop_at):
+                # Hand out due polls (the ones in flight aren't in the heap)
+                now = time.monotonic()
+                while self.schedule and self.schedule[0][0] <= now and in_flight < self.workers:
+                    _, _, target = heapq.heappop(self.schedule)
+                    in_flight += 1
+                    submitted = [future for future in submitted if not future.done()]
+                    submitted.append(executor.submit(run_poll, target))
+                wait = self.schedule[0][0] - now if self.schedule and in_flight < self.workers else 1
+                if stop_at is not None:
+                    wait = min(wait, stop_at - now)
+                try:
+                    target, new_events = self.finished.get(timeout=max(0.0, min(wait, 1)))
+                except queue.Empty:
+                    continue
+                in_flight -= 1
+                for event in new_events or []:
+                    self.emit(target, event)
+                delay = self.next_interval(target, new_events)
+                target.polled_at = time.monotonic()
+                self.schedule_poll(target, delay)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopped.set()
+            # Polls not started yet are dropped (shutdown's cancel_futures needs Python 3.9)
+            for future in submitted:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+
+class AdaptiveWatcher(Watcher):
+    def __init__(self, endpoint, targets, emit, min_interval=60, max_interval=3600, workers=8, backoff=2.0,
+                 smoothing=0.3, items_per_poll=5):
+        """
+        A Watcher whose targets are polled as often as their activity calls for: a target that shows new activity
+        goes straight back to <min_interval>, a quiet one backs off (up to <max_interval>), and every interval is
+        stretched while polls spend the rate-limit budget faster than it lasts until its reset.
+
+        :param backoff: factor a quiet target's interval grows by on each poll
+        :param smoothing: weight of the last poll in a target's activity rate (exponentially weighted average)
+        :param items_per_poll: new items a poll aims to find, an active target's interval is cut to match its rate
+        """
+        super().__init__(endpoint, targets, emit, interval=min_interval, workers=workers)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.items_per_poll = items_per_poll
+        # Times of the charged polls in the last minute
+        self.charges = []
+
+    def budget_factor(self):
+        """
+        :return: how much intervals are stretched, so the polls don't outspend the core rate-limit budget
+        """
+        now = time.monotonic()
+        self.charges = [charged_at for charged_at in self.charges if now - charged_at < 60]
+        budget = telemetry.rate_limit.get('core')
+        if not budget or not self.charges:
+            return 1.0
+        spending = len(self.charges) / 60
+        # Requests per second the budget (of the token that answered last, for every token) lasts at until its reset
+        affordable = budget['remaining'] * max(1, len(transport.tokens)) / max(1.0, budget['reset'] - time.time())
+        if affordable <= 0:
+            return self.max_interval / self.min_interval
+        return max(1.0, spending / affordable)
+
+    def next_interval(self, target, new_events):
+        now = time.monotonic()
+        if target.charged:
+            self.charges.append(now)
+        if new_events is None:
+            interval = target.interval * self.backoff
+        else:
+            elapsed = max(1.0, now - target.polled_at) if target.polled_at else target.interval
+            target.rate = self.smoothing * len(new_events) / elapsed + (1 - self.smoothing) * target.rate
+            if new_events:
+                interval = self.min_interval
+            else:
+                interval = target.interval * self.backoff
+                if target.rate > 0:
+                    interval = min(interval, self.items_per_poll / target.rate)
+        target.interval = min(self.max_interval, max(self.min_interval, interval))
+        return max(target.interval * self.budget_factor(), target.poll_interval)
+
+
+def read_watchlist(filename):
+    """
+    :param filename: a target per line, as <kind>:<name> (user:octocat, org:bellingcat, repo:owner/repository),
+    bare names are users
+    :return: list of (kind, name)
+    """
+    targets = []
+    with open(filename) as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            kind, separator, name = line.partition(':')
+            if not separator or kind not in watch_kinds:
+                kind, name = 'user', line
+            targets.append((kind, name.strip()))
+    return targets
+
+
+class WatchState:
+    def __init__(self, filename=".watchlist.db"):
+        """
+        Learned intervals and activity rates, so a restarted watchlist doesn't start from scratch
+        """
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS targets (kind TEXT,
+                                                                       name TEXT,
+                                                                       interval REAL,
+                                                                       rate REAL,
+                                                                       PRIMARY KEY (kind, name))""")
+
+    def load(self, targets):
+        for target in targets:
+            row = self.connection.execute("SELECT interval, rate FROM targets WHERE kind = ? AND name = ?",
+                                          (target.kind, target.name)).fetchone()
+            if row:
+                target.interval, target.rate = row
+
+    def save(self, targets):
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO targets VALUES (?, ?, ?, ?)",
+                                        [(target.kind, target.name, target.interval, target.rate)
+                                         for target in targets])